@@ -0,0 +1,223 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Numeric encoder of game states.
+
+The encoder turns a game state, seen by one player, into a fixed-size feature vector:
+    global: Turn number and whether it is the turn of the viewer.
+    player: Hero, hero power, mana, weapon and zone sizes of both players (the viewer first).
+    play: Minions in play of both players (the viewer first), padded to ``PlayMax``.
+    hand: Cards in the hand of the viewer, padded to ``HandMax``. The enemy hand is hidden, only its size is encoded.
+
+Feature names of each part are in ``StateEncoder.Features``. Values are raw (not normalized),
+missing entities (empty slots, no weapon, etc.) are encoded as zeros.
+
+``StateEncoder.features`` returns a plain list. ``StateEncoder.encode`` and ``StateEncoder.encode_batch`` write
+NumPy arrays (require NumPy), so evaluators and learned models can score many states in one call.
+``StateEncoder.unpack`` returns named views of the arrays in their structured shapes.
+"""
+
+from collections import OrderedDict
+
+from ..game.player import Player
+from ..utils.game import Zone, Type
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__author__ = 'fyabc'
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError('NumPy is required to encode game states into arrays')
+
+
+def _minion_features(minion):
+    return [
+        1.0, minion.attack, minion.health, minion.max_health,
+        float(minion.taunt), float(minion.divine_shield), float(minion.stealth), float(minion.frozen),
+        float(minion.windfury), float(minion.immune), float(minion.attack_status == 'ready'),
+    ]
+
+
+def _hand_features(card):
+    type_ = card.type
+    if type_ in (Type.Minion, Type.Weapon):
+        attack, health = card.attack, card.health
+    else:
+        attack, health = 0, 0
+    return [
+        1.0, float(type_ == Type.Minion), float(type_ == Type.Spell), float(type_ == Type.Weapon),
+        float(type_ == Type.HeroCard), card.cost, attack, health,
+    ]
+
+
+class StateEncoder:
+    """Encoder of game states into fixed-size feature vectors.
+
+    [NOTE]: The encoder does not keep references to games, so one encoder can be shared by many games.
+    """
+
+    Features = OrderedDict([
+        ('global', ('n_turns', 'is_active')),
+        ('player', (
+            'health', 'max_health', 'armor', 'attack', 'frozen', 'hero_ready',
+            'hero_power_exhausted', 'hero_power_cost',
+            'max_mana', 'used_mana', 'temp_mana', 'overload', 'overload_next', 'available_mana',
+            'has_weapon', 'weapon_attack', 'weapon_durability',
+            'n_hand', 'n_deck', 'n_secret', 'n_play', 'tire_counter',
+        )),
+        ('play', (
+            'present', 'attack', 'health', 'max_health', 'taunt', 'divine_shield', 'stealth', 'frozen',
+            'windfury', 'immune', 'ready',
+        )),
+        ('hand', ('present', 'minion', 'spell', 'weapon', 'hero', 'cost', 'attack', 'health')),
+    ])
+
+    def __init__(self, dtype='float32'):
+        """
+
+        :param dtype: Data type of encoded arrays.
+        """
+        self.dtype = dtype
+
+        n_global, n_player = len(self.Features['global']), len(self.Features['player'])
+        n_minion, n_hand = len(self.Features['play']), len(self.Features['hand'])
+        # Part name -> (start, stop, shape).
+        self.layout = OrderedDict()
+        start = 0
+        for name, shape in (
+                ('global', (n_global,)), ('player', (2, n_player)),
+                ('play', (2, Player.PlayMax, n_minion)), ('hand', (Player.HandMax, n_hand))):
+            size = 1
+            for dim in shape:
+                size *= dim
+            self.layout[name] = start, start + size, shape
+            start += size
+        self.size = start
+
+    def new_buffer(self, n):
+        """Create a zero buffer of ``n`` encoded states.
+
+        :param n: Number of states.
+        :return: NumPy array of shape (n, size).
+        """
+        _require_numpy()
+        return np.zeros((n, self.size), dtype=self.dtype)
+
+    def features(self, game, player_id=None):
+        """Encode the game state into a list of features.
+
+        :param game: The game.
+        :param player_id: The viewer, default is the current player.
+        :return: List of ``size`` numbers.
+        :rtype: list
+        """
+        if player_id is None:
+            player_id = game.current_player
+        result = [float(game.n_turns), float(game.current_player == player_id)]
+
+        player_ids = player_id, 1 - player_id
+        for pid in player_ids:
+            result.extend(self._player_features(game.get_player(pid)))
+
+        n_minion = len(self.Features['play'])
+        for pid in player_ids:
+            play = game.get_zone(Zone.Play, pid)
+            for minion in play:
+                result.extend(_minion_features(minion))
+            result.extend([0.0] * (n_minion * (Player.PlayMax - len(play))))
+
+        hand = game.get_zone(Zone.Hand, player_id)
+        for card in hand:
+            result.extend(_hand_features(card))
+        result.extend([0.0] * (len(self.Features['hand']) * (Player.HandMax - len(hand))))
+
+        if len(result) != self.size:
+            raise ValueError('Game state does not fit the encoder: got {} features, expect {}'.format(
+                len(result), self.size))
+        return result
+
+    @staticmethod
+    def _player_features(player):
+        hero, hero_power, weapon = player.hero, player.hero_power, player.weapon
+        if hero is None:
+            result = [0.0] * 6
+        else:
+            result = [hero.health, hero.max_health, hero.armor, hero.attack,
+                      float(hero.frozen), float(hero.attack_status == 'ready')]
+        if hero_power is None:
+            result.extend((0.0, 0.0))
+        else:
+            result.extend((float(hero_power.exhausted), hero_power.cost))
+        result.extend((player.max_mana, player.used_mana, player.temp_mana, player.overload, player.overload_next,
+                       player.displayed_mana()))
+        if weapon is None:
+            result.extend((0.0, 0.0, 0.0))
+        else:
+            result.extend((1.0, weapon.attack, weapon.health))
+        result.extend((len(player.hand), len(player.deck), len(player.secret), len(player.play),
+                       player.tire_counter))
+        return result
+
+    def encode(self, game, player_id=None, out=None):
+        """Encode the game state into a NumPy array.
+
+        :param game: The game.
+        :param player_id: The viewer, default is the current player.
+        :param out: The output array of shape (size,), create a new array if None.
+        :return: The output array.
+        """
+        _require_numpy()
+        if out is None:
+            out = np.empty(self.size, dtype=self.dtype)
+        out[:] = self.features(game, player_id)
+        return out
+
+    def encode_batch(self, games, player_ids=None, out=None):
+        """Encode many game states into a NumPy array.
+
+        :param games: Sequence of games.
+        :param player_ids: Sequence of viewers (same length as ``games``), or a single viewer for all games.
+            Default is the current player of each game.
+        :param out: The preallocated output array of shape (n, size) where n >= len(games),
+            create a new array if None. Only the first ``len(games)`` rows are written.
+        :return: The output array.
+        """
+        _require_numpy()
+        n = len(games)
+        if out is None:
+            out = self.new_buffer(n)
+        elif out.ndim != 2 or out.shape[0] < n or out.shape[1] != self.size:
+            raise ValueError('Output buffer of shape {} cannot hold {} states of size {}'.format(
+                out.shape, n, self.size))
+        if player_ids is None or isinstance(player_ids, int):
+            player_ids = [player_ids] * n
+        for i, (game, player_id) in enumerate(zip(games, player_ids)):
+            out[i] = self.features(game, player_id)
+        return out
+
+    def unpack(self, array):
+        """Get named views of encoded states in their structured shapes.
+
+        :param array: Encoded array of shape (..., size).
+        :return: Dict of part name -> view of shape (..., *part_shape).
+            e.g. ``unpack(batch)['play'][:, 1, :, 1]`` is the attack of enemy minions of all states.
+        """
+        prefix = array.shape[:-1]
+        return {
+            name: array[..., start:stop].reshape(prefix + shape)
+            for name, (start, stop, shape) in self.layout.items()
+        }
+
+    def index(self, part, feature):
+        """Get the index of the feature in the last axis of the part (see ``unpack``)."""
+        return self.Features[part].index(feature)
+
+
+__all__ = [
+    'StateEncoder',
+]
@@ -0,0 +1,317 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Lethal finder of the current turn.
+
+The solver runs a depth-first search over legal actions of the current player (except turn end)
+on a forked game in journal mode (rolled back between actions), until the enemy hero dies.
+
+Attacks to the enemy hero are not branched on. They are deferred to the end of the line: at each node, if the
+damage of attacks can kill the enemy hero, all characters attack the enemy hero to finish the line.
+Other actions are searched with pruning:
+    Damage upper bound: If no card or hero power is playable (out of mana budget), the remaining damage comes from
+        attacks only. Attacks needed to kill enemy taunts (one per taunt, two for taunts with divine shield) are
+        spent first, if the bound of the rest is less than the enemy hero health and armor, the node is pruned.
+    Dominated actions: Attacks to enemy minions without taunt do not help to kill the enemy hero,
+        so they are not searched. Actions of identical sources (e.g. two same cards in hand,
+        or two same minions in play) on the same target are equivalent, only one of them is searched.
+    Transpositions: States proven without lethal are stored in a transposition table by their hashes
+        (see ``Game.state_hash``), so different orders of the same actions (play A then B, or B then A)
+        are searched once. The table is kept between searches of the solver, so later searches of the same turn
+        (after playing an action) reuse results of earlier searches.
+
+Deferred attacks, the damage bound and dominated actions assume that attacks have no side effects, so they are
+only applied if the game has no auras and no triggers of events resolved by attacks (combat, damage and death events,
+including secrets on them), and entities involved have no deathrattles
+(attackers and defenders of the attack, or all characters and weapons in play for the damage bound).
+Otherwise the actions are searched. The transposition table is not used (probed or stored) in such states either,
+since a state proven without lethal may not tell about another state that differs in these effects.
+
+The result contains the lethal action sequence as ``action_key`` of the actions. Agents can play them one by one
+by ``match_action``, and should solve again after each action if the game has random effects.
+
+[NOTE]: The search runs on the real random state and hidden information of the game (such as the order of the deck),
+so "no lethal" is proven under this random state.
+"""
+
+import time
+from collections import namedtuple
+
+from .mcts import action_key
+from .transposition import TranspositionTable
+from ..game import player_action as pa
+from ..game.legal_actions import get_legal_actions
+from ..game.events import standard
+from ..game.player import Player
+from ..game.triggers.trigger import Trigger
+from ..utils.game import Zone
+from ..utils.message import debug
+
+__author__ = 'fyabc'
+
+LethalResult = namedtuple('LethalResult', ['lethal', 'actions', 'complete', 'nodes'])
+LethalResult.__doc__ = '''Result of the lethal search.
+
+lethal: A lethal action sequence is found or not.
+actions: List of keys of lethal actions (see ``action_key``), empty if not found.
+complete: The search is completed (not stopped by the budget). If no lethal is found, a complete search proves
+    that there is no lethal.
+nodes: Number of searched nodes.
+'''
+
+_PrimitiveTypes = (type(None), bool, int, float, str)
+
+# Events resolved by attacks (except deathrattles).
+_AttackEvents = (
+    standard.PrepareCombat, standard.ProposedAttack, standard.Attack, standard.LoseStealth, standard.Combat,
+    standard.Damage, standard.LoseDurability, standard.AfterAttack,
+    standard.DeathPhase, standard.HeroDeath, standard.MinionDeath, standard.WeaponDeath,
+)
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _entity_signature(entity):
+    """The signature of the entity, same for identical entities (same card and same tags) in the same zone."""
+    if entity is None:
+        return None
+    return entity.zone, entity.player_id, entity.id, tuple(sorted(
+        (tag, value) for tag, value in entity.data.entity_items()
+        if tag != 'oop' and isinstance(value, _PrimitiveTypes)))
+
+
+def _action_signature(action):
+    """The signature of the action, same for equivalent actions of identical sources."""
+    if isinstance(action, pa.ToAttack):
+        return 'ToAttack', _entity_signature(action.attacker), action_key(action)[2]
+    key = action_key(action)
+    if isinstance(action, pa.Play):
+        return (key[0], _entity_signature(action.source)) + key[2:]
+    return key
+
+
+def state_key(game):
+    """Get the key of the game state in the transposition table, same as ``Game.state_hash``."""
+    return game.state_hash()
+
+
+def damage_upper_bound(game, actions):
+    """Get the upper bound of damage to the enemy hero this turn, if only attacks are available.
+
+    :param game: The game.
+    :param actions: Legal actions of the current player.
+    :return: The upper bound, or None if other actions (play cards, use hero power) are available.
+    """
+    if any(not isinstance(action, (pa.ToAttack, pa.TurnEnd)) for action in actions):
+        return None
+    return _attack_damage(game, actions)
+
+
+def _attack_damage(game, actions):
+    """Get the upper bound of damage to the enemy hero by attacks of the actions."""
+    attackers = {}
+    for action in actions:
+        if isinstance(action, pa.ToAttack):
+            attackers[id(action.attacker)] = action.attacker
+
+    enemy_id = 1 - game.current_player
+    if game.get_hero(enemy_id).immune:
+        return 0
+
+    # Attacks: (can attack the enemy hero, attack value).
+    attacks = []
+    for attacker in attackers.values():
+        face = attacker.can_attack_hero and not (attacker.rush and attacker.first_turn)
+        n_left = attacker._get_n_total_attack() - attacker.n_attack
+        attacks.extend([(face, attacker.attack)] * max(n_left, 0))
+
+    n_taunt_attacks = sum(
+        1 + bool(m.divine_shield) for m in game.get_zone(Zone.Play, enemy_id) if m.taunt)
+    if n_taunt_attacks > len(attacks):
+        return 0
+    # Spend attacks that cannot hit the enemy hero first, then the smallest ones.
+    attacks.sort()
+    return sum(value for face, value in attacks[n_taunt_attacks:] if face)
+
+
+def _has_effects(game):
+    """Check if the game has auras or triggers of attack events, then attacks may have side effects."""
+    if any(game.auras.values()):
+        return True
+    return any(
+        game.get_dispatch_entry(event_class, timing)
+        for event_class in _AttackEvents for timing in (Trigger.Before, Trigger.After))
+
+
+def _has_deathrattle(entity):
+    return bool(getattr(entity, 'dr_list', None))
+
+
+def match_action(game, key, all_positions=False):
+    """Get the legal player action of the game with the action key, or None if not found."""
+    for action in get_legal_actions(game, all_positions=all_positions):
+        if action_key(action) == key:
+            return action
+    return None
+
+
+class LethalSolver:
+    """The lethal finder of the current turn.
+
+    :param time_limit: Time budget of each search (in seconds), None means unlimited.
+    :param max_nodes: Node budget of each search, None means unlimited.
+    :param table: Transposition table of states without lethal, default is a new table of ``TableMemory`` bytes.
+    """
+
+    TableMemory = 1 << 20
+
+    def __init__(self, time_limit=1.0, max_nodes=None, table=None):
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.table = TranspositionTable(memory=self.TableMemory) if table is None else table
+
+        self._sim = None
+        self._player_id = None
+        self._path = None
+        self._nodes = 0
+        self._deadline = None
+
+    def solve(self, game):
+        """Search lethal of the current player of the game.
+
+        :param game: The game, will not be modified.
+        :return: The search result.
+        :rtype: LethalResult
+        """
+        if game.game_result is not None:
+            return LethalResult(False, [], True, 0)
+
+        sim = game.fork(journal=True)
+        sim.fast, sim.record_history = True, False
+        self._sim, self._player_id = sim, game.current_player
+        self._path, self._nodes = [], 0
+        self.table.new_search()
+        self._deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        try:
+            lethal = self._search()
+            complete = True
+        except _BudgetExceeded:
+            lethal, complete = False, False
+        result = LethalResult(lethal, list(self._path) if lethal else [], complete, self._nodes)
+        self._sim = self._path = None
+        debug('Lethal search: lethal={}, complete={}, nodes={}'.format(result.lethal, result.complete, result.nodes))
+        return result
+
+    def _finish(self):
+        """Attack the enemy hero with all characters, return True and extend the path if the enemy hero dies."""
+        sim = self._sim
+        enemy_id = 1 - self._player_id
+        checkpoint = sim.checkpoint()
+        keys = []
+        # Each character can attack at most 4 times (mega windfury), stop if attacks do not make progress.
+        for _ in range(4 * (Player.PlayMax + 1)):
+            if sim.game_result is not None or sim.current_player != self._player_id:
+                break
+            for action in get_legal_actions(sim, all_positions=False):
+                if isinstance(action, pa.ToAttack) and action.defender.zone == Zone.Hero and \
+                        action.defender.player_id == enemy_id:
+                    break
+            else:
+                break
+            keys.append(action_key(action))
+            sim.run_player_action(action)
+        if self._is_win(sim):
+            self._path.extend(keys)
+            return True
+        sim.rollback(checkpoint)
+        return False
+
+    def _is_win(self, sim):
+        return sim.game_result == (sim.ResultWin0 if self._player_id == 0 else sim.ResultWin1)
+
+    def _search(self):
+        self._nodes += 1
+        start_nodes = self._nodes
+        if self.max_nodes is not None and self._nodes > self.max_nodes:
+            raise _BudgetExceeded()
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _BudgetExceeded()
+
+        sim = self._sim
+        # The damage bound and the transposition table are only used if attacks have no side effects.
+        effects = _has_effects(sim)
+        pure = not effects and not any(
+            _has_deathrattle(entity)
+            for player_id in (0, 1) for zone in (Zone.Hero, Zone.Weapon, Zone.Play)
+            for entity in sim.get_zone(zone, player_id))
+        key = state_key(sim) if pure else None
+        if pure and self.table.probe(key) is not None:
+            return False
+
+        actions = get_legal_actions(sim, all_positions=False)
+        enemy_id = 1 - self._player_id
+        enemy_hero = sim.get_hero(enemy_id)
+        enemy_health = enemy_hero.health + enemy_hero.armor
+
+        # Finish the line by attacks to the enemy hero.
+        if _attack_damage(sim, actions) >= enemy_health and self._finish():
+            return True
+
+        if pure:
+            bound = damage_upper_bound(sim, actions)
+            if bound is not None and bound < enemy_health:
+                self.table.store(key, 0.0)
+                return False
+
+        candidates = []
+        seen = set()
+        for action in actions:
+            if isinstance(action, pa.TurnEnd):
+                continue
+            if not effects and isinstance(action, pa.ToAttack) and action.defender.player_id == enemy_id and \
+                    not _has_deathrattle(action.attacker) and not _has_deathrattle(action.defender):
+                if action.defender.zone == Zone.Hero:
+                    # Deferred to ``_finish``.
+                    continue
+                if not action.defender.taunt:
+                    continue
+            signature = _action_signature(action)
+            if signature not in seen:
+                seen.add(signature)
+                candidates.append(action)
+
+        checkpoint = sim.checkpoint()
+        for action in candidates:
+            action_k = action_key(action)
+            sim.run_player_action(action)
+            if self._is_win(sim):
+                self._path.append(action_k)
+                return True
+            if sim.game_result is None and sim.current_player == self._player_id:
+                self._path.append(action_k)
+                if self._search():
+                    return True
+                self._path.pop()
+            sim.rollback(checkpoint)
+
+        # The depth is the size of the searched subtree, so expensive results are preferred to be kept.
+        if pure:
+            self.table.store(key, 0.0, depth=self._nodes - start_nodes + 1)
+        return False
+
+
+def find_lethal(game, time_limit=1.0, max_nodes=None, table=None):
+    """Search lethal of the current player of the game. See ``LethalSolver``."""
+    return LethalSolver(time_limit=time_limit, max_nodes=max_nodes, table=table).solve(game)
+
+
+__all__ = [
+    'LethalResult',
+    'state_key',
+    'damage_upper_bound',
+    'match_action',
+    'LethalSolver',
+    'find_lethal',
+]
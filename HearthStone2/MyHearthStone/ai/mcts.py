@@ -0,0 +1,297 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Monte Carlo Tree Search agent.
+
+The agent runs an information set MCTS (single observer) at each decision:
+    1. Fork the game and determinize the hidden information: the enemy hand is resampled from the enemy hand and deck,
+        then both decks are shuffled.
+    2. Select a path in the tree with UCB1 (counted by availability, since legal actions differ between
+        determinizations), and expand a new node.
+    3. Rollout a few turns with a random or rule-based policy, then evaluate the state with a simple heuristic.
+    4. Back-propagate the reward.
+
+Actions in the tree are identified by ``action_key``, which uses locations of entities instead of entity objects,
+so they can be matched between forked games.
+
+Search settings are in ``C.AI.MCTS``, and can be overridden by keyword arguments of the agent.
+"""
+
+import math
+import multiprocessing as mp
+import random
+import time
+
+from .agent import Agent, register_agent
+from .rule_based.components import get_cost_ge_5
+from ..game import player_action as pa
+from ..game.legal_actions import get_legal_actions
+from ..utils.constants import C
+from ..utils.game import Zone
+from ..utils.message import debug, warning
+
+__author__ = 'fyabc'
+
+
+def _entity_key(entity):
+    if entity is None:
+        return None
+    zone, player_id = entity.zone, entity.player_id
+    return player_id, zone, entity.game.get_zone(zone, player_id).index(entity), entity.id
+
+
+def _choice_key(choice):
+    return getattr(choice, 'id', choice)
+
+
+def action_key(action):
+    """Get the hashable key of the player action, which is same for "same" actions in forked games.
+
+    :param action: The player action.
+    :return: The key (a tuple).
+    """
+    if isinstance(action, pa.TurnEnd):
+        return 'TurnEnd', action.player_id
+    if isinstance(action, pa.ToAttack):
+        return 'ToAttack', _entity_key(action.attacker), _entity_key(action.defender)
+    if isinstance(action, pa.Play):
+        choices = tuple(sorted(
+            (k, _choice_key(v)) for k, v in action.po_data.items() if k.startswith('choice.') and not k.endswith('.all')))
+        return (type(action).__name__, _entity_key(action.source), _entity_key(action.target),
+                getattr(action, 'loc', None), choices)
+    raise ValueError('Unsupported player action {}'.format(action))
+
+
+def determinize(game, player_id, rng):
+    """Determinize hidden information of the game from the view of the player.
+
+    The enemy hand is resampled from cards in the enemy hand and deck, then both decks are shuffled.
+    Cards in the enemy hand that are known by the player (e.g. bounced minions) are not considered.
+
+    :param game: The (forked) game, will be modified inplace.
+    :param player_id: The player id of the observer.
+    :param rng: The random number generator.
+    """
+    enemy_id = 1 - player_id
+    hand, deck = game.get_zone(Zone.Hand, enemy_id), game.get_zone(Zone.Deck, enemy_id)
+    n_hand, n_deck = len(hand), len(deck)
+    for i in range(n_hand):
+        j = rng.randrange(n_hand + n_deck) - n_hand
+        if j >= 0:
+            # Swap hand[i] and deck[j].
+            game.move(enemy_id, Zone.Hand, i, enemy_id, Zone.Deck, j)
+            game.move(enemy_id, Zone.Deck, j + 1, enemy_id, Zone.Hand, i)
+    for pid in (player_id, enemy_id):
+        rng.shuffle(game.get_zone(Zone.Deck, pid))
+
+
+def evaluate(game, player_id):
+    """Evaluate the game state from the view of the player.
+
+    :return: The value in [0, 1]. Win = 1, lose = 0, draw = 0.5, heuristic value otherwise.
+    :rtype: float
+    """
+    result = game.game_result
+    if result is not None:
+        if result == game.ResultDraw:
+            return 0.5
+        return float((result == game.ResultWin0) == (player_id == 0))
+
+    score = 0.0
+    for pid, sign in ((player_id, 1), (1 - player_id, -1)):
+        player = game.get_player(pid)
+        hero = player.hero
+        score += sign * (hero.health + hero.armor)
+        score += sign * sum(m.attack + m.health for m in player.play)
+        score += sign * 0.5 * len(player.hand)
+    return 1.0 / (1.0 + math.exp(-score / 10.0))
+
+
+def _rollout_random(actions, rng):
+    return rng.choice(actions)
+
+
+def _rollout_rule(actions, rng):
+    # The last action is always turn end.
+    if len(actions) == 1:
+        return actions[0]
+    return rng.choice(actions[:-1])
+
+
+RolloutPolicies = {
+    'random': _rollout_random,
+    'rule': _rollout_rule,
+}
+
+
+class _Node:
+    __slots__ = ('player_id', 'children', 'visits', 'reward', 'avails')
+
+    def __init__(self, player_id=None):
+        self.player_id = player_id      # The player that takes the action into this node.
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.avails = 1
+
+    def ucb_select(self, keys, exploration):
+        best_key, best_value = None, -1.0
+        for key in keys:
+            child = self.children[key]
+            value = child.reward / child.visits + exploration * math.sqrt(math.log(child.avails) / child.visits)
+            if value > best_value:
+                best_key, best_value = key, value
+        return best_key
+
+
+def search(game, player_id, settings, seed):
+    """Run the MCTS from the current game state.
+
+    :param game: The game, will not be modified.
+    :param player_id: The player id of the searcher.
+    :param settings: Search settings, see ``C.AI.MCTS``.
+    :param seed: Random seed of the search.
+    :return: Statistics of root children, dict of ``action_key: (visits, total_reward)``.
+    :rtype: dict
+    """
+    rng = random.Random(seed)
+    iterations, time_limit = settings['Iterations'], settings['TimeLimit']
+    exploration, all_positions = settings['Exploration'], settings['AllPositions']
+    rollout_turns = settings['RolloutTurns']
+    policy = RolloutPolicies[settings['Rollout']]
+
+    root = _Node()
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    n_iter = 0
+    while (iterations is None or n_iter < iterations) and (deadline is None or time.perf_counter() < deadline):
+        n_iter += 1
+        sim = game.fork()
+        sim.rng.seed(rng.getrandbits(32))
+        # Simulations are headless, run them in fast mode.
+        sim.fast, sim.record_history = True, False
+        determinize(sim, player_id, rng)
+
+        node, path = root, [root]
+        # Selection and expansion.
+        while sim.game_result is None:
+            actions = {action_key(a): a for a in get_legal_actions(sim, all_positions=all_positions)}
+            untried = []
+            for key in actions:
+                child = node.children.get(key)
+                if child is None:
+                    untried.append(key)
+                else:
+                    child.avails += 1
+            if untried:
+                key = rng.choice(untried)
+                node.children[key] = _Node(sim.current_player)
+            else:
+                key = node.ucb_select(actions, exploration)
+            node = node.children[key]
+            path.append(node)
+            sim.run_player_action(actions[key])
+            if untried:
+                break
+
+        # Rollout.
+        end_turn = sim.n_turns + rollout_turns
+        while sim.game_result is None and sim.n_turns < end_turn:
+            sim.run_player_action(policy(get_legal_actions(sim, all_positions=False), rng))
+
+        # Back-propagation.
+        value = evaluate(sim, player_id)
+        for node in path:
+            node.visits += 1
+            node.reward += value if node.player_id in (player_id, None) else 1.0 - value
+
+    debug('MCTS run {} iterations'.format(n_iter))
+    return {key: (child.visits, child.reward) for key, child in root.children.items()}
+
+
+# Search arguments of the worker processes, inherited from the parent process by forking.
+_Shared = {}
+
+
+def _search_worker(seed):
+    return search(_Shared['game'], _Shared['player_id'], _Shared['settings'], seed)
+
+
+def parallel_search(game, player_id, settings, seed, workers):
+    """Run MCTS in worker processes (root parallelization), then merge the statistics of root children.
+
+    Each worker searches ``Iterations / workers`` iterations with the same time limit.
+    Require the "fork" start method, fallback to ``search`` if it is not available.
+    """
+    if 'fork' not in mp.get_all_start_methods():
+        warning('Parallel MCTS requires the "fork" start method, search in the current process')
+        return search(game, player_id, settings, seed)
+
+    settings = dict(settings)
+    if settings['Iterations'] is not None:
+        settings['Iterations'] = max(1, settings['Iterations'] // workers)
+    _Shared.update(game=game, player_id=player_id, settings=settings)
+    try:
+        with mp.get_context('fork').Pool(workers) as pool:
+            all_stats = pool.map(_search_worker, [seed + i for i in range(workers)])
+    finally:
+        _Shared.clear()
+
+    result = {}
+    for stats in all_stats:
+        for key, (visits, reward) in stats.items():
+            old_visits, old_reward = result.get(key, (0, 0.0))
+            result[key] = old_visits + visits, old_reward + reward
+    return result
+
+
+@register_agent
+class MCTSAgent(Agent):
+    """Monte Carlo Tree Search agent.
+
+    Keyword arguments override search settings in ``C.AI.MCTS``.
+    """
+
+    def __init__(self, game, player_id, **kwargs):
+        super().__init__(game, player_id)
+        self.settings = dict(C.AI.MCTS)
+        for k, v in kwargs.items():
+            if k not in self.settings:
+                raise ValueError('Unknown MCTS setting {!r}'.format(k))
+            self.settings[k] = v
+        if self.settings['Rollout'] not in RolloutPolicies:
+            raise ValueError('Unknown rollout policy {!r}'.format(self.settings['Rollout']))
+        # Seeded by the game, so games with the same seed are reproducible.
+        self.rng = random.Random(game.seed * 2 + player_id)
+
+    def get_player_action(self):
+        actions = get_legal_actions(self.game, all_positions=self.settings['AllPositions'])
+        if len(actions) == 1:
+            return actions[0]
+
+        seed = self.rng.getrandbits(32)
+        workers = self.settings['Workers']
+        if workers > 1:
+            stats = parallel_search(self.game, self.player_id, self.settings, seed, workers)
+        else:
+            stats = search(self.game, self.player_id, self.settings, seed)
+        if not stats:
+            return actions[-1]
+
+        best_key = max(stats, key=lambda k: stats[k][0])
+        for action in actions:
+            if action_key(action) == best_key:
+                return action
+        return actions[-1]
+
+    get_replace_card = get_cost_ge_5
+
+
+__all__ = [
+    'action_key',
+    'determinize',
+    'evaluate',
+    'RolloutPolicies',
+    'search',
+    'parallel_search',
+    'MCTSAgent',
+]
@@ -0,0 +1,183 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Greedy agent with a linear board evaluator.
+
+At each decision, the agent forks the game once in journal mode, simulates every legal action on it
+(rolled back between actions), encodes the resulting states with ``StateEncoder``, and scores them in one batch
+with a weighted linear board-value function. The best action is taken, or the turn is ended if no action
+improves the current board.
+
+[NOTE]: Simulations are run on the real random state and hidden information of the game, so the agent is
+a bit optimistic about random effects. It is a cheap baseline, use ``MCTSAgent`` for stronger play.
+"""
+
+from .components import get_cost_ge_5
+from ..agent import Agent, register_agent
+from ..encoder import StateEncoder, np
+from ..lethal import LethalSolver, match_action
+from ..mcts import action_key
+from ...game import player_action as pa
+from ...game.legal_actions import get_legal_actions
+
+__author__ = 'fyabc'
+
+
+# Default weights of features: (part, feature) -> (weight of the viewer, weight of the enemy).
+DefaultWeights = {
+    ('player', 'health'): (1.0, -1.0),
+    ('player', 'armor'): (1.0, -1.0),
+    ('player', 'weapon_attack'): (0.5, -0.5),
+    ('player', 'weapon_durability'): (0.5, -0.5),
+    ('player', 'n_hand'): (1.0, -1.0),
+    ('play', 'attack'): (1.0, -1.0),
+    ('play', 'health'): (1.0, -1.0),
+    ('play', 'taunt'): (1.0, -1.0),
+    ('play', 'divine_shield'): (1.0, -1.0),
+}
+
+
+def linear_weights(encoder, weights=None):
+    """Build the weight vector of encoded features.
+
+    :param encoder: The state encoder.
+    :param weights: Dict of (part, feature) -> (weight of the viewer, weight of the enemy), default is ``DefaultWeights``.
+        Weights of hand features are applied to all cards in the hand of the viewer (the enemy weight is ignored).
+    :return: List of ``encoder.size`` weights.
+    :rtype: list
+    """
+    if weights is None:
+        weights = DefaultWeights
+    result = [0.0] * encoder.size
+    for (part, feature), side_weights in weights.items():
+        start, _, shape = encoder.layout[part]
+        n_features = shape[-1]
+        index = encoder.index(part, feature)
+        if part == 'global':
+            result[start + index] = side_weights[0]
+        elif part == 'hand':
+            for slot in range(shape[0]):
+                result[start + slot * n_features + index] = side_weights[0]
+        else:
+            # Parts of both players, the viewer first.
+            n_slots = (shape[1] if len(shape) == 3 else 1)
+            for side, weight in enumerate(side_weights):
+                for slot in range(n_slots):
+                    result[start + (side * n_slots + slot) * n_features + index] = weight
+    return result
+
+
+@register_agent
+class GreedyAgent(Agent):
+    """Greedy agent, take the action with the best resulting board.
+
+    Keyword arguments:
+        weights: Feature weights, see ``linear_weights``.
+        all_positions: Simulate all minion positions or only play minions to the rightmost position.
+        lethal_time_limit: Time budget of the lethal search before each decision (see ``LethalSolver``),
+            None means do not search lethal.
+    """
+
+    def __init__(self, game, player_id, weights=None, all_positions=False, lethal_time_limit=None):
+        super().__init__(game, player_id)
+        self.encoder = StateEncoder(dtype='float64')
+        self.weights = linear_weights(self.encoder, weights)
+        if np is not None:
+            self.weights = np.array(self.weights, dtype=self.encoder.dtype)
+        self.all_positions = all_positions
+        self.lethal_solver = None if lethal_time_limit is None else LethalSolver(time_limit=lethal_time_limit)
+        # Preallocated buffer of encoded states, grown on demand.
+        self._buffer = None
+
+    def _get_buffer(self, n):
+        if self._buffer is None or self._buffer.shape[0] < n:
+            self._buffer = self.encoder.new_buffer(max(n, 32))
+        return self._buffer
+
+    def _terminal_score(self, game):
+        result = game.game_result
+        if result is None:
+            return None
+        if result == game.ResultDraw:
+            return 0.0
+        return float('inf') if (result == game.ResultWin0) == (self.player_id == 0) else float('-inf')
+
+    def score_actions(self, actions):
+        """Simulate and score player actions of the current player.
+
+        :param actions: List of legal player actions.
+        :return: List of scores (None for actions not matched in the forked game).
+            The turn end action is scored by the current state.
+        :rtype: list
+        """
+        game = self.game
+        sim = game.fork(journal=True)
+        sim.fast, sim.record_history = True, False
+        checkpoint = sim.checkpoint()
+
+        # Actions in the simulated game, matched by action keys.
+        sim_actions = {action_key(a): a for a in get_legal_actions(sim, all_positions=self.all_positions)}
+
+        # Rows of encoded states, or scores of terminal states.
+        n = len(actions)
+        rows = [None] * n
+        scores = [None] * n
+        features = []
+        for i, action in enumerate(actions):
+            if isinstance(action, pa.TurnEnd):
+                features.append(self.encoder.features(game, self.player_id))
+                rows[i] = len(features) - 1
+                continue
+            sim_action = sim_actions.get(action_key(action))
+            if sim_action is None:
+                continue
+            sim.run_player_action(sim_action)
+            terminal = self._terminal_score(sim)
+            if terminal is None:
+                features.append(self.encoder.features(sim, self.player_id))
+                rows[i] = len(features) - 1
+            else:
+                scores[i] = terminal
+            sim.rollback(checkpoint)
+
+        if features:
+            if np is not None:
+                buffer = self._get_buffer(len(features))
+                buffer[:len(features)] = features
+                values = (buffer[:len(features)] @ self.weights).tolist()
+            else:
+                values = [sum(w * f for w, f in zip(self.weights, row)) for row in features]
+            for i, row in enumerate(rows):
+                if row is not None:
+                    scores[i] = values[row]
+        return scores
+
+    def get_player_action(self):
+        actions = get_legal_actions(self.game, all_positions=self.all_positions)
+        if len(actions) == 1:
+            return actions[0]
+
+        if self.lethal_solver is not None:
+            result = self.lethal_solver.solve(self.game)
+            if result.lethal:
+                action = match_action(self.game, result.actions[0])
+                if action is not None:
+                    return action
+
+        scores = self.score_actions(actions)
+        # The last action is always turn end, take another action only if it improves the board.
+        best_index = len(actions) - 1
+        best_score = scores[best_index]
+        for i, score in enumerate(scores[:-1]):
+            if score is not None and score > best_score:
+                best_index, best_score = i, score
+        return actions[best_index]
+
+    get_replace_card = get_cost_ge_5
+
+
+__all__ = [
+    'DefaultWeights',
+    'linear_weights',
+    'GreedyAgent',
+]
@@ -4,7 +4,8 @@
 from . import agent
 
 # Import them to register agents.
-from .rule_based import basic
+from .rule_based import basic, greedy
+from . import mcts
 
 __author__ = 'fyabc'
 
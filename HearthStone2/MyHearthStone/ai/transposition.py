@@ -0,0 +1,212 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Transposition table of search agents, keyed by the game state hash (see ``Game.state_hash``).
+
+The table has a fixed memory budget. Entries are grouped into buckets (the bucket of a key is ``key % n_buckets``),
+each entry stores the value, the visit count, the depth and the best action of a state.
+When a bucket is full, the entry to replace is chosen by age, then by depth:
+    entries of older searches (see ``new_search``) are replaced first, then the shallowest ones.
+The entry of the same key is replaced unless it is deeper and from the current search.
+
+Each entry is packed into three 64-bit words: the check word, the data word (visits, best action, depth and age),
+and the value (bits of a double). The check word is ``key ^ data ^ value``, so an entry is only found if all words
+are consistent. This makes the shared-memory variant safe to read and write without locks:
+an entry that is partially written (or written by two workers at the same time) is just a miss.
+
+[NOTE]: The best action is stored as the index of the action in ``get_legal_actions(game, all_positions)``
+of the state, which is same for equal states. Actions themselves can not be stored in shared memory.
+"""
+
+from array import array
+from collections import namedtuple
+import ctypes
+import multiprocessing as mp
+import struct
+
+from ..utils.constants import C
+
+__author__ = 'fyabc'
+
+_DoubleStruct = struct.Struct('<d')
+_WordStruct = struct.Struct('<Q')
+
+_Mask64 = (1 << 64) - 1
+_UsedBit = 1 << 63
+_VisitsMax = (1 << 32) - 1
+_BestMax = (1 << 16) - 2
+_DepthMax = (1 << 8) - 1
+_AgeMask = (1 << 7) - 1
+
+TTEntry = namedtuple('TTEntry', ['value', 'visits', 'depth', 'best'])
+TTEntry.__doc__ = '''Entry of the transposition table.
+
+value: The value of the state.
+visits: Visit count of the state.
+depth: Search depth (or effort) behind the entry, deeper entries are preferred to be kept.
+best: Index of the best action in legal actions of the state, -1 if unknown.
+'''
+
+
+def _value_bits(value):
+    return _WordStruct.unpack(_DoubleStruct.pack(value))[0]
+
+
+def _bits_value(bits):
+    return _DoubleStruct.unpack(_WordStruct.pack(bits))[0]
+
+
+class TranspositionTable:
+    """Transposition table with bounded memory.
+
+    :param memory: Memory budget in bytes, default is ``C.AI.TranspositionTable['Memory']``.
+    :param bucket_size: Number of entries in each bucket, default is ``C.AI.TranspositionTable['BucketSize']``.
+    """
+
+    # Size of each entry in bytes.
+    EntryBytes = 3 * 8
+
+    def __init__(self, memory=None, bucket_size=None):
+        settings = C.AI.TranspositionTable
+        memory = settings['Memory'] if memory is None else memory
+        bucket_size = settings['BucketSize'] if bucket_size is None else bucket_size
+        if bucket_size < 1:
+            raise ValueError('Bucket size must be positive, got {}'.format(bucket_size))
+        n_buckets = memory // (self.EntryBytes * bucket_size)
+        if n_buckets < 1:
+            raise ValueError('Memory budget {} is too small for a bucket of {} entries'.format(memory, bucket_size))
+
+        self.bucket_size = bucket_size
+        self.n_buckets = n_buckets
+        self.capacity = n_buckets * bucket_size
+        self._checks = self._new_array(self.capacity)
+        self._data = self._new_array(self.capacity)
+        self._values = self._new_array(self.capacity)
+        # Shared states: [age].
+        self._meta = self._new_array(1)
+
+        # Statistics of this process.
+        self.n_probes = 0
+        self.n_hits = 0
+
+    def _new_array(self, n):
+        """Create a zero-initialized array of ``n`` unsigned 64-bit words."""
+        return array('Q', bytes(8 * n))
+
+    def _zero_array(self, a):
+        a[:] = array('Q', bytes(8 * len(a)))
+
+    @property
+    def age(self):
+        """Age of the current search, see ``new_search``."""
+        return self._meta[0]
+
+    def new_search(self):
+        """Start a new search. Entries of older searches will be replaced first."""
+        self._meta[0] = (self._meta[0] + 1) & _AgeMask
+
+    def clear(self):
+        """Remove all entries."""
+        for a in (self._checks, self._data, self._values, self._meta):
+            self._zero_array(a)
+        self.n_probes = self.n_hits = 0
+
+    def probe(self, key):
+        """Get the entry of the key.
+
+        :param key: The state hash.
+        :return: The entry, or None if not found.
+        :rtype: TTEntry
+        """
+        key &= _Mask64
+        self.n_probes += 1
+        checks, data, values = self._checks, self._data, self._values
+        start = key % self.n_buckets * self.bucket_size
+        for i in range(start, start + self.bucket_size):
+            # [NOTE]: Read each word once, other workers may write the entry at the same time.
+            d, v = data[i], values[i]
+            if d and checks[i] ^ d ^ v == key:
+                self.n_hits += 1
+                return TTEntry(
+                    value=_bits_value(v),
+                    visits=d & _VisitsMax,
+                    depth=(d >> 48) & _DepthMax,
+                    best=((d >> 32) & 0xffff) - 1,
+                )
+        return None
+
+    def store(self, key, value, visits=1, depth=0, best=-1):
+        """Store the entry of the key.
+
+        :param key: The state hash.
+        :param value: The value of the state.
+        :param visits: Visit count, saturated at 2 ** 32 - 1.
+        :param depth: Search depth (or effort) behind the entry, saturated at 255.
+        :param best: Index of the best action in legal actions of the state, -1 if unknown.
+        :return: The entry is stored or not (a deeper entry of the same key from the current search is kept).
+        :rtype: bool
+        """
+        if not -1 <= best <= _BestMax:
+            raise ValueError('Best action index {} out of range [-1, {}]'.format(best, _BestMax))
+        key &= _Mask64
+        visits = min(max(visits, 0), _VisitsMax)
+        depth = min(max(depth, 0), _DepthMax)
+        age = self._meta[0]
+
+        checks, data, values = self._checks, self._data, self._values
+        start = key % self.n_buckets * self.bucket_size
+        slot, slot_priority = None, None
+        for i in range(start, start + self.bucket_size):
+            d = data[i]
+            if not d:
+                if slot_priority is None or slot_priority > (-1, 0):
+                    slot, slot_priority = i, (-1, 0)
+                continue
+            if checks[i] ^ d ^ values[i] == key:
+                if ((d >> 56) & _AgeMask) == age and ((d >> 48) & _DepthMax) > depth:
+                    return False
+                slot = i
+                break
+            # Replace entries of older searches first, then shallower entries.
+            priority = (((d >> 56) & _AgeMask) == age, (d >> 48) & _DepthMax)
+            if slot_priority is None or priority < slot_priority:
+                slot, slot_priority = i, priority
+
+        d = _UsedBit | (age << 56) | (depth << 48) | ((best + 1) << 32) | visits
+        v = _value_bits(value)
+        values[slot] = v
+        data[slot] = d
+        checks[slot] = key ^ d ^ v
+        return True
+
+    def usage(self, sample=1000):
+        """Get the fraction of used entries (estimated from the first ``sample`` entries)."""
+        n = min(sample, self.capacity)
+        data = self._data
+        return sum(1 for i in range(n) if data[i]) / n
+
+    def __repr__(self):
+        return '{}(capacity={}, bucket_size={}, age={})'.format(
+            type(self).__name__, self.capacity, self.bucket_size, self.age)
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Transposition table in shared memory, can be read and written by search workers in a process pool.
+
+    Create the table before the pool is started: workers inherit it with the "fork" start method,
+    or receive it in arguments of the pool initializer with other start methods.
+    Statistics (``n_probes`` and ``n_hits``) are counted in each process.
+    """
+
+    def _new_array(self, n):
+        return mp.RawArray(ctypes.c_uint64, n)
+
+    def _zero_array(self, a):
+        ctypes.memset(a, 0, ctypes.sizeof(a))
+
+
+__all__ = [
+    'TTEntry',
+    'TranspositionTable',
+    'SharedTranspositionTable',
+]
@@ -1,8 +1,6 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
-import random
-
 from MyHearthStone import ext
 from MyHearthStone.ext import enc_common
 from MyHearthStone.ext import std_events, std_triggers
@@ -51,6 +49,9 @@ class 森林狼(Minion):
     }
 
     class Aura_森林狼(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+
         def check_entity(self, entity, **kwargs):
             return entity.zone == Zone.Play and entity.player_id == self.owner.player_id \
                 and Race.Beast in entity.race and entity is not self.owner
@@ -105,6 +106,9 @@ class 苔原犀牛(Minion):
     }
 
     class Aura_苔原犀牛(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+
         def check_entity(self, entity, **kwargs):
             # [NOTE]: Contains himself.
             return entity.zone == Zone.Play and entity.player_id == self.owner.player_id \
@@ -216,7 +220,7 @@ class 动物伙伴(Spell):
     can_do_action = ext.require_board_not_full
 
     def run(self, target, **kwargs):
-        summon_id = random.choice(["20010", "20011", "20012"])
+        summon_id = self.game.rng.choice(["20010", "20011", "20012"])
         return std_events.pure_summon_events(self.game, summon_id, self.player_id, 'last')
 
 
@@ -272,7 +276,7 @@ class 多重射击(Spell):
         elif len(zone) < 2:
             real_targets = zone
         else:
-            real_targets = random.sample(zone, 2)
+            real_targets = self.game.rng.sample(zone, 2)
         return [std_events.AreaDamage(self.game, self, real_targets, [self.dh_values[0] for _ in real_targets])]
 
 
@@ -298,6 +302,9 @@ class 雷欧克(Minion):
     }
 
     class Aura_雷欧克(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+
         def check_entity(self, entity, **kwargs):
             return entity.zone == Zone.Play and entity.player_id == self.owner.player_id \
                 and entity is not self.owner
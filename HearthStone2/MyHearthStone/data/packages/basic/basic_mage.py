@@ -43,10 +43,9 @@ class 水元素(Minion):
 
     class Trig_水元素(std_triggers.AttachedTrigger):
         respond = [std_events.Damage]
+        owner_is_self = True
 
         def process(self, event: respond[0]):
-            if event.owner is not self.owner:
-                return []
             return [std_events.Freeze(self.game, self.owner, event.target)]
 
     def __init__(self, *args, **kwargs):
@@ -104,6 +104,10 @@ class 暗鳞先知(Minion):
     }
 
     class Aura_暗鳞先知(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+        target_types = [Type.Minion]
+
         def check_entity(self, entity, **kwargs):
             return entity.zone == Zone.Play and entity.type == Type.Minion and \
                    entity.player_id == self.owner.player_id and Race.Murloc in entity.race and entity is not self.owner
@@ -253,6 +257,10 @@ class 团队领袖(Minion):
     }
 
     class Aura_团队领袖(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+        target_types = [Type.Minion]
+
         def check_entity(self, entity, **kwargs):
             return entity.zone == Zone.Play and entity.type == Type.Minion and \
                    entity.player_id == self.owner.player_id and entity is not self.owner
@@ -386,10 +394,9 @@ class 古拉巴什狂暴者(Minion):
 
     class Trig_古拉巴什狂暴者(std_triggers.AttachedTrigger):
         respond = [std_events.Damage]
+        target_is_self = True
 
         def process(self, event: respond[0]):
-            if event.target is not self.owner:
-                return []
             # The oop of the enchantment is the oop of damage event.
             Enc_古拉巴什狂暴者.from_card(event, self.game, self.owner)
             return []
@@ -511,6 +518,10 @@ class 暴风城勇士(Minion):
     }
 
     class Aura_暴风城勇士(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+        target_types = [Type.Minion]
+
         def __init__(self, *args, **kwargs):
             super().__init__(*args, **kwargs)
 
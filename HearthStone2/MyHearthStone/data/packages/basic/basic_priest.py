@@ -1,8 +1,6 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
-import random
-
 from MyHearthStone import ext
 from MyHearthStone.ext import Minion, Spell, Hero, HeroPower
 from MyHearthStone.ext import std_events, std_triggers
@@ -81,7 +79,7 @@ class 心灵视界(Spell):
         opp_hand = self.game.get_zone(Zone.Hand, 1 - self.player_id)
         if not opp_hand:
             return []
-        copy_target = random.choice(opp_hand)
+        copy_target = self.game.rng.choice(opp_hand)
         return std_events.copy_events(self.game, copy_target, self.player_id, Zone.Hand, 'last')
 
 
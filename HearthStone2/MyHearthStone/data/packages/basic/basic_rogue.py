@@ -159,7 +159,7 @@ class 消失(Spell):
         events = []
         for t in targets:
             _, status = self.game.move(t.player_id, t.zone, t, t.player_id, Zone.Hand, 'last')
-            events.append(status['events'])
+            events.extend(status['events'])
         return events
 
 
@@ -1,8 +1,6 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
-from random import choice
-
 from MyHearthStone import ext
 from MyHearthStone.ext import Minion, Spell, Hero, HeroPower
 from MyHearthStone.ext import Enchantment, Aura, AuraEnchantment
@@ -53,7 +51,8 @@ class 图腾召唤(HeroPower):
         return super_result
 
     def run(self, target, **kwargs):
-        return std_events.pure_summon_events(self.game, choice(self._candidates()), self.player_id, 'last')
+        totem_id = self.game.rng.choice(self._candidates())
+        return std_events.pure_summon_events(self.game, totem_id, self.player_id, 'last')
 
 
 # 火舌图腾 (70000) *
@@ -68,6 +67,9 @@ class 火舌图腾(Minion):
     }
 
     class Aura_火舌图腾(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+
         def __init__(self, game, owner):
             super().__init__(game, owner)
             self.location = None
@@ -273,10 +275,9 @@ class 治疗图腾(Minion):
 
     class Trig_治疗图腾(std_triggers.AttachedTrigger):
         respond = [std_events.EndOfTurn]
+        friendly_only = True
 
         def process(self, event: respond[0]):
-            if event.player_id != self.owner.player_id:
-                return []
             targets = self.game.get_zone(Zone.Play, self.owner.player_id)
             return [std_events.AreaHealing(self.game, self.owner, targets, [1 for _ in targets])]
 
@@ -1,8 +1,6 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
-from random import choice
-
 from MyHearthStone import ext
 from MyHearthStone.ext import Minion, Spell, Hero, HeroPower
 from MyHearthStone.ext import std_events
@@ -52,7 +50,7 @@ class 魅魔(Minion):
     }
 
     def run_battlecry(self, target, **kwargs):
-        target = choice(self.game.get_zone(Zone.Hand, self.player_id))
+        target = self.game.rng.choice(self.game.get_zone(Zone.Hand, self.player_id))
         return [std_events.DiscardCard(self.game, self, target)]
 
 
@@ -113,7 +111,7 @@ class 灵魂之火(Spell):
     ext.add_dh_bonus_data(data, 4)
 
     def run(self, target, **kwargs):
-        discard_target = choice(self.game.get_zone(Zone.Hand, self.player_id))
+        discard_target = self.game.rng.choice(self.game.get_zone(Zone.Hand, self.player_id))
         return [std_events.Damage(self.game, self, target, self.dh_values[0]),
                 std_events.DiscardCard(self.game, self, discard_target)]
 
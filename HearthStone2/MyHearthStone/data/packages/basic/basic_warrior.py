@@ -1,8 +1,6 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
-import random
-
 from MyHearthStone import ext
 from MyHearthStone.ext import Minion, Spell, Hero, HeroPower
 from MyHearthStone.ext import Enchantment, AuraEnchantment, Aura, enc_common
@@ -46,6 +44,10 @@ class 战歌指挥官(Minion):
     }
 
     class Aura_战歌指挥官(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+        target_types = [Type.Minion]
+
         def check_entity(self, entity, **kwargs):
             return entity.zone == Zone.Play and entity.type == Type.Minion and \
                    entity.player_id == self.owner.player_id and entity.charge
@@ -132,7 +134,7 @@ class 顺劈斩(Spell):
         elif len(zone) < 2:
             real_targets = zone
         else:
-            real_targets = random.sample(zone, 2)
+            real_targets = self.game.rng.sample(zone, 2)
         return [std_events.AreaDamage(self.game, self, real_targets, [self.dh_values[0] for _ in real_targets])]
 
 
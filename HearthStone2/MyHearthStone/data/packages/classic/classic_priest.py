@@ -5,7 +5,7 @@ from MyHearthStone import ext
 from MyHearthStone.ext import Minion, Spell, Hero, HeroPower
 from MyHearthStone.ext import Aura
 from MyHearthStone.ext import std_events
-from MyHearthStone.utils.game import Type, DHBonusType, DHBonusEventType, AuraType
+from MyHearthStone.utils.game import Type, Zone, DHBonusType, DHBonusEventType, AuraType
 
 __author__ = 'fyabc'
 
@@ -37,6 +37,9 @@ class 先知维伦(Minion):
 
     class Aura_先知维伦(Aura):
         type = AuraType.Other
+        target_zones = [Zone.Invalid]
+        target_players = 'friendly'
+        target_types = [Type.Player]
 
         def check_entity(self, entity, **kwargs):
             return entity.type == Type.Player and entity.player_id == self.owner.player_id
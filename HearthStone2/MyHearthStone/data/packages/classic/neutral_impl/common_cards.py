@@ -144,6 +144,9 @@ class 恐狼前锋(Minion):
     }
 
     class Aura_恐狼前锋(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+
         def __init__(self, game, owner):
             super().__init__(game, owner)
             self.location = None
@@ -175,6 +178,9 @@ class 阿曼尼狂战士(Minion):
     }
 
     class Aura_阿曼尼狂战士(Aura):
+        target_zones = [Zone.Play]
+        target_players = 'friendly'
+
         def check_entity(self, entity, **kwargs):
             return entity is self.owner
 
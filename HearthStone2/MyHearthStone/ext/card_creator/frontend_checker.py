@@ -15,6 +15,7 @@ Contains:
 
 from itertools import chain
 
+from ...game.player_operation import target_filter
 from ...utils.game import Type, Zone, Race, order_of_play
 
 __author__ = 'fyabc'
@@ -84,6 +85,7 @@ def make_conditional_targeted_po_tree(cond_fn, data_key='po_tree'):
 
 # Target checkers.
 
+@target_filter(zones=(Zone.Play,))
 def checker_minion(self, target, **kwargs):
     if not super(type(self), self).check_target(target, **kwargs):
         return False
@@ -92,6 +94,7 @@ def checker_minion(self, target, **kwargs):
     return True
 
 
+@target_filter(players='friendly')
 def checker_friendly_character(self, target, **kwargs):
     if not super(type(self), self).check_target(target, **kwargs):
         return False
@@ -100,6 +103,7 @@ def checker_friendly_character(self, target, **kwargs):
     return True
 
 
+@target_filter(zones=(Zone.Play,), players='friendly')
 def checker_friendly_minion(self, target, **kwargs):
     if not super(type(self), self).check_target(target, **kwargs):
         return False
@@ -110,6 +114,7 @@ def checker_friendly_minion(self, target, **kwargs):
     return True
 
 
+@target_filter(players='enemy')
 def checker_enemy_character(self, target, **kwargs):
     if not super(type(self), self).check_target(target, **kwargs):
         return False
@@ -118,6 +123,7 @@ def checker_enemy_character(self, target, **kwargs):
     return True
 
 
+@target_filter(zones=(Zone.Play,), players='enemy')
 def checker_enemy_minion(self, target, **kwargs):
     if not super(type(self), self).check_target(target, **kwargs):
         return False
@@ -128,6 +134,7 @@ def checker_enemy_minion(self, target, **kwargs):
     return True
 
 
+@target_filter(zones=(Zone.Hand,), players='friendly')
 def checker_my_hand(self, target, **kwargs):
     """The target checker of my hand.
 
@@ -301,6 +308,7 @@ def action_target_checker_factory_cond_minion(cond_fn):
                 msg_fn('No valid target, I can\'t use it!')
             return self.Inactive
 
+    @target_filter(zones=(Zone.Play,))
     def check_target(self, target, **kwargs):
         if not checker_minion(self, target, **kwargs):
             return False
@@ -5,7 +5,7 @@
 
 from .game_entity import IndependentEntity, make_property
 from .alive_mixin import AliveMixin
-from .player_operation import CommonTrees, translate_po_tree
+from .player_operation import CommonTrees, translate_po_tree, target_filter
 from ..utils.game import Zone, Type
 
 __author__ = 'fyabc'
@@ -36,6 +36,18 @@ class Card(IndependentEntity):
             'cost': self.cls_data['cost'],
         })
 
+    # Tags that may change the spell power of players (None means all tags are cleared).
+    _SpellPowerTags = frozenset(['zone', 'player_id', None])
+
+    def _on_tag_changed(self, tag):
+        super()._on_tag_changed(tag)
+
+        # Moving a card without spell power (both current and original value are 0) does not change spell power.
+        if tag == 'spell_power' or (
+                tag in self._SpellPowerTags and (self.spell_power or self.cls_data['spell_power'])):
+            for player in self.game.players:
+                player.invalidate_spell_power()
+
     type = make_property('type', setter=False)
     klass = make_property('klass', setter=False)
     rarity = make_property('rarity', setter=False)
@@ -65,6 +77,7 @@ class Card(IndependentEntity):
     def cost(self, value):
         self.data['cost'] = value
 
+    @target_filter(exact=True)
     def check_target(self, target: IndependentEntity, **kwargs):
         """Check the validity of the target."""
 
@@ -0,0 +1,79 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Version counters of game entities.
+
+The tracker has a game-level version counter that increases whenever an entity is changed
+(a tag is changed, it is moved, or an enchantment is attached or detached). The changed entity records the version
+of its last change (``GameEntity.state_version``), so caches built on entities (rendered descriptions,
+sprite contents, AI features, etc.) can store the version and be invalidated precisely.
+
+[NOTE]: Versions are never restored: after a rollback (or in a forked game), the ``floor`` of the tracker is raised,
+all entities are considered as changed at that version. So a version is never reused for different states.
+"""
+
+__author__ = 'fyabc'
+
+
+class ChangeTracker:
+    """The game-level version counter and the log of changed entities."""
+
+    __slots__ = ('version', 'floor', '_changed')
+
+    def __init__(self):
+        # The current version (version of the last change).
+        self.version = 0
+        # All entities are considered as changed at this version.
+        self.floor = 0
+        # Dict of entity -> version of its last change, in order of the version.
+        self._changed = {}
+
+    def touch(self, entity):
+        """Record a change of the entity.
+
+        :param entity: The changed entity.
+        :return: The new version.
+        """
+        version = self.version = self.version + 1
+        entity._state_version = version
+        changed = self._changed
+        if entity in changed:
+            del changed[entity]
+        changed[entity] = version
+        return version
+
+    def reset(self):
+        """Consider all entities as changed (called after rollback or fork)."""
+        version = self.version = self.version + 1
+        self.floor = version
+        self._changed = {}
+        return version
+
+    def changed_since(self, version):
+        """Get entities changed after the version.
+
+        :param version: The version.
+        :return: List of changed entities (latest first), or None if all entities are considered as changed.
+        """
+        if version < self.floor:
+            return None
+        result = []
+        for entity, entity_version in reversed(self._changed.items()):
+            if entity_version <= version:
+                break
+            result.append(entity)
+        return result
+
+    def copy(self):
+        """Copy the tracker for a forked game. The copied tracker only has the version counter."""
+        result = ChangeTracker()
+        result.version = result.floor = self.version
+        return result
+
+    def __repr__(self):
+        return 'ChangeTracker(version={}, floor={}, changed={})'.format(self.version, self.floor, len(self._changed))
+
+
+__all__ = [
+    'ChangeTracker',
+]
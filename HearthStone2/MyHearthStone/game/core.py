@@ -2,11 +2,21 @@
 # -*- coding: utf-8 -*-
 
 import random
+from bisect import bisect_left, insort
+from copy import deepcopy
 from typing import *
 
+from .change_tracker import ChangeTracker
+from .event_log import EventLog
+from .event_resolver import resolve_events_iterative
+from .fork import fork_game
 from .game_entity import IndependentEntity, make_property
+from .journal import Journal, journal_save
+from .legal_actions import get_legal_actions
 from .player import Player
 from .player_action import process_special_pa
+from .state_hash import state_hash
+from .trigger_dispatch import DispatchEntry
 from .triggers.trigger import Trigger
 from .events.standard import game_begin_standard_events, DeathPhase, create_death_event
 from .events.event import Event
@@ -33,6 +43,19 @@ class Game:
         Finished = 2
 
     def __init__(self, **kwargs):
+        # Journal of state changes, used by ``checkpoint()`` and ``rollback()``.
+        # None if not in journal mode (changes are not recorded).
+        self.journal = Journal() if kwargs.pop('journal', C.Game.Journal) else None
+
+        # Random seed and random number generator of the game.
+        # All random effects of the game (shuffles, random targets, etc.) must use ``self.rng``,
+        # so the game can be re-run with the same seed, and games in one process do not affect each other.
+        # If the seed is not given, get it from the global random module.
+        self.seed = kwargs.pop('seed', None)
+        if self.seed is None:
+            self.seed = random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+
         #############
         # Game data #
         #############
@@ -70,6 +93,38 @@ class Game:
         # Their granted enchantments will be removed at next aura update step.
         self.removed_auras = {t: set() for t in AuraType.Idx2Str}   # type: Dict[int, Set]
 
+        # Aura update mode: 'full', 'incremental' or 'verify'.
+        #   full: Process all auras on all entities in each aura update.
+        #   incremental: Only process changed entities and changed auras.
+        #   verify: Run incremental update, and check it against a full update on a copy of the game (very slow).
+        self.aura_update_mode = kwargs.pop('aura_update_mode', C.Game.AuraUpdateMode)
+        if self.aura_update_mode not in ('full', 'incremental', 'verify'):
+            raise ValueError('Unknown aura update mode {!r}'.format(self.aura_update_mode))
+        # Fast mode: skip all event/trigger messages and debug messages of the engine (no string formatting),
+        # and do not record the event history by default. Used by headless simulations and servers.
+        self.fast = kwargs.pop('fast', C.Game.Fast)
+        # Record all resolved events into ``self.event_history`` or not.
+        self.record_history = kwargs.pop('history', not self.fast)
+        # Maximum number of kept event records, None means unbounded.
+        history_max = kwargs.pop('history_max', C.Game.EventHistoryMax)
+
+        # Event resolver: 'recursive' or 'iterative'.
+        #   recursive: ``resolve_events`` and ``resolve_triggers`` call each other recursively.
+        #   iterative: Resolve events and triggers with an explicit stack of frames (see ``event_resolver``).
+        self.event_resolver = kwargs.pop('event_resolver', C.Game.EventResolver)
+        if self.event_resolver not in ('recursive', 'iterative'):
+            raise ValueError('Unknown event resolver {!r}'.format(self.event_resolver))
+
+        # Version counters of entities, see ``change_tracker``.
+        self.change_tracker = ChangeTracker()
+
+        # Entities changed (moved, tags changed, enchantments attached or detached) since last aura update.
+        self._aura_dirty = {t: set() for t in AuraType.Idx2Str}     # type: Dict[int, Set]
+        # Auras that have been registered since last aura update step.
+        self._new_auras = {t: set() for t in AuraType.Idx2Str}      # type: Dict[int, Set]
+        # Entity locations in last aura update.
+        self._aura_locations = {t: {} for t in AuraType.Idx2Str}    # type: Dict[int, Dict]
+
         # Contains arbitrary data (need it?)
         self.data = self._init_data()
 
@@ -82,6 +137,14 @@ class Game:
         # Dict values are sets of triggers.
         self.triggers = {}
 
+        # Dispatch index of triggers, built lazily from ``self.triggers``.
+        # Dict keys are (concrete event class, timing).
+        # Dict values are ``DispatchEntry`` of all triggers that respond to the event class or any of its ancestors,
+        # sorted in order of play and indexed by declarative filters.
+        # Entries are invalidated when triggers are registered or removed, or when oops or player ids of their owners
+        # are changed.
+        self._trigger_dispatch = {}
+
         # Resolve callbacks and game end callbacks.
         self.callbacks = {
             'event': [],
@@ -109,35 +172,109 @@ class Game:
         # Summon event cache.
         self.summon_events = set()
 
-        # All history events. Store in `Event` instance or its string representation?
-        self.event_history = []
+        # Records of all history events (only recorded if ``self.record_history``), see ``event_log``.
+        self.event_history = EventLog(history_max)
 
     ########################
     # Event engine methods #
     ########################
 
+    def __setattr__(self, key, value):
+        journal = self.__dict__.get('journal')
+        if journal is not None:
+            journal.save_attr(self, key)
+        object.__setattr__(self, key, value)
+
     def register_trigger(self, trigger):
         for event_type, timing in zip(trigger.respond, trigger.timing):
             if (event_type, timing) not in self.triggers:
+                journal_save(self, self.triggers)
                 self.triggers[event_type, timing] = set()
-            debug('Register trigger {} to event type {} and timing "{}"'.format(
-                trigger, event_type.__name__, 'Before' if timing == trigger.Before else 'After'))
+            if not self.fast:
+                debug('Register trigger {} to event type {} and timing "{}"'.format(
+                    trigger, event_type.__name__, 'Before' if timing == trigger.Before else 'After'))
+            journal_save(self, self.triggers[event_type, timing])
             self.triggers[event_type, timing].add(trigger)
+            self._invalidate_trigger_dispatch(event_type, timing)
 
     def remove_trigger(self, trigger):
         for event_type, timing in zip(trigger.respond, trigger.timing):
             if (event_type, timing) in self.triggers:
-                debug('Remove trigger {} from event type {} and timing "{}"'.format(
-                    trigger, event_type.__name__, 'Before' if timing == trigger.Before else 'After'))
+                if not self.fast:
+                    debug('Remove trigger {} from event type {} and timing "{}"'.format(
+                        trigger, event_type.__name__, 'Before' if timing == trigger.Before else 'After'))
+                journal_save(self, self.triggers[event_type, timing])
                 self.triggers[event_type, timing].discard(trigger)
+                self._invalidate_trigger_dispatch(event_type, timing)
 
     def _remove_dead_triggers(self):
-        for key, triggers in self.triggers.items():
-            self.triggers[key] = {trigger for trigger in triggers if trigger.enable}
+        for (event_type, timing), triggers in self.triggers.items():
+            dead_triggers = [trigger for trigger in triggers if not trigger.enable]
+            if not dead_triggers:
+                continue
+            journal_save(self, triggers)
+            triggers.difference_update(dead_triggers)
+            self._invalidate_trigger_dispatch(event_type, timing)
+
+    def refresh_triggers(self, triggers):
+        """Refresh the order and the filter index of triggers after the oop or the player id of their owner is changed.
+
+        :param triggers: Iterable of triggers (registered or not).
+        """
+        for trigger in triggers:
+            for event_type, timing in zip(trigger.respond, trigger.timing):
+                self._invalidate_trigger_dispatch(event_type, timing)
+
+    def _invalidate_trigger_dispatch(self, event_type, timing):
+        """Invalidate dispatch entries of all event classes that are ``event_type`` or its subclasses."""
+        dispatch = self._trigger_dispatch
+        if not dispatch:
+            return
+        for key in [k for k in dispatch if k[1] == timing and issubclass(k[0], event_type)]:
+            del dispatch[key]
+
+    def get_dispatch_entry(self, event_class, timing):
+        """Get the dispatch entry of all registered triggers that respond to the event class
+        (or any of its ancestors) at the timing.
+
+        The result is cached by the concrete event class, so in most cases the lookup is a single dict hit.
+        Triggers are sorted in order of play when the entry is built, so triggers of an event are queued
+        without sorting.
+
+        :param event_class: The concrete event class.
+        :param timing: ``Trigger.Before`` or ``Trigger.After``.
+        :return: The dispatch entry.
+        :rtype: DispatchEntry
+        """
+        key = event_class, timing
+        try:
+            return self._trigger_dispatch[key]
+        except KeyError:
+            pass
+
+        related_triggers = set()
+        for event_type in event_class.ancestors():
+            related_triggers.update(self.triggers.get((event_type, timing), ()))
+        result = self._trigger_dispatch[key] = DispatchEntry(order_of_play(related_triggers))
+        return result
+
+    def get_dispatch_triggers(self, event_class, timing):
+        """Get all registered triggers that respond to the event class (or any of its ancestors) at the timing.
+
+        See ``get_dispatch_entry``.
+
+        :return: Tuple of triggers, sorted in order of play.
+        :rtype: tuple
+        """
+        return self.get_dispatch_entry(event_class, timing).triggers
 
     def register_aura(self, aura):
-        debug('Register aura {} of type {}'.format(aura, AuraType.Idx2Str[aura.type]))
+        if not self.fast:
+            debug('Register aura {} of type {}'.format(aura, AuraType.Idx2Str[aura.type]))
+        journal_save(self, self.auras[aura.type])
+        journal_save(self, self._new_auras[aura.type])
         self.auras[aura.type].add(aura)
+        self._new_auras[aura.type].add(aura)
 
     def remove_aura(self, aura):
         """Remove an aura.
@@ -147,9 +284,74 @@ class Game:
             Auras are not recalculated due to minions leaving play or
             due to minions being stolen in the middle of a Phase.
         """
-        debug('Remove aura {} of type {}'.format(aura, AuraType.Idx2Str[aura.type]))
+        if not self.fast:
+            debug('Remove aura {} of type {}'.format(aura, AuraType.Idx2Str[aura.type]))
+        journal_save(self, self.auras[aura.type])
+        journal_save(self, self.removed_auras[aura.type])
+        journal_save(self, self._new_auras[aura.type])
         self.auras[aura.type].discard(aura)
         self.removed_auras[aura.type].add(aura)
+        self._new_auras[aura.type].discard(aura)
+
+    def mark_changed(self, entity):
+        """Mark the entity as changed (moved, tags changed, enchantments attached or detached).
+
+        Increase the version of the entity, mark it for the next incremental aura update,
+        and invalidate the cached state hash of its zone.
+        """
+        self.change_tracker.touch(entity)
+        self.mark_aura_dirty(entity)
+
+        player_id = entity.player_id
+        if player_id is not None:
+            player = self.players[player_id]
+            # The player may be not created yet (when creating entities of the player).
+            zone_list = None if player is None else player.zones[entity.zone]
+            if zone_list is not None and zone_list._hash is not None:
+                journal = self.journal
+                if journal is not None:
+                    journal.save_slot(zone_list, '_hash')
+                zone_list._hash = None
+
+    @property
+    def state_version(self):
+        """The current version of the game state, see ``change_tracker``."""
+        return self.change_tracker.version
+
+    def changed_since(self, version):
+        """Get entities changed after the version.
+
+        If the version is older than the last rollback (or fork), all entities of ``get_all_entities`` are returned.
+
+        :param version: The version, such as ``game.state_version`` or ``entity.state_version``.
+        :return: List of changed entities.
+        :rtype: list
+        """
+        result = self.change_tracker.changed_since(version)
+        if result is None:
+            result = list(self.get_all_entities())
+        return result
+
+    def state_hash(self):
+        """Get the 64-bit Zobrist hash of the game state.
+
+        Equal game states (tags, enchantments, deathrattles and locations of entities, tags of players,
+        the current player and the number of turns) have equal hashes, also across processes
+        (so it can be used to detect desyncs and verify replays).
+        The hash is maintained incrementally, so the cost is O(changes) since the last call. See ``state_hash``.
+
+        :return: The hash.
+        :rtype: int
+        """
+        return state_hash(self)
+
+    def mark_aura_dirty(self, entity):
+        """Mark the entity as changed, it will be processed in the next incremental aura update."""
+        journal = self.journal
+        for dirty in self._aura_dirty.values():
+            if journal is not None:
+                journal.save(dirty)
+            dirty.add(entity)
 
     def add_callback(self, callback, when='resolve'):
         """Add a callback as a hook in the processing of the system.
@@ -190,6 +392,10 @@ class Game:
         except KeyError:
             raise ValueError('Unknown when {!r}'.format(when))
 
+    def get_legal_actions(self, all_positions=True):
+        """Get all legal player actions of the current player. See ``legal_actions.get_legal_actions``."""
+        return get_legal_actions(self, all_positions=all_positions)
+
     def run_player_action(self, player_action):
         # TODO: Change this, return final event list, executed by clients (with animations) slowly.
         # May each client maintains a copy of the game core?
@@ -200,7 +406,8 @@ class Game:
         # Check special player actions here.
         stop = process_special_pa(self, player_action)
         if stop:
-            info('Player action {} is special and does not resolve events.'.format(player_action))
+            if not self.fast:
+                info('Player action {} is special and does not resolve events.'.format(player_action))
             return
 
         self.resolve_events(player_action.phases(), 0)
@@ -210,14 +417,17 @@ class Game:
         return self.game_result
 
     def _collect_resolve_triggers(self, event, timing, depth):
-        """Collect related triggers, then check their conditions and sort them in order of play.
+        """Collect related triggers (already sorted in order of play), then check their conditions.
 
         Then resolve them.
         """
-        related_triggers = set()
-        for event_type in event.ancestors():
-            related_triggers.update(self.triggers.get((event_type, timing), set()))
-        triggers_queue = order_of_play({trigger for trigger in related_triggers if trigger.queue_condition(event)})
+        entry = self.get_dispatch_entry(type(event), timing)
+
+        # Events with no listeners skip the trigger collection completely.
+        if not entry:
+            return
+
+        triggers_queue = [trigger for trigger in entry.candidates(event) if trigger.queue_condition(event)]
         if triggers_queue:
             self.resolve_triggers(triggers_queue, event, depth=depth + 1)
 
@@ -231,6 +441,10 @@ class Game:
         :return:
         """
 
+        if self.event_resolver == 'iterative':
+            resolve_events_iterative(self, events, depth)
+            return
+
         if self.state != self.GameState.Main:
             return
         if self.game_result is not None:
@@ -252,11 +466,13 @@ class Game:
                     cons_events = e.do()
 
                     # TODO: Log disabled events or not?
-                    e.message()
-                    self.event_history.append(e)
+                    if not self.fast:
+                        e.message()
+                    if self.record_history:
+                        self.event_history.record(e, depth, self.journal)
                 else:
                     cons_events = None
-                if e.enable:
+                if e.enable and self.callbacks['event']:
                     for callback in self.callbacks['event']:
                         callback(e)
 
@@ -270,8 +486,9 @@ class Game:
                 # Check for stopping subsequent phases.
                 if self._stop_subsequent_phases:
                     self._stop_subsequent_phases = False
-                    debug('{} phases stopped'.format(len(events) - i - 1))
-                    debug(events[i + 1:])
+                    if not self.fast:
+                        debug('{} phases stopped'.format(len(events) - i - 1))
+                        debug(events[i + 1:])
                     del events[i + 1:]
 
                 # Only the outermost Phase ending begins the Aura Update and Death Creation Step.
@@ -321,7 +538,7 @@ class Game:
             # Callback after each event (maybe useless, only need to call after triggers?)
             # [NOTE]: These calls are after the all processing of events (just before idle),
             # so user will always see the up-to-date result.
-            if isinstance(e, Event):
+            if isinstance(e, Event) and self.callbacks['resolve']:
                 for callback in self.callbacks['resolve']:
                     callback(e, None)
 
@@ -351,21 +568,25 @@ class Game:
                 return
 
             new_queue = t.process(current_event)
-            t.message(current_event)
-            for callback in self.callbacks['trigger']:
-                callback(t, current_event)
+            if not self.fast:
+                t.message(current_event)
+            if self.callbacks['trigger']:
+                for callback in self.callbacks['trigger']:
+                    callback(t, current_event)
 
             if new_queue:
                 self.resolve_events(new_queue, depth + 1)
 
-            for callback in self.callbacks['resolve']:
-                callback(t, current_event)
+            if self.callbacks['resolve']:
+                for callback in self.callbacks['resolve']:
+                    callback(t, current_event)
             i += 1
 
     def _summon_resolution(self):
         """Resolve all summon events in order of play."""
 
         result = order_of_play(self.summon_events)
+        journal_save(self, self.summon_events)
         self.summon_events.clear()
 
         return result
@@ -401,9 +622,13 @@ class Game:
         # Recalculate minion death locations by order-of-play.
         # TODO: Need test here.
         for death_minion in death_minions:
-            for i, death_pair in enumerate(death_minion):
+            # Sorted oops of minions on the left.
+            left_oops = []
+            for death_pair in death_minion:
+                oop = death_pair[0].oop
                 # Number of minions died before this minion that will affect the location
-                n_pre_died = sum(int(d[0].oop < death_pair[0].oop) for d in death_minion[:i])
+                n_pre_died = bisect_left(left_oops, oop)
+                insort(left_oops, oop)
                 death_pair[1] -= n_pre_died
             deaths.extend(death_minion)
 
@@ -425,6 +650,7 @@ class Game:
 
         # Add instant removal death events.
         death_events = order_of_play(death_events + self.data['instant_death_events'], key=lambda o: o.owner.oop)
+        journal_save(self, self.data['instant_death_events'])
         self.data['instant_death_events'].clear()
 
         return death_events
@@ -440,36 +666,186 @@ class Game:
             Then, every Entity's Health and Attack values are recalculated.
         """
 
-        debug('Running aura update (attack/health)')
-        self._aura_update_shared(AuraType.AttackHealth)
-
-        # Update enchantments for all entities.
-        for entity in self.get_all_entities():
-            if isinstance(entity, IndependentEntity):
-                entity.aura_update_attack_health()
+        if not self.fast:
+            debug('Running aura update (attack/health)')
+        self._run_aura_update(AuraType.AttackHealth)
 
     def _aura_update_other(self):
-        debug('Running aura update (other)')
-        self._aura_update_shared(AuraType.Other)
+        if not self.fast:
+            debug('Running aura update (other)')
+        self._run_aura_update(AuraType.Other)
+
+    def _run_aura_update(self, aura_type):
+        mode = self.aura_update_mode
+        if mode == 'full':
+            self._aura_update_full(aura_type)
+        elif mode == 'incremental':
+            self._aura_update_incremental(aura_type)
+        else:
+            self._aura_update_verify(aura_type)
 
-    def _aura_update_shared(self, aura_type):
-        auras = self.auras[aura_type]
+    def _aura_update_verify(self, aura_type):
+        """Run incremental aura update, and check the result with a full aura update on a copy of the game.
+
+        [NOTE]: This is very slow, only used for debugging and tests.
+        """
+        # Callbacks may refer to frontend objects, do not copy them.
+        memo = {id(self.callbacks): self.callbacks}
+        shadow = deepcopy(self, memo)
+        shadow._aura_update_full(aura_type)
+
+        self._aura_update_incremental(aura_type)
+
+        def _map(o):
+            return memo.get(id(o), o)
+
+        diff = []
+        for entity, shadow_entity in zip(self.get_all_entities(), shadow.get_all_entities()):
+            assert _map(entity) is shadow_entity, 'Entity {} mismatch in aura verification'.format(entity)
+            tags = set(entity.entity_data) | set(shadow_entity.entity_data)
+            for tag in tags:
+                v, shadow_v = entity.entity_data.get(tag), shadow_entity.entity_data.get(tag)
+                if isinstance(v, (int, float, str, bool, type(None))) and v != shadow_v:
+                    diff.append((entity, tag, v, shadow_v))
+            # The order of aura enchantments depends on the granting history, compare them as sets.
+            sources = {_map(e.source) for e in entity.aura_enchantments}
+            shadow_sources = {e.source for e in shadow_entity.aura_enchantments}
+            if isinstance(entity, IndependentEntity) and {_map(a) for a in entity.aura_enchantment_map} != sources:
+                diff.append((entity, 'aura_enchantment_map', set(entity.aura_enchantment_map), sources))
+            if sources != shadow_sources:
+                diff.append((entity, 'aura_enchantments', sources, shadow_sources))
+        if diff:
+            raise RuntimeError('Incremental aura update ({}) mismatch (entity, tag, incremental, full): {}'.format(
+                AuraType.Idx2Str[aura_type], diff))
+
+    def _journal_aura_caches(self, aura_type):
+        """Save aura update caches into the journal, so they are consistent with the game state after rollback.
+
+        Dirty sets and location dicts are replaced (not changed) by the aura update, so only save the outer dicts.
+        """
+        journal = self.journal
+        if journal is not None:
+            journal.save(self._aura_dirty)
+            journal.save(self._new_auras[aura_type])
+            journal.save(self._aura_locations)
+
+    def _detach_removed_auras(self, aura_type):
         removed_auras = self.removed_auras[aura_type]
 
         # Detach granted enchantments of removed auras.
         for aura in removed_auras:
-            debug('Detaching enchantments granted by {}'.format(aura))
+            if not self.fast:
+                debug('Detaching enchantments granted by {}'.format(aura))
             aura.detach_granted_enchantments()
+        journal_save(self, removed_auras)
         removed_auras.clear()
 
+    def _aura_update_full(self, aura_type):
+        """Process all auras on all entities."""
+        self._journal_aura_caches(aura_type)
+        self._aura_dirty[aura_type] = set()
+        self._new_auras[aura_type].clear()
+
+        auras = self.auras[aura_type]
+        self._detach_removed_auras(aura_type)
+
         # For each entity, Scan all given auras to grant enchantments.
         for aura in auras:
             aura.prepare_update()
 
-        for location, entity in self.get_all_entities(yield_location=True):
+        all_entities = list(self.get_all_entities(yield_location=True))
+        self._aura_locations[aura_type] = {entity: location for location, entity in all_entities}
+
+        for location, entity in all_entities:
             for aura in auras:
                 aura.process_entity(entity, location=location)
 
+        if aura_type == AuraType.AttackHealth:
+            # Update enchantments for all entities.
+            for _, entity in all_entities:
+                if isinstance(entity, IndependentEntity):
+                    entity.aura_update_attack_health()
+
+    def _aura_update_incremental(self, aura_type):
+        """Only process (aura, entity) pairs that may be changed since last update.
+
+        An entity is changed if it is moved (including location changes in its zone), its tags are changed or
+        its enchantments are attached or detached. An aura is changed if it is newly registered or its owner is changed.
+
+        Changed auras are processed on all entities in their target zones (see ``Aura.target_keys``),
+        other auras are only processed on changed entities in their target zones.
+        Attack and health are recalculated only on changed entities (and entities marked ``aura_always_update``).
+        """
+        self._journal_aura_caches(aura_type)
+
+        # Swap the dirty set, so changes during this update will be processed in the next update.
+        dirty = self._aura_dirty[aura_type]
+        self._aura_dirty[aura_type] = set()
+        new_auras = self._new_auras[aura_type]
+
+        auras = self.auras[aura_type]
+        self._detach_removed_auras(aura_type)
+
+        for aura in auras:
+            aura.prepare_update()
+
+        all_entities = list(self.get_all_entities(yield_location=True))
+        old_locations = self._aura_locations[aura_type]
+        self._aura_locations[aura_type] = new_locations = {}
+        changed = set()
+        for location, entity in all_entities:
+            new_locations[entity] = location
+            if entity in dirty or old_locations.get(entity) != location:
+                changed.add(entity)
+
+        # Auras that need to be processed on all entities in their target zones:
+        # new auras, auras with changed owners and non-incremental auras.
+        full_auras = [aura for aura in auras if aura in new_auras or aura.owner in changed or not aura.incremental]
+        new_auras.clear()
+
+        if auras:
+            # Index auras by their target (player_id, zone).
+            aura_index = {}
+            for aura in auras:
+                for key in aura.target_keys():
+                    aura_index.setdefault(key, []).append(aura)
+
+            # Process changed entities on auras that target them or have granted enchantments to them.
+            for location, entity in all_entities:
+                if entity not in changed:
+                    continue
+                entity_auras = [
+                    aura for aura in aura_index.get((entity.player_id, entity.zone), ()) if aura.match_type(entity)]
+                if isinstance(entity, IndependentEntity):
+                    for source in entity.aura_enchantment_map:
+                        if source in auras and source not in entity_auras:
+                            entity_auras.append(source)
+                for aura in entity_auras:
+                    aura.process_entity(entity, location=location)
+
+            for aura in full_auras:
+                processed = set(changed)
+                for location, entity in self.get_zone_entities(aura.target_keys()):
+                    if entity not in processed:
+                        aura.process_entity(entity, location=location)
+                        processed.add(entity)
+                # Target zones may be changed with the owner, so also process granted entities out of them.
+                for entity in list(aura.granted):
+                    if entity in processed:
+                        continue
+                    location = new_locations.get(entity)
+                    if location is None:
+                        entity.remove_enchantment_by_aura(aura)
+                    else:
+                        aura.process_entity(entity, location=location)
+
+        if aura_type == AuraType.AttackHealth:
+            # Also update entities changed by the aura processing above.
+            changed.update(self._aura_dirty[aura_type])
+            for _, entity in all_entities:
+                if isinstance(entity, IndependentEntity) and (entity in changed or entity.aura_always_update):
+                    entity.aura_update_attack_health()
+
     #######################
     # Game system methods #
     #######################
@@ -500,10 +876,10 @@ class Game:
 
         self.mode = mode
         self.running = True
-        info('Start a new game: {}'.format(self))
+        info('Start a new game: {} (seed={})'.format(self, self.seed))
 
         # Select start player.
-        start_player = random.randint(0, 1)
+        start_player = self.rng.randint(0, 1)
 
         # Initialize some counters.
         self.n_turns = -1
@@ -512,6 +888,7 @@ class Game:
         self._stop_subsequent_phases = False
         self.players = [Player(self) for _ in range(2)]
         self.entity.oop = 0
+        self._trigger_dispatch.clear()
 
         for player_id, (player, deck, m) in enumerate(zip(self.players, decks, class_hero_maps)):
             player.start_game(deck, player_id, start_player, m)
@@ -588,6 +965,7 @@ class Game:
                 # Normal: change player
                 yield 1 - self.current_player
             else:
+                journal_save(self, self.player_buffer)
                 p = self.player_buffer.pop(0)
                 if p is None:
                     # `None` indicates the first turn of the game, do not change current player.
@@ -650,11 +1028,13 @@ class Game:
 
         if (from_zone, from_index) != (to_zone, to_index) and self.full(to_zone, to_player):
             if on_full == 'destroy':
-                debug('{} full, destroy the entity!'.format(Zone.repr_zp(to_zone, to_player)))
+                if not self.fast:
+                    debug('{} full, destroy the entity!'.format(Zone.repr_zp(to_zone, to_player)))
 
                 # Full zone instant removal:
                 # See <https://hearthstone.gamepedia.com/Advanced_rulebook#Full_Zone_Instant_Removal> for details.
                 if from_zone == Zone.Play:
+                    journal_save(self, self.data['instant_death_events'])
                     self.data['instant_death_events'].append(create_death_event(self, entity, location=from_index))
 
                     # Register deathrattles ([NOTE]: BEFORE the card moving)
@@ -672,7 +1052,8 @@ class Game:
                     'to_index': None,
                 }
             elif on_full == 'ignore':
-                debug('{} full, ignore this movement!'.format(Zone.repr_zp(to_zone, to_player)))
+                if not self.fast:
+                    debug('{} full, ignore this movement!'.format(Zone.repr_zp(to_zone, to_player)))
                 return entity, {
                     'success': False,
                     'events': [],
@@ -736,14 +1117,80 @@ class Game:
     def __repr__(self):
         return 'Game(mode={}, running={})'.format(self.mode, self.running)
 
+    def fork(self, journal=None):
+        """Fork the game, return an independent copy of it.
+
+        All entity, trigger and aura cross-references (including closures such as deathrattle functions)
+        are remapped to the new game.
+        Callbacks are not copied, and the forked game shares the event history (before the fork) with this game.
+        The change tracker of the forked game only keeps the version counter (see ``ChangeTracker.copy``).
+        This is much faster than ``copy.deepcopy`` or pickling, used by search-based AI.
+
+        :param journal: Run the forked game in journal mode or not, default is same as this game.
+            Search-based AI can fork once in journal mode, then rollback to try many actions.
+        :return: The forked game.
+        :rtype: Game
+        """
+        if journal is None:
+            journal = self.journal is not None
+        result = fork_game(
+            self, skip=('journal', '_player_iter', '_trigger_dispatch', 'callbacks'),
+            share=('event_history', 'change_tracker'))
+        # The forked game starts with an empty journal (if in journal mode).
+        # Set attributes before the journal, since ``__setattr__`` records them into the journal.
+        result._player_iter = result._player_generator()
+        result._trigger_dispatch = {}
+        result.callbacks = {when: [] for when in self.callbacks}
+        result.journal = Journal() if journal else None
+        return result
+
+    def checkpoint(self):
+        """Create a checkpoint of the game state, which can be restored by ``rollback``.
+
+        Only available in journal mode (``Game(journal=True)``).
+        Checkpoints are nested: rollback to a checkpoint invalidates all checkpoints created after it.
+
+        :return: The checkpoint.
+        :rtype: int
+        """
+        if self.journal is None:
+            raise RuntimeError('Checkpoint is only available in journal mode')
+        result = self.journal.checkpoint()
+        self.journal.save_state(self.rng)
+        return result
+
+    def rollback(self, checkpoint):
+        """Rollback the game state to the checkpoint.
+
+        The cost is O(changes after the checkpoint), much cheaper than ``fork``.
+        The checkpoint is still valid after rollback, so the game can be rolled back to it many times.
+
+        :param checkpoint: The checkpoint returned by ``checkpoint()``.
+        """
+        if self.journal is None:
+            raise RuntimeError('Rollback is only available in journal mode')
+        self.journal.rollback(checkpoint)
+        # The saved random state is popped by rollback, save it again for the next rollback.
+        self.journal.save_state(self.rng)
+
+        # The trigger dispatch index is not journaled, reset it.
+        self._trigger_dispatch.clear()
+        # Versions are not restored, consider all entities as changed.
+        self.change_tracker.reset()
+
     def __getstate__(self):
         state = self.__dict__.copy()
         del state['_player_iter']
+        del state['_trigger_dispatch']
+        # The journal is not copied, the copied game starts with an empty journal.
+        if state['journal'] is not None:
+            state['journal'] = Journal()
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
-        self._player_iter = self._player_generator()
+        self.__dict__['_player_iter'] = self._player_generator()
+        self.__dict__['_trigger_dispatch'] = {}
 
     def displayed_mana(self):
         return [player.displayed_mana() for player in self.players]
@@ -756,6 +1203,19 @@ class Game:
             for entity in player.get_all_entities(yield_location=yield_location):
                 yield entity
 
+    def get_zone_entities(self, keys):
+        """Iterate over entities in the given zones.
+
+        :param keys: Iterable of (player_id, zone). ``Zone.Invalid`` means the player entity itself.
+        :return: Iterator of (location, entity).
+        """
+        for player_id, zone in keys:
+            player = self.players[player_id]
+            if zone == Zone.Invalid:
+                yield 0, player
+            else:
+                yield from enumerate(player.get_zone(zone))
+
     def get_player(self, player_id):
         return self.players[player_id]
 
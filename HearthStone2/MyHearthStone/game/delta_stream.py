@@ -0,0 +1,275 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Structured stream of state deltas emitted by the game.
+
+The stream is attached to the 'resolve', 'game_start' and 'game_end' callbacks of the game.
+After each resolved step, it finds entities changed since the last step (see ``Game.changed_since``),
+compares them with their last snapshots, and emits minimal typed deltas. Frontends, servers and replay recorders
+can apply these deltas instead of re-reading the whole board.
+
+Each delta is a ``Delta(seq, type, handle, data)``:
+    seq: Sequence number of the delta in the stream (starts from 0).
+    type: Type of the delta, one of ``DeltaType``.
+    handle: Handle of the entity in the stream (an integer), or None for game-level deltas.
+    data: A dict of serializable values (contains only ``None``, booleans, numbers, strings, lists and dicts).
+
+Delta types:
+    create: A new entity is seen. Data: {'id', 'type', 'player_id', 'zone', 'tags'}.
+        Mana tags of players are emitted in the following 'mana' delta.
+    move: The zone or the player of the entity is changed. Data: {'player_id', 'zone'}.
+    zone: The entities (or their order) in a zone are changed. Data: {'player_id', 'zone', 'entities'}.
+    tag: A tag of the entity is changed. Data: {'tag', 'value'}.
+    enchant / detach: An enchantment is attached to / detached from the entity. Data: {'enchantment', 'id'}.
+    mana: Mana of the player is changed. Data: {'player_id', 'max_mana', 'used_mana', 'temp_mana',
+        'overload', 'overload_next'}.
+    result: The game is ended. Data: {'result'}.
+
+[NOTE]: Tags 'player_id' and 'zone' are only emitted in 'create' and 'move' deltas.
+[NOTE]: Tags with values that cannot be serialized (such as triggers) are not emitted.
+"""
+
+import json
+from collections import namedtuple
+
+from .enchantments.enchantment import Enchantment
+from .player import Player
+from ..utils.game import Zone
+
+__author__ = 'fyabc'
+
+Delta = namedtuple('Delta', ['seq', 'type', 'handle', 'data'])
+Delta.__doc__ = 'A state delta: (sequence number, delta type, entity handle, data dict).'
+
+
+class DeltaType:
+    Create = 'create'
+    Move = 'move'
+    Zone = 'zone'
+    Tag = 'tag'
+    Enchant = 'enchant'
+    Detach = 'detach'
+    Mana = 'mana'
+    Result = 'result'
+
+
+# Tags of players that are emitted in 'mana' deltas.
+_ManaTags = ('max_mana', 'used_mana', 'temp_mana', 'overload', 'overload_next')
+_ManaTagSet = frozenset(_ManaTags)
+
+# Tags that are emitted in 'move' deltas.
+_LocationTags = frozenset(['player_id', 'zone'])
+
+_PrimitiveTypes = (type(None), bool, int, float, str)
+_missing = object()
+
+
+def _serializable(value):
+    """Convert the tag value into a serializable value, or return ``_missing`` if it cannot be serialized."""
+    if isinstance(value, _PrimitiveTypes):
+        return value
+    if isinstance(value, (list, tuple, set, frozenset)) and all(isinstance(v, _PrimitiveTypes) for v in value):
+        return sorted(value) if isinstance(value, (set, frozenset)) else list(value)
+    return _missing
+
+
+class DeltaStream:
+    """The stream of state deltas of a game."""
+
+    def __init__(self, game, listeners=(), buffered=True):
+        """Create the stream and attach it to the game.
+
+        If the game is already started, the first step emits 'create' and 'zone' deltas of all entities.
+
+        :param game: The game.
+        :param listeners: Functions called with each emitted delta.
+        :param buffered: Keep emitted deltas until the next ``poll`` or not.
+            Set it to False if deltas are only consumed by listeners.
+        """
+        self.game = game
+        self.listeners = list(listeners)
+        self.buffered = buffered
+        self.seq = 0
+
+        # Buffered deltas since the last ``poll``.
+        self._buffer = []
+        # Handles of entities, and entities of handles.
+        self._handles = {}
+        self._entities = []
+        # Snapshots of entities: entity -> (player_id, zone, tags, enchantment handles).
+        self._snapshots = {}
+        # Snapshots of zones: (player_id, zone) -> tuple of entity handles.
+        self._zones = {}
+        # Changes after this version are not emitted yet. -1 means all entities.
+        self._version = -1
+
+        self._callbacks = [('resolve', self._on_resolve), ('game_start', self.flush), ('game_end', self._on_game_end)]
+        for when, callback in self._callbacks:
+            game.add_callback(callback, when)
+        if game.running:
+            self.flush()
+
+    def close(self):
+        """Detach the stream from the game."""
+        for when, callback in self._callbacks:
+            callbacks = self.game.callbacks[when]
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def poll(self):
+        """Flush changes, then return all deltas emitted since the last poll.
+
+        :return: List of deltas.
+        :rtype: list
+        """
+        self.flush()
+        result, self._buffer = self._buffer, []
+        return result
+
+    def _emit(self, delta_type, handle, data):
+        delta = Delta(self.seq, delta_type, handle, data)
+        self.seq += 1
+        if self.buffered:
+            self._buffer.append(delta)
+        for listener in self.listeners:
+            listener(delta)
+
+    def _on_resolve(self, event_or_trigger, current_event):
+        self.flush()
+
+    def _on_game_end(self, game_result):
+        self.flush()
+        self._emit(DeltaType.Result, None, {'result': game_result})
+
+    def _get_handle(self, entity):
+        handle = self._handles.get(entity)
+        if handle is None:
+            handle = self._handles[entity] = len(self._entities)
+            self._entities.append(entity)
+        return handle
+
+    def flush(self):
+        """Emit deltas of all entities changed since the last flush."""
+        game = self.game
+        changed = game.changed_since(self._version)
+        self._version = game.state_version
+        if not changed:
+            return
+
+        dirty_zones = set()
+        # Process entities in order of their changes (``changed_since`` returns latest first).
+        for entity in reversed(changed):
+            if isinstance(entity, Enchantment):
+                # Enchantments are emitted by 'enchant' and 'detach' deltas of their targets.
+                continue
+            self._diff_entity(entity, dirty_zones)
+
+        for key in sorted(dirty_zones):
+            self._diff_zone(*key)
+
+    def _diff_entity(self, entity, dirty_zones):
+        player_id, zone = entity.player_id, entity.zone
+        tags = {}
+        for tag, value in entity.data.entity_items():
+            if tag in _LocationTags:
+                continue
+            value = _serializable(value)
+            if value is not _missing:
+                tags[tag] = value
+        enchantments = tuple(self._get_handle(e) for e in getattr(entity, 'enchantments', ()))
+        enchantments += tuple(self._get_handle(e) for e in getattr(entity, 'aura_enchantments', ()))
+
+        old = self._snapshots.get(entity)
+        self._snapshots[entity] = player_id, zone, tags, enchantments
+        handle = self._get_handle(entity)
+        is_player = isinstance(entity, Player)
+
+        if old is None:
+            if is_player:
+                create_tags = {tag: value for tag, value in tags.items() if tag not in _ManaTagSet}
+            else:
+                create_tags = tags.copy()
+            self._emit(DeltaType.Create, handle, {
+                'id': entity.id, 'type': entity.type, 'player_id': player_id, 'zone': zone, 'tags': create_tags})
+            if is_player:
+                self._emit_mana(entity)
+            elif player_id is not None:
+                dirty_zones.add((player_id, zone))
+            return
+
+        old_player_id, old_zone, old_tags, old_enchantments = old
+        if (old_player_id, old_zone) != (player_id, zone):
+            self._emit(DeltaType.Move, handle, {'player_id': player_id, 'zone': zone})
+            if not is_player:
+                for key in ((old_player_id, old_zone), (player_id, zone)):
+                    if key[0] is not None:
+                        dirty_zones.add(key)
+
+        mana_changed = False
+        for tag in sorted(set(old_tags) | set(tags), key=str):
+            value = tags.get(tag, _missing)
+            if value == old_tags.get(tag, _missing):
+                continue
+            if is_player and tag in _ManaTagSet:
+                mana_changed = True
+                continue
+            if value is _missing:
+                # The entity-level tag is removed, emit the class-level value.
+                value = _serializable(entity.data.get(tag))
+                if value is _missing:
+                    continue
+            self._emit(DeltaType.Tag, handle, {'tag': tag, 'value': value})
+        if mana_changed:
+            self._emit_mana(entity)
+
+        if enchantments != old_enchantments:
+            old_set, new_set = set(old_enchantments), set(enchantments)
+            for e_handle in old_enchantments:
+                if e_handle not in new_set:
+                    self._emit(DeltaType.Detach, handle, {
+                        'enchantment': e_handle, 'id': self._entities[e_handle].id})
+            for e_handle in enchantments:
+                if e_handle not in old_set:
+                    self._emit(DeltaType.Enchant, handle, {
+                        'enchantment': e_handle, 'id': self._entities[e_handle].id})
+
+    def _emit_mana(self, player):
+        data = {'player_id': player.player_id}
+        for tag in _ManaTags:
+            data[tag] = getattr(player, tag)
+        self._emit(DeltaType.Mana, self._get_handle(player), data)
+
+    def _diff_zone(self, player_id, zone):
+        if zone == Zone.Invalid:
+            return
+        try:
+            entities = self.game.get_zone(zone, player_id)
+        except ValueError:
+            return
+        handles = tuple(self._get_handle(e) for e in entities)
+        key = player_id, zone
+        if self._zones.get(key) != handles:
+            self._zones[key] = handles
+            self._emit(DeltaType.Zone, None, {'player_id': player_id, 'zone': zone, 'entities': list(handles)})
+
+
+def dump_deltas(deltas):
+    """Serialize deltas into a JSON string."""
+    return json.dumps([list(delta) for delta in deltas])
+
+
+def load_deltas(s):
+    """Load deltas from a JSON string created by ``dump_deltas``."""
+    return [Delta(*delta) for delta in json.loads(s)]
+
+
+__all__ = [
+    'Delta',
+    'DeltaType',
+    'DeltaStream',
+    'dump_deltas',
+    'load_deltas',
+]
@@ -8,6 +8,10 @@ from ...utils.game import Zone, AuraType
 
 __author__ = 'fyabc'
 
+# All zones that are scanned by aura updates.
+# [NOTE]: ``Zone.Invalid`` means the player entity itself.
+_AllZones = (Zone.Invalid, Zone.Deck, Zone.Hand, Zone.Secret, Zone.Play, Zone.Weapon, Zone.Hero, Zone.HeroPower)
+
 
 class Aura:
     """Aura (also called ongoing effect).
@@ -26,10 +30,31 @@ class Aura:
     # Zones that this aura is active.
     zones = [Zone.Play]
 
+    # Can this aura be updated incrementally?
+    # In incremental aura updates, an aura is only processed on changed entities, unless its owner is changed.
+    # This requires that ``check_entity`` only depends on the entity, the owner and their locations.
+    # Set it to False if the aura depends on other entities (e.g. "If you control a Dragon, ..."),
+    # then it will be processed on all entities in each update.
+    incremental = True
+
+    # Zones, players and types of entities that this aura can affect.
+    # Aura updates only process entities in these zones, so ``check_entity`` must return False for other entities.
+    # None means no restriction (all zones, both players or all types).
+    #   target_zones: List of zones. ``Zone.Invalid`` means the player entity itself.
+    #   target_players: None, 'friendly' (the player of the owner) or 'enemy'.
+    #   target_types: List of types.
+    target_zones = None
+    target_players = None
+    target_types = None
+
     def __init__(self, game, owner):
         self.game = game
         self.owner = owner
 
+        # Enchantments granted by this aura, entity -> enchantment.
+        # It is the reverse index of ``IndependentEntity.aura_enchantment_map``.
+        self.granted = {}
+
         # Automatically add it to its owner.
         owner.add_aura(self)
 
@@ -41,9 +66,30 @@ class Aura:
         result = cp(self)
         if new_owner is not None:
             result.owner = new_owner
+        result.granted = {}
         # [NOTE]: Does not call ``add_aura`` here.
         return result
 
+    def target_keys(self):
+        """Get the (player_id, zone) pairs that this aura can affect.
+
+        :return: List of (player_id, zone).
+        """
+        zones = _AllZones if self.target_zones is None else self.target_zones
+        if self.target_players is None:
+            player_ids = (0, 1)
+        elif self.target_players == 'friendly':
+            player_ids = (self.owner.player_id,)
+        elif self.target_players == 'enemy':
+            player_ids = (1 - self.owner.player_id,)
+        else:
+            raise ValueError('Unknown target players {!r} of aura {}'.format(self.target_players, self))
+        return [(player_id, zone) for player_id in player_ids for zone in zones]
+
+    def match_type(self, entity):
+        """Check if the type of the entity can be affected by this aura."""
+        return self.target_types is None or entity.type in self.target_types
+
     def prepare_update(self):
         """Prepare the update of this aura, called by aura update methods of ``Game``.
 
@@ -94,7 +140,7 @@ class Aura:
         pass
 
     def detach_granted_enchantments(self):
-        for entity in self.game.get_all_entities():
+        for entity in list(self.granted):
             entity.remove_enchantment_by_aura(self)
 
     def __repr__(self):
@@ -3,6 +3,7 @@
 
 from .enchantment import Enchantment
 from ..game_entity import make_property
+from ..journal import journal_save
 
 __author__ = 'fyabc'
 
@@ -34,6 +35,7 @@ class DrEnchantment(Enchantment):
         del self._kw
 
         # Add the deathrattle trigger into dr_list.
+        journal_save(self.game, self.target.dr_list)
         self.target.dr_list.append(self.dr_trigger)
 
 
@@ -44,8 +44,8 @@ class Enchantment(GameEntity):
                 [NOTE]: This is different from ``self.owner.player_id``.
         :type kwargs: dict
         """
-        super().__init__(game)
         self.target = target
+        super().__init__(game)
 
         # The creator of this enchantment.
         self.creator = kwargs.pop('creator', None)
@@ -63,6 +63,12 @@ class Enchantment(GameEntity):
     def _repr(self):
         return super()._repr()
 
+    def _on_tag_changed(self, tag):
+        super()._on_tag_changed(tag)
+
+        # The target need to be updated when its enchantments are changed.
+        self.game.mark_changed(self.target)
+
     def copy(self, new_target=None):
         result = super().copy()
 
@@ -161,8 +167,9 @@ class AuraEnchantment(Enchantment):
     }
 
     def __init__(self, game, target: IndependentEntity, source, **kwargs):
-        super().__init__(game, target, **kwargs)
+        # Set the source before attached to the target, since the target will index it by the source.
         self._source = source
+        super().__init__(game, target, **kwargs)
 
     @property
     def source(self):
@@ -0,0 +1,157 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Compact event history of the game.
+
+The history stores structured records instead of ``Event`` objects, so it does not keep references to the game,
+entities (such as dead minions) and enchantments. Each record contains:
+    type: The event class.
+    owner, target: ``EntityRef`` of the owner and the target entity (or None).
+    value: Integer value of the event (damage, healing, etc.), or None.
+    turn: Turn number when the event is resolved.
+    depth: Depth of the event queue when the event is resolved (0 is the outermost phase).
+
+The log can be bounded (a ring buffer): only the latest ``max_len`` records are kept.
+Records have absolute indices (the index of the first record of the game is 0), consumers can use
+``iter_from`` to read new records since the last read.
+
+[NOTE]: In journal mode, rollback restores the number of records, but the oldest records dropped
+by a bounded log will not come back.
+"""
+
+from collections import namedtuple
+
+from .game_entity import GameEntity
+
+__author__ = 'fyabc'
+
+EntityRef = namedtuple('EntityRef', ['id', 'player_id', 'oop'])
+EntityRef.__doc__ = 'Reference of an entity in the event history: (card id, player id, order of play).'
+
+EventRecord = namedtuple('EventRecord', ['type', 'owner', 'target', 'value', 'turn', 'depth'])
+EventRecord.__doc__ = 'Record of a resolved event.'
+
+
+def entity_ref(entity):
+    """Get the reference of the entity, or None if it is not an entity."""
+    if isinstance(entity, GameEntity):
+        return EntityRef(entity.id, entity.player_id, entity.oop)
+    return None
+
+
+def make_record(event, depth):
+    """Create the record of the resolved event.
+
+    :param event: The resolved event.
+    :param depth: Depth of the event queue.
+    :return: The record.
+    :rtype: EventRecord
+    """
+    value = getattr(event, 'value', None)
+    return EventRecord(
+        type(event), entity_ref(event.owner), entity_ref(getattr(event, 'target', None)),
+        value if type(value) is int else None, event.game.n_turns, depth)
+
+
+class EventLog:
+    """Append-only log of event records, optionally bounded.
+
+    Attributes ``total`` (number of records appended in the game) and ``first`` (index of the oldest kept record)
+    are absolute indices.
+    """
+
+    def __init__(self, max_len=None):
+        """
+
+        :param max_len: Maximum number of kept records, None means unbounded.
+        """
+        if max_len is not None and max_len <= 0:
+            raise ValueError('Invalid max length {!r} of the event log'.format(max_len))
+        self.max_len = max_len
+        self._records = []
+        # Absolute index of ``self._records[0]`` in the unbounded log.
+        self._base = 0
+        self.total = 0
+        self.first = 0
+
+    def _slot(self, index):
+        return index - self._base if self.max_len is None else index % self.max_len
+
+    def append(self, record, journal=None):
+        """Append a record.
+
+        :param record: The record to be appended.
+        :param journal: The journal of the game (if in journal mode), the number of records is saved into it.
+        """
+        if journal is not None:
+            journal.save_attr(self, 'total')
+        index = self.total
+
+        # [NOTE]: After rollback, records after ``total`` are outdated and will be overwritten.
+        if self.first > index:
+            # Rollback to a state before the oldest kept record.
+            self.first = index
+            if self.max_len is None:
+                self._records, self._base = [], index
+        records, slot = self._records, self._slot(index)
+        if slot < len(records):
+            records[slot] = record
+        else:
+            records.append(record)
+        if self.max_len is not None and index - self.first >= self.max_len:
+            self.first = index - self.max_len + 1
+        self.total = index + 1
+
+    def record(self, event, depth, journal=None):
+        """Append the record of the resolved event. See ``make_record``."""
+        self.append(make_record(event, depth), journal)
+
+    def __len__(self):
+        return max(self.total - self.first, 0)
+
+    def __iter__(self):
+        return self.iter_from(self.first)
+
+    def iter_from(self, index):
+        """Iterate records from the absolute index (records older than ``self.first`` are skipped).
+
+        :param index: The absolute index.
+        """
+        records, slot = self._records, self._slot
+        for i in range(max(index, self.first), self.total):
+            yield records[slot(i)]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return list(self)[item]
+        n = len(self)
+        if item < 0:
+            item += n
+        if not 0 <= item < n:
+            raise IndexError('event log index out of range')
+        return self._records[self._slot(self.first + item)]
+
+    def clear(self):
+        """Drop all kept records. Absolute indices are not changed."""
+        if self.max_len is None:
+            self._records, self._base = [], self.total
+        self.first = self.total
+
+    def copy(self):
+        """Copy the log, records are shared since they are immutable."""
+        result = EventLog.__new__(EventLog)
+        result.__dict__.update(self.__dict__)
+        result._records = list(self._records)
+        return result
+
+    def __repr__(self):
+        return 'EventLog(len={}, total={}, max_len={})'.format(len(self), self.total, self.max_len)
+
+
+__all__ = [
+    'EntityRef',
+    'EventRecord',
+    'entity_ref',
+    'make_record',
+    'EventLog',
+]
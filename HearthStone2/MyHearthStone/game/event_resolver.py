@@ -0,0 +1,263 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Iterative event resolution engine.
+
+``Game.resolve_events`` and ``Game.resolve_triggers`` recurse into each other for every consequence queue,
+summon resolution, death phase and trigger. This module resolves the same queues with an explicit stack of frames,
+so long deathrattle/summon chains do not build deep Python stacks.
+
+Each frame is a queue (of events or triggers) with a cursor and a resume step.
+When a frame needs to resolve a sub-queue, it saves its step, pushes a new frame and the main loop continues
+with the new frame; the saved step is resumed after the sub-queue is resolved.
+The steps of events and triggers are the same as the recursive resolver (Advanced Rulebook order):
+    Pre-triggers, do the event, consequence events, post-triggers, stop subsequent phases,
+    the outermost Phase steps (aura update, summon resolution, aura update, death creation, aura update),
+    ``check_win`` insertion and 'resolve' callbacks.
+
+[NOTE]: The recursive resolver and this resolver must be kept in sync.
+"""
+
+from .events.event import Event
+from .events.standard import DeathPhase
+from .triggers.trigger import Trigger
+from ..utils.message import debug
+
+__author__ = 'fyabc'
+
+# Steps of event frames.
+_Next, _PreTriggers, _Do, _PostTriggers, _StopPhases, _DeathCreation, _EndEvent = range(7)
+
+
+class _EventsFrame:
+    __slots__ = ('events', 'depth', 'i', 'step', 'event', 'pre_events')
+
+    def __init__(self, events, depth):
+        self.events = events
+        self.depth = depth
+        self.i = 0
+        self.step = _Next
+        self.event = None
+        self.pre_events = None
+
+
+class _TriggersFrame:
+    __slots__ = ('triggers', 'current_event', 'depth', 'i', 'trigger')
+
+    def __init__(self, triggers, current_event, depth):
+        self.triggers = triggers
+        self.current_event = current_event
+        self.depth = depth
+        self.i = 0
+        # The processed trigger, its 'resolve' callbacks are waiting for its event queue.
+        self.trigger = None
+
+
+def _events_frame(game, events, depth):
+    """Create a frame of the event queue, same as the entry of the recursive ``resolve_events``.
+
+    :return: The new frame, or None if the queue will not be resolved.
+    """
+    if game.state != game.GameState.Main or game.game_result is not None:
+        return None
+    game.current_events = events
+    return _EventsFrame(events, depth)
+
+
+def _triggers_frame(game, event, timing, depth):
+    """Collect related triggers and create a frame of them, same as ``Game._collect_resolve_triggers``.
+
+    :return: The new frame, or None if there are no triggers to be resolved.
+    """
+    entry = game._trigger_dispatch.get((type(event), timing))
+    if entry is None:
+        entry = game.get_dispatch_entry(type(event), timing)
+
+    # Events with no listeners skip the trigger collection completely.
+    if not entry:
+        return None
+
+    triggers_queue = [trigger for trigger in entry.candidates(event) if trigger.queue_condition(event)]
+    if not triggers_queue or game.game_result is not None:
+        return None
+    game.current_triggers = triggers_queue
+    return _TriggersFrame(triggers_queue, event, depth + 1)
+
+
+def resolve_events_iterative(game, events, depth=0):
+    """Resolve all events in the queue with an explicit stack of frames.
+
+    The behaviour is same as the recursive ``Game.resolve_events``.
+
+    :param game: The game.
+    :param events: Queue of events to be resolved.
+    :param depth: The depth of the queue.
+    """
+
+    frame = _events_frame(game, events, depth)
+    if frame is None:
+        return
+    stack = [frame]
+
+    fast = game.fast
+    # Callbacks are only called when there are subscribers.
+    event_callbacks, trigger_callbacks, resolve_callbacks = (
+        game.callbacks['event'], game.callbacks['trigger'], game.callbacks['resolve'])
+    event_history = game.event_history if game.record_history else None
+    journal = game.journal
+    before, after = Trigger.Before, Trigger.After
+
+    while stack:
+        frame = stack[-1]
+        new_frame = None
+
+        if frame.__class__ is _TriggersFrame:
+            triggers, current_event, i, t = frame.triggers, frame.current_event, frame.i, frame.trigger
+
+            while True:
+                if t is not None:
+                    # The event queue of the processed trigger has been resolved.
+                    if resolve_callbacks:
+                        for callback in resolve_callbacks:
+                            callback(t, current_event)
+                    i += 1
+                    t = None
+
+                if i >= len(triggers):
+                    stack.pop()
+                    break
+                t = triggers[i]
+                if not current_event.enable or not t.trigger_condition(current_event):
+                    stack.pop()
+                    break
+
+                new_queue = t.process(current_event)
+                if not fast:
+                    t.message(current_event)
+                if trigger_callbacks:
+                    for callback in trigger_callbacks:
+                        callback(t, current_event)
+
+                if new_queue:
+                    new_frame = _events_frame(game, new_queue, frame.depth + 1)
+                    if new_frame is not None:
+                        frame.i, frame.trigger = i, t
+                        stack.append(new_frame)
+                        break
+            continue
+
+        events, depth, i, step, e = frame.events, frame.depth, frame.i, frame.step, frame.event
+
+        # Steps run in sequence; a step that creates a new frame breaks the loop, and is resumed later.
+        while True:
+            if step == _Next:
+                if i >= len(events):
+                    stack.pop()
+                    break
+                e = events[i]
+
+                if isinstance(e, Event):
+                    frame.pre_events = iter(e.pre_events())
+                    step = _PreTriggers
+                elif e == 'check_win':
+                    game.check_win()
+                    if game.game_result is not None:
+                        stack.pop()
+                        break
+                    step = _EndEvent
+                else:
+                    raise ValueError('Type {!r} of {!r} is not a valid type in the queue'.format(type(e), e))
+
+            if step == _PreTriggers:
+                # Resolve triggers before the event.
+                for pre_e in frame.pre_events:
+                    new_frame = _triggers_frame(game, pre_e, before, depth)
+                    if new_frame is not None:
+                        break
+                if new_frame is not None:
+                    break
+                step = _Do
+
+            if step == _Do:
+                # Do the event and log history.
+                if e.enable:
+                    cons_events = e.do()
+
+                    if not fast:
+                        e.message()
+                    if event_history is not None:
+                        event_history.record(e, depth, journal)
+                else:
+                    cons_events = None
+                if e.enable and event_callbacks:
+                    for callback in event_callbacks:
+                        callback(e)
+
+                step = _PostTriggers
+                if cons_events:
+                    new_frame = _events_frame(game, cons_events, depth + 1)
+                    if new_frame is not None:
+                        break
+
+            if step == _PostTriggers:
+                # Resolve triggers after the event.
+                step = _StopPhases
+                if e.enable:
+                    new_frame = _triggers_frame(game, e, after, depth)
+                    if new_frame is not None:
+                        break
+
+            if step == _StopPhases:
+                # Check for stopping subsequent phases.
+                if game._stop_subsequent_phases:
+                    game._stop_subsequent_phases = False
+                    if not fast:
+                        debug('{} phases stopped'.format(len(events) - i - 1))
+                        debug(events[i + 1:])
+                    del events[i + 1:]
+
+                # Only the outermost Phase ending begins the Aura Update and Death Creation Step.
+                if depth == 0 and not e.skip_5_steps:
+                    game._aura_update_attack_health()
+
+                    # Summon Resolution Step.
+                    step = _DeathCreation
+                    summons = game._summon_resolution()
+                    if summons:
+                        new_frame = _events_frame(game, summons, depth + 1)
+                        if new_frame is not None:
+                            break
+                else:
+                    step = _EndEvent
+
+            if step == _DeathCreation:
+                # Aura Update (Health/Attack), Death Creation Step, then Aura Update (Other).
+                game._aura_update_attack_health()
+                death_events = game._death_creation_step()
+                game._aura_update_other()
+
+                if death_events:
+                    # A new "Death Phase" begins.
+                    events.insert(i + 1, DeathPhase(game, death_events))
+                step = _EndEvent
+
+            # _EndEvent: The event (or 'check_win') is resolved.
+            if depth == 0 and i == len(events) - 1 and (not events or events[-1] != 'check_win'):
+                events.append('check_win')
+
+            i += 1
+            step = _Next
+
+            if resolve_callbacks and isinstance(e, Event):
+                for callback in resolve_callbacks:
+                    callback(e, None)
+
+        if new_frame is not None:
+            # Save the state, then resolve the new frame. The step will be resumed after it.
+            frame.i, frame.step, frame.event = i, step, e
+            stack.append(new_frame)
+
+
+__all__ = [
+    'resolve_events_iterative',
+]
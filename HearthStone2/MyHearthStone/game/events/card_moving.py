@@ -6,8 +6,6 @@
 TODO: Add "ShuffleIntoHand".
 """
 
-import random
-
 from .event import Event, DelayResolvedEvent, AreaEvent
 from .damage import Damage
 from .utils import dynamic_pid_prop
@@ -85,7 +83,7 @@ class PutIntoHand(GenericDrawCard):
             return []
 
         # Random select a card, can use other distributions here.
-        index = random.choice(candidates)
+        index = self.game.rng.choice(candidates)
 
         card, status = self.game.move(self.player_id, Zone.Deck, index, self.player_id, Zone.Hand, 'last')
         success, new_events = status['success'], status['events']
@@ -6,8 +6,6 @@
 See <https://hearthstone.gamepedia.com/Advanced_rulebook#Damage_and_Healing> for details.
 """
 
-import random
-
 from .event import Event, DelayResolvedEvent, AreaEvent
 from .misc import LoseDivineShield, LoseStealth
 from ...utils.constants import version_larger_equal
@@ -76,7 +74,7 @@ class RandomDamage(Damage):
         self.collect_fn = collect_fn
 
         # By default, choose one in equal probability.
-        self.random_fn = random.choice if random_fn is None else random_fn
+        self.random_fn = game.rng.choice if random_fn is None else random_fn
 
     def do_real_work(self):
         # [NOTE]: Collect when running this event (previous events have been resolved)
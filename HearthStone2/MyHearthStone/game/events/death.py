@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from .event import Event, Phase
+from ..journal import journal_save_attr
 from ...utils.game import Type
 
 __author__ = 'fyabc'
@@ -14,6 +15,9 @@ def _push_death_cache(game, event_owner):
 
     Values: (entity_id, player_id, turn_number)
     """
+    journal = game.journal
+    if journal is not None:
+        journal.save_length(game.death_cache)
     game.death_cache.append((event_owner.id, event_owner.player_id, game.n_turns))
 
 
@@ -41,6 +45,7 @@ class HeroDeath(DeathEvent):
     def do(self):
         owner = self.owner
         _push_death_cache(self.game, owner)
+        journal_save_attr(self.game, owner, 'play_state')
         owner.play_state = False
         return []
 
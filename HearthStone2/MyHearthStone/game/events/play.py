@@ -16,6 +16,7 @@ Playing/Summoning a minion: See https://hearthstone.gamepedia.com/Advanced_ruleb
 from .event import Phase
 from .summon import Summon
 from .utils import dynamic_pid_prop
+from ..journal import journal_save, journal_save_attr
 from ...utils.game import Zone
 
 __author__ = 'fyabc'
@@ -65,7 +66,10 @@ class OnPlaySpell(OnPlay):
             tz = Zone.Graveyard
             # [NOTE]: When moving to Graveyard, still need to set the oop.
             # If moving to Secret, oop is automatically set.
+            journal_save_attr(self.game, self.spell, 'oop')
             self.spell.oop = self.game.inc_oop()
+            if self.spell.triggers:
+                self.game.refresh_triggers(self.spell.triggers)
 
         self.game.move(self.player_id, Zone.Hand, self.spell, self.player_id, tz, 'last')
 
@@ -261,6 +265,7 @@ class OnPlayMinion(OnPlay):
         player.spend_mana(self.minion.cost)
 
         se = self.summon_event
+        journal_save(self.game, self.game.summon_events)
         self.game.summon_events.add(se)
 
         _, status = self.game.move(se.player_id, Zone.Hand, self.minion, se.player_id, Zone.Play, se.loc)
@@ -351,6 +356,7 @@ def pure_summon_events(game, minion, to_player, loc, from_player=None, from_zone
 
     if success:
         summon_event = Summon(game, minion, to_index, to_player)
+        journal_save(game, game.summon_events)
         game.summon_events.add(summon_event)
 
         # [NOTE] ``AfterSummon`` phase appears before ``Summon`` event.
@@ -0,0 +1,173 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Fork (copy) a game for search-based AI.
+
+``copy.deepcopy`` is too slow for search loops, and it cannot remap closures such as deathrattle functions
+(``lambda trigger, event: [Damage(self.game, self, ...)]``), which still refer to entities of the original game.
+The forker here is a specialized deep copy:
+    1. Class-level data of entities (see ``TagStore``) are shared.
+    2. Functions and bound methods are rebuilt with remapped closure cells and ``__self__``.
+    3. Records in the event history are shared, since they are immutable.
+"""
+
+import random
+import types
+
+from .game_entity import TagStore
+from .journal import JournalList, ZoneList
+
+__author__ = 'fyabc'
+
+_AtomicTypes = frozenset([
+    type(None), bool, int, float, complex, str, bytes, range, slice, type(Ellipsis), type(NotImplemented),
+    type, types.BuiltinFunctionType, types.ModuleType, types.CodeType, property,
+])
+
+
+class _Forker:
+    def __init__(self, memo):
+        self.memo = memo
+        self.dispatch = {
+            list: self._copy_list,
+            tuple: self._copy_tuple,
+            dict: self._copy_dict,
+            TagStore: self._copy_tag_store,
+            JournalList: self._copy_journal_list,
+            ZoneList: self._copy_journal_list,
+            set: self._copy_set,
+            frozenset: self._copy_frozenset,
+            random.Random: self._copy_random,
+            types.FunctionType: self._copy_function,
+            types.MethodType: self._copy_method,
+        }
+
+    def copy(self, obj):
+        cls = type(obj)
+        if cls in _AtomicTypes or isinstance(obj, type):
+            return obj
+        result = self.memo.get(id(obj))
+        if result is not None:
+            return result
+        fn = self.dispatch.get(cls)
+        if fn is None:
+            fn = self._copy_object
+        return fn(obj)
+
+    def _copy_list(self, obj):
+        result = self.memo[id(obj)] = []
+        copy = self.copy
+        result.extend(v if type(v) in _AtomicTypes else copy(v) for v in obj)
+        return result
+
+    def _copy_tuple(self, obj):
+        copy = self.copy
+        values = [copy(v) for v in obj]
+        if all(v is w for v, w in zip(values, obj)):
+            result = obj
+        else:
+            result = tuple(values)
+        self.memo[id(obj)] = result
+        return result
+
+    def _copy_dict(self, obj):
+        result = self.memo[id(obj)] = {}
+        copy = self.copy
+        for k, v in obj.items():
+            result[k if type(k) in _AtomicTypes else copy(k)] = v if type(v) in _AtomicTypes else copy(v)
+        return result
+
+    def _copy_tag_store(self, obj):
+        # Only entity-level data are copied, class-level data are shared.
+        result = self.memo[id(obj)] = TagStore.__new__(TagStore)
+        result.owner = self.copy(obj.owner)
+        copy, unset = self.copy, TagStore.Unset
+        result.values = [v if v is unset or type(v) in _AtomicTypes else copy(v) for v in obj.values]
+        result.layout = obj.layout
+        result.defaults = obj.defaults
+        result.cls_data = obj.cls_data
+        result.card_id = obj.card_id
+        result.hash = obj.hash
+        return result
+
+    def _copy_journal_list(self, obj):
+        result = self.memo[id(obj)] = type(obj)(self.copy(obj.game))
+        copy = self.copy
+        list.extend(result, (v if type(v) in _AtomicTypes else copy(v) for v in obj))
+        return result
+
+    def _copy_set(self, obj):
+        result = self.memo[id(obj)] = set()
+        copy = self.copy
+        result.update(copy(v) for v in obj)
+        return result
+
+    def _copy_frozenset(self, obj):
+        result = self.memo[id(obj)] = frozenset(self.copy(v) for v in obj)
+        return result
+
+    def _copy_random(self, obj):
+        result = self.memo[id(obj)] = random.Random()
+        result.setstate(obj.getstate())
+        return result
+
+    def _copy_function(self, obj):
+        if obj.__closure__ is None:
+            return obj
+        result = self.memo[id(obj)] = types.FunctionType(
+            obj.__code__, obj.__globals__, obj.__name__, obj.__defaults__,
+            tuple(types.CellType() for _ in obj.__closure__))
+        for cell, new_cell in zip(obj.__closure__, result.__closure__):
+            try:
+                new_cell.cell_contents = self.copy(cell.cell_contents)
+            except ValueError:
+                # Empty cell.
+                pass
+        result.__kwdefaults__ = obj.__kwdefaults__
+        result.__dict__.update(obj.__dict__)
+        return result
+
+    def _copy_method(self, obj):
+        result = self.memo[id(obj)] = types.MethodType(self.copy(obj.__func__), self.copy(obj.__self__))
+        return result
+
+    def _copy_object(self, obj):
+        cls = type(obj)
+        if not hasattr(obj, '__dict__') or hasattr(cls, '__slots__'):
+            raise TypeError('Cannot fork object {!r} of type {}'.format(obj, cls))
+        result = self.memo[id(obj)] = cls.__new__(cls)
+        copy = self.copy
+        result.__dict__.update({k: v if type(v) in _AtomicTypes else copy(v) for k, v in obj.__dict__.items()})
+        return result
+
+
+def fork_game(game, skip=(), share=()):
+    """Fork the game.
+
+    :param game: The game to be forked.
+    :param skip: Names of game attributes that are not copied. They must be set by the caller.
+    :param share: Names of game attributes that are shallow copied by their ``copy`` method
+        (the container is copied, values are shared).
+    :return: The forked game.
+    """
+    memo = {}
+    forker = _Forker(memo)
+
+    cls = type(game)
+    result = memo[id(game)] = cls.__new__(cls)
+
+    state = game.__dict__
+    new_state = {}
+    for name in share:
+        new_state[name] = memo[id(state[name])] = state[name].copy()
+    for name, value in state.items():
+        if name in skip or name in new_state:
+            continue
+        new_state[name] = forker.copy(value)
+    result.__dict__.update(new_state)
+    return result
+
+
+__all__ = [
+    'fork_game',
+]
@@ -4,12 +4,15 @@
 """The base class of game entities."""
 
 from collections import ChainMap
+from collections.abc import MutableMapping
 from copy import copy as cp
 from itertools import chain
 import re
 
-from .player_operation import PlayerOps, PlayerOpTree, translate_po_tree
-from ..utils.game import Zone, Type, DHBonusType
+from .journal import journal_save, journal_save_attr
+from .player_operation import PlayerOps, PlayerOpTree, translate_po_tree, target_filter
+from .state_hash import tag_key, tags_hash
+from ..utils.game import Zone, Type, DHBonusType, GameTag
 from ..utils.message import entity_message, warning, debug
 
 __author__ = 'fyabc'
@@ -17,12 +20,19 @@ __author__ = 'fyabc'
 _sentinel = object()
 
 
+_Tag2Idx = GameTag.Tag2Idx
+_Idx2Tag = GameTag.Idx2Tag
+_IdIndex = _Tag2Idx['id']
+
+
 def make_property(name, setter=True, deleter=False, default=_sentinel, callable_default=False):
-    if default is _sentinel:
-        def _getter(self):
-            return self.data[name]
-    else:
-        if callable_default:
+    index = _Tag2Idx.get(name)
+
+    if index is None:
+        if default is _sentinel:
+            def _getter(self):
+                return self.data[name]
+        elif callable_default:
             assert callable(default)
 
             def _getter(self):
@@ -30,6 +40,39 @@ def make_property(name, setter=True, deleter=False, default=_sentinel, callable_
         else:
             def _getter(self):
                 return self.data.get(name, default)
+    else:
+        # Fast path: read the entity-level value (and the class default) directly.
+        if default is _sentinel:
+            def _getter(self):
+                data = self.data
+                pos = data.layout.get(index)
+                if pos is not None:
+                    values = data.values
+                    if pos < len(values):
+                        value = values[pos]
+                        if value is not _sentinel:
+                            return value
+                value = data.defaults[index]
+                if value is _sentinel:
+                    raise KeyError(name)
+                return value
+        else:
+            if callable_default:
+                assert callable(default)
+
+            def _getter(self):
+                data = self.data
+                pos = data.layout.get(index)
+                if pos is not None:
+                    values = data.values
+                    if pos < len(values):
+                        value = values[pos]
+                        if value is not _sentinel:
+                            return value
+                value = data.defaults[index]
+                if value is _sentinel:
+                    return default() if callable_default else default
+                return value
 
     def _setter(self, value):
         self.data[name] = value
@@ -44,6 +87,265 @@ def make_property(name, setter=True, deleter=False, default=_sentinel, callable_
         doc='The card attribute of {}'.format(name))
 
 
+def _class_tag_defaults(cls):
+    """Get the slot defaults (class-level values of ``GameTag`` tags) and the tag layout of the entity class,
+    build them at first use.
+
+    The tag layout maps tag keys (slot indices of ``GameTag`` tags, names of other tags) to positions in
+    entity-level value lists. It is shared by all entities of the class, and only grows (positions never change).
+
+    [NOTE]: Class-level data should not be changed after the first entity of the class is created,
+    the slot defaults will not be updated.
+    """
+    defaults = cls.__dict__.get('_tag_defaults')
+    if defaults is None:
+        cls_data = cls.cls_data
+        defaults = tuple(cls_data.get(tag, _sentinel) for tag in _Idx2Tag)
+        cls._tag_defaults = defaults
+        cls._tag_layout = {}
+    return defaults, cls._tag_layout
+
+
+class TagStore(MutableMapping):
+    """The tag store of a game entity.
+
+    Entity-level values are stored in a compact list, positions of tags in the list are given by the tag layout
+    of the entity class (see ``_class_tag_defaults``), unset positions are ``Unset``.
+    Each entity only stores tags set in entities of its class, instead of all ``GameTag`` tags.
+    Class-level values are shared between entities: slot defaults in a tuple, and the class data ``ChainMap``.
+
+    It works like the old ``ChainMap`` data (entity-level data over class-level data):
+        Reading a tag falls back to class-level data if it is not set in entity-level.
+        Writing and deleting (include ``pop`` and ``clear``) only change entity-level data.
+    It also records changes into the journal (if in journal mode),
+    and notifies its owner entity when a tag value is changed (used by the incremental aura update).
+
+    The Zobrist hash of tags (see ``state_hash``) is maintained in ``hash``, updated when a tag is changed.
+    """
+
+    __slots__ = ('owner', 'values', 'layout', 'defaults', 'cls_data', 'card_id', 'hash')
+
+    # The value of unset positions.
+    Unset = _sentinel
+
+    def __init__(self, owner, values=None):
+        """
+
+        :param owner: The owner entity.
+        :param values: Entity-level value list in the tag layout of the owner class, default is empty.
+        """
+        cls = type(owner)
+        self.owner = owner
+        self.values = [] if values is None else values
+        self.defaults, self.layout = _class_tag_defaults(cls)
+        self.cls_data = cls.cls_data
+        card_id = self.defaults[_IdIndex]
+        self.card_id = None if card_id is _sentinel else card_id
+        self.hash = 0
+        if values:
+            self.rehash()
+
+    def _get_entity(self, key):
+        """Get the entity-level value of the tag key (slot index or name), ``Unset`` if not set."""
+        pos = self.layout.get(key)
+        if pos is None or pos >= len(self.values):
+            return _sentinel
+        return self.values[pos]
+
+    def __getitem__(self, key):
+        index = _Tag2Idx.get(key)
+        if index is None:
+            value = self._get_entity(key)
+            if value is _sentinel:
+                return self.cls_data[key]
+            return value
+        value = self._get_entity(index)
+        if value is _sentinel:
+            value = self.defaults[index]
+            if value is _sentinel:
+                raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        index = _Tag2Idx.get(key)
+        if index is None:
+            value = self._get_entity(key)
+            if value is _sentinel:
+                return self.cls_data.get(key, default)
+            return value
+        value = self._get_entity(index)
+        if value is _sentinel:
+            value = self.defaults[index]
+            if value is _sentinel:
+                return default
+        return value
+
+    def __contains__(self, key):
+        index = _Tag2Idx.get(key)
+        if index is None:
+            return self._get_entity(key) is not _sentinel or key in self.cls_data
+        return self._get_entity(index) is not _sentinel or self.defaults[index] is not _sentinel
+
+    def has_entity_tag(self, key):
+        """Check if the tag is set in entity-level data."""
+        return self._get_entity(_Tag2Idx.get(key, key)) is not _sentinel
+
+    def _before_change(self, key):
+        owner = self.owner
+        journal = owner.game.journal
+        if journal is not None:
+            journal.save(self.values)
+            journal.save_slot(self, 'hash')
+        owner._on_tag_changed(key)
+
+    def _tag_key(self, key, index, value):
+        """Get the hash key of the tag value, 0 if it is unset or same as the class-level value."""
+        if value is _sentinel:
+            return 0
+        default = self.cls_data.get(key, _sentinel) if index is None else self.defaults[index]
+        if value is default or value == default:
+            return 0
+        return tag_key(self.card_id, key, value)
+
+    def rehash(self):
+        """Recompute the tag hash from scratch."""
+        self.hash = tags_hash(self.card_id, self.entity_items(), lambda tag: self.cls_data.get(tag, _sentinel))
+
+    def __setitem__(self, key, value):
+        index = _Tag2Idx.get(key)
+        layout, values = self.layout, self.values
+        pos = layout.get(key if index is None else index)
+        if pos is None:
+            pos = layout[key if index is None else index] = len(layout)
+        old_value = values[pos] if pos < len(values) else _sentinel
+        if old_value is not value and old_value != value:
+            self._before_change(key)
+            self.hash ^= self._tag_key(key, index, old_value) ^ self._tag_key(key, index, value)
+        if pos >= len(values):
+            values.extend([_sentinel] * (pos + 1 - len(values)))
+        values[pos] = value
+
+    def pop(self, key, *args):
+        """Pop the entity-level tag."""
+        index = _Tag2Idx.get(key)
+        value = self._get_entity(key if index is None else index)
+        if value is _sentinel:
+            if args:
+                return args[0]
+            raise KeyError(key)
+        self._before_change(key)
+        self.hash ^= self._tag_key(key, index, value)
+        self.values[self.layout[key if index is None else index]] = _sentinel
+        return value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def clear(self):
+        """Clear all entity-level tags."""
+        values = self.values
+        if values.count(_sentinel) != len(values):
+            self._before_change(None)
+            values.clear()
+        self.hash = 0
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def entity_items(self):
+        """Iterate over entity-level (tag, value) pairs."""
+        values = self.values
+        n = len(values)
+        for key, pos in self.layout.items():
+            if pos < n:
+                value = values[pos]
+                if value is not _sentinel:
+                    yield (_Idx2Tag[key] if type(key) is int else key), value
+
+    def __iter__(self):
+        seen = set()
+        for key, _ in self.entity_items():
+            seen.add(key)
+            yield key
+        for key in self.cls_data:
+            if key not in seen:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self, owner=None):
+        """Copy the entity-level data, class-level data are shared.
+
+        :param owner: The owner of the new tag store, default is the owner of this tag store.
+        """
+        owner = self.owner if owner is None else owner
+        if type(owner) is not type(self.owner):
+            return _make_tag_store(owner, dict(self.entity_items()))
+        return TagStore(owner, list(self.values))
+
+    def __reduce__(self):
+        # The unset sentinel cannot be copied or pickled, and positions of the tag layout are different
+        # between processes, so only save entity-level tags by names.
+        return _make_tag_store, (self.owner, dict(self.entity_items()))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.entity_items()))
+
+
+def _make_tag_store(owner, entity_data):
+    """Rebuild the tag store from entity-level tags, without change notifications."""
+    result = TagStore(owner)
+    layout, values = result.layout, result.values
+    for key, value in entity_data.items():
+        key = _Tag2Idx.get(key, key)
+        pos = layout.get(key)
+        if pos is None:
+            pos = layout[key] = len(layout)
+        if pos >= len(values):
+            values.extend([_sentinel] * (pos + 1 - len(values)))
+        values[pos] = value
+    result.rehash()
+    return result
+
+
+class EntityData(MutableMapping):
+    """Live view of entity-level tags of a tag store (see ``GameEntity.entity_data``).
+
+    Changes on the view are applied to the tag store (with journal recording and change notifications).
+    """
+
+    __slots__ = ('store',)
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, key):
+        value = self.store._get_entity(_Tag2Idx.get(key, key))
+        if value is _sentinel:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.store.has_entity_tag(key)
+
+    def __setitem__(self, key, value):
+        self.store[key] = value
+
+    def __delitem__(self, key):
+        del self.store[key]
+
+    def __iter__(self):
+        return (key for key, _ in self.store.entity_items())
+
+    def __len__(self):
+        return sum(1 for _ in self.store.entity_items())
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.store.entity_items()))
+
+
 def _bisect(a, enchantment):
     lo, hi = 0, len(a)
     while lo < hi:
@@ -55,6 +357,16 @@ def _bisect(a, enchantment):
     return lo
 
 
+def _find(a, enchantment):
+    """Find the index of the enchantment in the sorted enchantment list, or None if not found."""
+    i = _bisect(a, enchantment)
+    while i < len(a) and a[i].order == enchantment.order:
+        if a[i] is enchantment:
+            return i
+        i += 1
+    return None
+
+
 class SetDataMeta(type):
     """This metaclass is used for setting `data` attribute of cards automatically.
 
@@ -90,6 +402,7 @@ class GameEntity(metaclass=SetDataMeta):
         Use `CardClass.data['cost']` or `card_object.cls_data['cost']` to access class-level data
             (original card data, will not be changed).
         Use `card_object.cost` to access object-level data (card-specific data, may be changed in the game).
+        Use `card_object.entity_data` to access a live view of tags set in object-level data.
 
     [NOTE]: Differences between two type of triggers: (same for auras)
         1) Triggers directly attached to this entity (Entity -> Trigger)
@@ -106,7 +419,7 @@ class GameEntity(metaclass=SetDataMeta):
                 "Whenever this minion attacks, the caster of 'Blessing of Wisdom' draw a card."
     """
 
-    # TODO: Extract all these keys of ``data`` into a new enumeration ``GameTags``.
+    # Common tags are listed in ``GameTag``, they are stored by slot indices in ``TagStore``.
     data = {
         'version': None,
         'id': None,
@@ -127,11 +440,11 @@ class GameEntity(metaclass=SetDataMeta):
         # TODO: Check the oop settings in all situations.
         self.oop = None
 
-        # Entity-level data dict (highest priority, commonly variable between different entities).
-        self.data = self.data.new_child({
-            # 'zone': Zone.Invalid,
-            # 'player_id': None,  # Same as 'controller'.
-        })
+        # Version of the last change of this entity, see ``state_version``.
+        self._state_version = 0
+
+        # Entity-level data (highest priority, commonly variable between different entities) over class-level data.
+        self.data = TagStore(self)
         self._reset_tags()
 
         self.init_zone = Zone.Invalid
@@ -155,9 +468,27 @@ class GameEntity(metaclass=SetDataMeta):
 
     def set_data(self, tag, value):
         if tag == 'player_id' and not self._init_player_id:
+            journal_save_attr(self.game, self, '_init_player_id')
             self._init_player_id = self.data.get('player_id', value)
         self.data[tag] = value
 
+    def _on_tag_changed(self, tag):
+        """Called by the entity-level tag dict when a tag is changed.
+
+        :param tag: The changed tag, or None if all tags are cleared.
+        """
+        self.game.mark_changed(self)
+
+    @property
+    def state_version(self):
+        """Version of the last change (tags, zone or enchantments) of this entity.
+
+        It is increased monotonically, see ``Game.changed_since`` and ``change_tracker``.
+        """
+        version = self._state_version
+        floor = self.game.change_tracker.floor
+        return floor if version < floor else version
+
     def copy(self):
         """Copy the entity.
 
@@ -171,8 +502,8 @@ class GameEntity(metaclass=SetDataMeta):
         # 1. Create a shallow copy. Immutable attributes are copied automatically.
         result = cp(self)
 
-        # 2. Copy data. Only shallow copy the top-level (entity-level) data, other part (cls_data) are remain shared.
-        result.data = result.data.parents.new_child(cp(result.data.maps[0]))
+        # 2. Copy data. Only shallow copy the entity-level data, class-level data (cls_data) are remain shared.
+        result.data = self.data.copy(owner=result)
 
         # 3. Copy triggers and auras.
         result.triggers = {t.copy(new_owner=result) for t in result.triggers}
@@ -230,16 +561,24 @@ class GameEntity(metaclass=SetDataMeta):
             # TODO: Reset tags in all moving? Or just in some movements?
             self._reset_tags()
 
+        # Triggers of this entity (registered above) are sorted and indexed by the old oop and player id.
+        refresh_triggers = old_player_id != player_id
+
         # [NOTE]: Set oop here when moving into play.
         if zone in Zone.play_zones() and old_zone not in Zone.play_zones():
+            journal_save_attr(self.game, self, 'oop')
             self.oop = self.game.inc_oop()
+            refresh_triggers = True
 
         self._set_zp_hook(old_zone, old_player_id, zone, player_id)
 
-        debug('Move {} from P_{}#{} to P_{}#{}.'.format(
-            self, old_player_id, Zone.Idx2Str[old_zone], player_id, Zone.Idx2Str[zone]))
+        if not self.game.fast:
+            debug('Move {} from P_{}#{} to P_{}#{}.'.format(
+                self, old_player_id, Zone.Idx2Str[old_zone], player_id, Zone.Idx2Str[zone]))
         self.data['zone'] = zone
         self.data['player_id'] = player_id
+        if refresh_triggers and self.triggers:
+            self.game.refresh_triggers(self.triggers)
 
     def _set_zp_hook(self, old_zone, old_player_id, zone, player_id):
         """The hook method used for subclasses when set the zone and player id."""
@@ -250,7 +589,8 @@ class GameEntity(metaclass=SetDataMeta):
 
         See ``_set_zp`` for more details.
         """
-        return self.data.get('zone', Zone.Invalid)
+        value = self.data._get_entity(GameTag.Zone)
+        return Zone.Invalid if value is _sentinel else value
 
     def _set_zone(self, zone):
         self.set_zp(zone, player_id=None)
@@ -262,7 +602,8 @@ class GameEntity(metaclass=SetDataMeta):
 
         See ``_set_zp`` for more details.
         """
-        return self.data.get('player_id', None)
+        value = self.data._get_entity(GameTag.PlayerId)
+        return None if value is _sentinel else value
 
     def _set_player_id(self, player_id):
         self.set_zp(zone=None, player_id=player_id)
@@ -271,8 +612,8 @@ class GameEntity(metaclass=SetDataMeta):
 
     @property
     def entity_data(self):
-        """Get the entity-level data."""
-        return self.data.maps[0]
+        """Get the entity-level data (a live view, changes on it are applied to the entity)."""
+        return EntityData(self.data)
 
     id = make_property('id', setter=False)
     name = make_property('name', setter=False)
@@ -323,6 +664,7 @@ class GameEntity(metaclass=SetDataMeta):
         :param trigger:
         :return:
         """
+        journal_save(self.game, self.triggers)
         self.triggers.add(trigger)
 
         # Update the currently added trigger to the correct zone.
@@ -350,6 +692,7 @@ class GameEntity(metaclass=SetDataMeta):
 
     def add_aura(self, aura):
         """Add an aura."""
+        journal_save(self.game, self.auras)
         self.auras.add(aura)
 
         # Update the currently added aura to the correct zone.
@@ -385,12 +728,19 @@ class IndependentEntity(GameEntity):
         'race': [],
     }
 
+    # Recalculate attack/health in every incremental aura update, even if this entity is not changed.
+    # Set it in subclasses whose aura results depend on other entities (e.g. heroes depend on their weapons).
+    aura_always_update = False
+
     def __init__(self, game):
         super().__init__(game)
 
         # Enchantment list and aura enchantment list of this entity. Both in order of oop.
         self.enchantments = []
         self.aura_enchantments = []
+        # Aura enchantments indexed by their source auras.
+        # It is the reverse index of ``Aura.granted``, see ``add_enchantment`` and ``remove_enchantment``.
+        self.aura_enchantment_map = {}
 
         # Temporary data dict for aura update.
         self.aura_tmp = {}
@@ -435,6 +785,7 @@ class IndependentEntity(GameEntity):
         # 2. Copy enchantments. [NOTE]: Aura effects are not copied.
         result.enchantments = [e.copy(new_target=result) for e in result.enchantments]
         result.aura_enchantments = []
+        result.aura_enchantment_map = {}
 
         return result
 
@@ -457,8 +808,12 @@ class IndependentEntity(GameEntity):
     def add_enchantment(self, enchantment):
         """Add an enchantment, insert in order."""
         a = self.aura_enchantments if enchantment.aura else self.enchantments
+        journal_save(self.game, a)
         lo = _bisect(a, enchantment)
         a.insert(lo, enchantment)
+        if enchantment.aura:
+            self._link_aura_enchantment(enchantment)
+        self.game.mark_changed(self)
 
     def remove_enchantment(self, enchantment, error_not_found=False):
         """Recalculate enchantments.
@@ -467,33 +822,43 @@ class IndependentEntity(GameEntity):
         Enchantments are sorted in order of play.
         """
         a = self.aura_enchantments if enchantment.aura else self.enchantments
-        lo = _bisect(a, enchantment)
-        if not 0 <= lo < len(a) or a[lo] is not enchantment:
+        i = _find(a, enchantment)
+        if i is None:
             if error_not_found:
                 raise ValueError('Enchantment {} not found in the enchantment list'.format(enchantment))
         else:
-            del a[lo]
-
-    def _find_aura_enchantment(self, aura, return_idx=True):
-        a = self.aura_enchantments
-        for i, e in enumerate(a):
-            if e.source is aura:
-                if return_idx:
-                    return i
-                else:
-                    return a[i]
-        return None
+            journal_save(self.game, a)
+            del a[i]
+            if enchantment.aura:
+                self._unlink_aura_enchantment(enchantment)
+            self.game.mark_changed(self)
+
+    def _link_aura_enchantment(self, enchantment):
+        source = enchantment.source
+        journal_save(self.game, self.aura_enchantment_map)
+        journal_save(self.game, source.granted)
+        self.aura_enchantment_map[source] = enchantment
+        source.granted[self] = enchantment
+
+    def _unlink_aura_enchantment(self, enchantment):
+        source = enchantment.source
+        journal_save(self.game, self.aura_enchantment_map)
+        journal_save(self.game, source.granted)
+        if self.aura_enchantment_map.get(source) is enchantment:
+            del self.aura_enchantment_map[source]
+        if source.granted.get(self) is enchantment:
+            del source.granted[self]
 
     def get_enchantment_by_aura(self, aura):
-        return self._find_aura_enchantment(aura, return_idx=False)
+        return self.aura_enchantment_map.get(aura)
 
     def remove_enchantment_by_aura(self, aura, error_not_found=False):
-        i = self._find_aura_enchantment(aura)
-        if i is None:
+        enchantment = self.aura_enchantment_map.get(aura)
+        if enchantment is None:
             if error_not_found:
                 raise ValueError('Enchantment of source {} not found in the aura enchantment list'.format(aura))
         else:
-            del self.aura_enchantments[i]
+            self.remove_enchantment(enchantment)
 
     def all_enchantments(self):
         return chain(self.enchantments, self.aura_enchantments)
@@ -536,7 +901,11 @@ class IndependentEntity(GameEntity):
                 # Removed from play. Detach all enchantments (with some exceptions). See "RuleZ5a".
                 for enchantment in e_list:
                     enchantment.detach(remove_from_target=False)
+                journal_save(self.game, e_list)
                 e_list.clear()
+            for enchantment in list(self.aura_enchantment_map.values()):
+                self._unlink_aura_enchantment(enchantment)
+            self.game.mark_changed(self)
 
     def _aura_attributes(self):
         """Attributes for aura update. Subclasses can override this for more attributes.
@@ -668,6 +1037,7 @@ class IndependentEntity(GameEntity):
 
     # Methods for frontend.
 
+    @target_filter(exact=True)
     def check_target(self, target: 'IndependentEntity', **kwargs):
         """When a playable entity with target is played, this method is called to check if
         the target is correct or not.
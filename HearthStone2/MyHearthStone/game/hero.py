@@ -26,6 +26,9 @@ class Hero(AliveMixin, IndependentEntity):
         'attack_po_tree': 'Attack',
     }
 
+    # Attack of heroes depends on their weapons, see ``_aura_update_before``.
+    aura_always_update = True
+
     def __init__(self, game, player_id):
         super().__init__(game)
 
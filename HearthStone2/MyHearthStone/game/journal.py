@@ -0,0 +1,369 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Journal of game state changes, used to rollback the game to a checkpoint.
+
+In journal mode, the game records changes of:
+    entity-level tags (``GameEntity.data``, including mana counters of players),
+    zone lists of players,
+    trigger and aura registration,
+    enchantment lists and aura indexes of entities,
+    attributes of the game (such as ``current_oop``, ``n_turns``) and some attributes of entities (such as ``oop``),
+    state hashes of entities and zones (see ``state_hash``).
+
+Containers are saved when they are changed at the first time after the latest checkpoint (copy on first write),
+so the cost of rollback is O(changes).
+"""
+
+__author__ = 'fyabc'
+
+_missing = object()
+
+
+def _restore_list(container, saved):
+    list.__setitem__(container, slice(None), saved)
+    if type(container) is ZoneList:
+        container._positions = None
+        container._hash = None
+
+
+def _restore_dict(container, saved):
+    dict.clear(container)
+    dict.update(container, saved)
+
+
+def _restore_set(container, saved):
+    set.clear(container)
+    set.update(container, saved)
+
+
+def _restore_length(container, saved):
+    list.__delitem__(container, slice(saved, None))
+
+
+def _restore_state(obj, saved):
+    obj.setstate(saved)
+
+
+def _restore_slot(obj, name, saved):
+    setattr(obj, name, saved)
+
+
+def _restore_attr(obj, name, saved):
+    if saved is _missing:
+        obj.__dict__.pop(name, None)
+    else:
+        obj.__dict__[name] = saved
+
+
+class Journal:
+    def __init__(self):
+        # Undo entries: (restore_fn, target, *saved)
+        self.entries = []
+        # Id of containers that have been saved after the latest checkpoint.
+        self._saved = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def checkpoint(self):
+        self._saved = set()
+        return len(self.entries)
+
+    def rollback(self, checkpoint):
+        entries = self.entries
+        if not 0 <= checkpoint <= len(entries):
+            raise ValueError('Invalid checkpoint {}'.format(checkpoint))
+        while len(entries) > checkpoint:
+            fn, *args = entries.pop()
+            fn(*args)
+        self._saved = set()
+
+    def clear(self):
+        self.entries.clear()
+        self._saved = set()
+
+    def save(self, container):
+        """Save the container before it is changed."""
+        key = id(container)
+        if key in self._saved:
+            return
+        self._saved.add(key)
+        if isinstance(container, list):
+            self.entries.append((_restore_list, container, list(container)))
+        elif isinstance(container, dict):
+            self.entries.append((_restore_dict, container, dict(container)))
+        elif isinstance(container, set):
+            self.entries.append((_restore_set, container, set(container)))
+        else:
+            raise TypeError('Cannot save container {!r} of type {}'.format(container, type(container)))
+
+    def save_length(self, container):
+        """Save the length of an append-only list before it is appended."""
+        key = id(container)
+        if key in self._saved:
+            return
+        self._saved.add(key)
+        self.entries.append((_restore_length, container, len(container)))
+
+    def save_state(self, obj):
+        """Save the state of the object by ``getstate`` (such as ``random.Random``)."""
+        self.entries.append((_restore_state, obj, obj.getstate()))
+
+    def save_attr(self, obj, name):
+        """Save the attribute of the object before it is changed."""
+        key = id(obj), name
+        if key in self._saved:
+            return
+        self._saved.add(key)
+        self.entries.append((_restore_attr, obj, name, obj.__dict__.get(name, _missing)))
+
+    def save_slot(self, obj, name):
+        """Save the slot (attribute of objects with ``__slots__``) of the object before it is changed."""
+        key = id(obj), name
+        if key in self._saved:
+            return
+        self._saved.add(key)
+        self.entries.append((_restore_slot, obj, name, getattr(obj, name)))
+
+
+class JournalList(list):
+    """List that saves itself into the game journal before changed. Used as zones of players."""
+
+    __slots__ = ('game',)
+
+    def __init__(self, game, *args):
+        super().__init__(*args)
+        self.game = game
+
+    def _save(self):
+        journal = self.game.journal
+        if journal is not None:
+            journal.save(self)
+
+    def __setitem__(self, key, value):
+        self._save()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._save()
+        super().__delitem__(key)
+
+    def __iadd__(self, other):
+        self._save()
+        return super().__iadd__(other)
+
+    def __imul__(self, other):
+        self._save()
+        return super().__imul__(other)
+
+    def append(self, value):
+        self._save()
+        super().append(value)
+
+    def extend(self, iterable):
+        self._save()
+        super().extend(iterable)
+
+    def insert(self, index, value):
+        self._save()
+        super().insert(index, value)
+
+    def pop(self, *args):
+        self._save()
+        return super().pop(*args)
+
+    def remove(self, value):
+        self._save()
+        super().remove(value)
+
+    def clear(self):
+        self._save()
+        super().clear()
+
+    def sort(self, *args, **kwargs):
+        self._save()
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        self._save()
+        super().reverse()
+
+    def __reduce__(self):
+        return self.__class__, (self.game, list(self))
+
+
+class ZoneList(JournalList):
+    """Journal list of entities with an index of entity -> location. Used as zones of players.
+
+    The index is updated in place when a single entity is inserted, removed or replaced (only locations after it
+    are shifted), so ``index`` and ``in`` are O(1) lookups, instead of linear scans.
+    After other changes (such as ``extend``, slice assignment or sorting), or if the zone contains duplicate values,
+    the index is dropped and rebuilt lazily at the next lookup.
+
+    It also caches the state hash of entities in the zone (see ``state_hash.zone_hash``), invalidated when the zone
+    is changed, or an entity in the zone is changed (by ``Game.mark_changed``).
+    """
+
+    __slots__ = ('_positions', '_hash')
+
+    def __init__(self, game, *args):
+        super().__init__(game, *args)
+        self._positions = None
+        self._hash = None
+
+    def _get_positions(self):
+        positions = self._positions
+        if positions is None:
+            # [NOTE]: Iterate in reversed order, so the first location is kept for duplicate values (same as ``list``).
+            positions = self._positions = {value: i for i, value in reversed(list(enumerate(self)))}
+        return positions
+
+    def _valid_positions(self, n):
+        """Get the index if it is valid and has no duplicate values (``n`` is the length before the change)."""
+        positions = self._positions
+        if positions is not None and len(positions) == n:
+            return positions
+        return None
+
+    def _inserted(self, positions, i, value):
+        """Update the index after the value is inserted at location i."""
+        if positions is None or value in positions:
+            self._positions = None
+            return
+        positions[value] = i
+        for j in range(i + 1, len(self)):
+            positions[list.__getitem__(self, j)] = j
+
+    def _deleted(self, positions, i, value):
+        """Update the index after the value at location i is deleted."""
+        if positions is None:
+            self._positions = None
+            return
+        del positions[value]
+        for j in range(i, len(self)):
+            positions[list.__getitem__(self, j)] = j
+
+    def index(self, value, *args):
+        if args:
+            return super().index(value, *args)
+        try:
+            return self._get_positions()[value]
+        except KeyError:
+            raise ValueError('{!r} is not in list'.format(value)) from None
+
+    def __contains__(self, value):
+        return value in self._get_positions()
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            super().__setitem__(key, value)
+            self._positions = None
+        else:
+            n = len(self)
+            old_value = list.__getitem__(self, key)
+            super().__setitem__(key, value)
+            i = key + n if key < 0 else key
+            positions = self._valid_positions(n)
+            if positions is not None:
+                del positions[old_value]
+            self._inserted(positions, i, value)
+        self._hash = None
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            super().__delitem__(key)
+            self._positions = None
+        else:
+            n = len(self)
+            value = list.__getitem__(self, key)
+            super().__delitem__(key)
+            self._deleted(self._valid_positions(n), key + n if key < 0 else key, value)
+        self._hash = None
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._positions = None
+        self._hash = None
+        return result
+
+    def __imul__(self, other):
+        result = super().__imul__(other)
+        self._positions = None
+        self._hash = None
+        return result
+
+    def append(self, value):
+        super().append(value)
+        self._hash = None
+        positions = self._positions
+        if positions is not None:
+            positions.setdefault(value, len(self) - 1)
+
+    def extend(self, iterable):
+        super().extend(iterable)
+        self._positions = None
+        self._hash = None
+
+    def insert(self, index, value):
+        n = len(self)
+        positions = self._valid_positions(n)
+        super().insert(index, value)
+        # Same as ``list.insert``, the location is clipped into [0, n].
+        i = max(index + n, 0) if index < 0 else min(index, n)
+        self._inserted(positions, i, value)
+        self._hash = None
+
+    def pop(self, *args):
+        n = len(self)
+        result = super().pop(*args)
+        index = args[0] if args else -1
+        self._deleted(self._valid_positions(n), index + n if index < 0 else index, result)
+        self._hash = None
+        return result
+
+    def remove(self, value):
+        n = len(self)
+        positions = self._valid_positions(n)
+        i = None if positions is None else positions.get(value)
+        super().remove(value)
+        self._deleted(positions, i, value)
+        self._hash = None
+
+    def clear(self):
+        super().clear()
+        self._positions = None
+        self._hash = None
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._positions = None
+        self._hash = None
+
+    def reverse(self):
+        super().reverse()
+        self._positions = None
+        self._hash = None
+
+
+def journal_save(game, container):
+    """Save the container into the journal of the game (if exists) before it is changed."""
+    journal = game.journal
+    if journal is not None:
+        journal.save(container)
+
+
+def journal_save_attr(game, obj, name):
+    """Save the attribute of the object into the journal of the game (if exists) before it is changed."""
+    journal = game.journal
+    if journal is not None:
+        journal.save_attr(obj, name)
+
+
+__all__ = [
+    'Journal',
+    'JournalList',
+    'ZoneList',
+    'journal_save',
+    'journal_save_attr',
+]
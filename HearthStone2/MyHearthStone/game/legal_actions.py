@@ -0,0 +1,144 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Enumerate all legal player actions of the current player.
+
+The enumerator expands the player operation tree (see ``player_operation``) of each active entity:
+    Play a card: minion positions, targets and choices.
+    Attack: valid defenders.
+    Use hero power: targets and choices.
+    Turn end.
+
+Candidate targets are precomputed once per enumeration and narrowed by the ``target_filter`` annotation
+of ``check_target`` methods, so ``check_target`` and ``check_defender`` are called on few (or none) entities.
+
+[NOTE]: Run nodes in the middle of a tree (a player action that runs before the tree is finished) are not expanded,
+the player action of the first run node is returned.
+"""
+
+from .player_operation import PlayerOps
+from . import player_action as pa
+from ..utils.game import Zone
+
+__author__ = 'fyabc'
+
+_DefaultTargetFilter = (Zone.Play, Zone.Hero), None, False
+
+
+class _TargetSets:
+    """Candidate targets and defenders of the current game state, built lazily."""
+
+    def __init__(self, game, player_id):
+        self.game = game
+        self.player_id = player_id
+        self._targets = {}
+        self._defenders = None
+
+    def targets(self, zones, players):
+        """Get candidate targets (friendly first, then enemy) in the zones, enemy stealth characters are excluded."""
+        key = zones, players
+        result = self._targets.get(key)
+        if result is not None:
+            return result
+
+        game, player_id = self.game, self.player_id
+        result = []
+        if players != 'enemy':
+            for zone in zones:
+                result.extend(game.get_zone(zone, player_id))
+        if players != 'friendly':
+            for zone in zones:
+                result.extend(e for e in game.get_zone(zone, 1 - player_id) if not getattr(e, 'stealth', False))
+        self._targets[key] = result
+        return result
+
+    def defenders(self):
+        """Get enemy characters that can be attacked by an attacker without extra restrictions.
+
+        See ``AliveMixin.check_defender`` for details.
+        """
+        if self._defenders is None:
+            enemy_id = 1 - self.player_id
+            enemies = list(self.game.get_zone(Zone.Play, enemy_id)) + list(self.game.get_zone(Zone.Hero, enemy_id))
+            have_taunt = any(getattr(e, 'taunt', False) for e in enemies)
+            self._defenders = [e for e in enemies if not e.stealth and (e.taunt or not have_taunt)]
+        return self._defenders
+
+
+def _expand(game, tree, po_data, source, target_sets, all_positions, result):
+    """Expand the player operation tree, append all player actions into the result."""
+    while tree is not None:
+        op = tree.op
+
+        if op == PlayerOps.Run:
+            result.append(tree.run(game, po_data))
+            return
+        elif op == PlayerOps.ConfirmPlay:
+            pass
+        elif op == PlayerOps.SelectMinionPosition:
+            n_play = len(game.get_zone(Zone.Play, source.player_id))
+            child = tree.next_op()
+            for index in (range(n_play + 1) if all_positions else (n_play,)):
+                _expand(game, child, dict(po_data, index=index), source, target_sets, all_positions, result)
+            return
+        elif op == PlayerOps.SelectTarget:
+            check_target = type(source).check_target
+            zones, players, exact = getattr(check_target, 'target_filter', _DefaultTargetFilter)
+            candidates = target_sets.targets(zones, players)
+            if not exact:
+                candidates = [t for t in candidates if source.check_target(t, po_data=po_data)]
+            child = tree.next_op()
+            for target in candidates:
+                _expand(game, child, dict(po_data, target=target), source, target_sets, all_positions, result)
+            return
+        elif op == PlayerOps.SelectChoice:
+            choices = tree.get_choices()
+            key = 'choice.{}'.format(tree.title)
+            for choice in choices:
+                _expand(game, tree.next_op(choice), dict(po_data, **{key: choice, key + '.all': choices}),
+                        source, target_sets, all_positions, result)
+            return
+        elif op == PlayerOps.SelectDefender:
+            child = tree.next_op()
+            for defender in target_sets.defenders():
+                if defender.zone == Zone.Hero and (
+                        not source.can_attack_hero or (source.rush and source.first_turn)):
+                    continue
+                _expand(game, child, dict(po_data, target=defender), source, target_sets, all_positions, result)
+            return
+        else:
+            raise ValueError('Unknown or not implemented op {}'.format(op))
+
+        tree = tree.next_op()
+
+
+def get_legal_actions(game, all_positions=True):
+    """Get all legal player actions of the current player.
+
+    :param game: The game.
+    :param all_positions: Expand all minion positions. If False, minions are only played to the rightmost position.
+    :return: List of player actions, the last one is always ``TurnEnd``.
+    :rtype: list
+    """
+    player_id = game.current_player
+    player = game.get_player(player_id)
+    target_sets = _TargetSets(game, player_id)
+    result = []
+
+    entities = list(player.hand)
+    entities.extend(player.play)
+    entities.extend(player.heroes)
+    entities.extend(player.hero_powers)
+    for entity in entities:
+        if entity.can_do_action() == entity.Inactive:
+            continue
+        po_data = {'source': entity, 'target': None, 'index': None}
+        _expand(game, entity.player_operation_tree(), po_data, entity, target_sets, all_positions, result)
+
+    result.append(pa.TurnEnd(game, player_id))
+    return result
+
+
+__all__ = [
+    'get_legal_actions',
+]
@@ -4,9 +4,9 @@
 """The class of player."""
 
 import itertools
-import random
 
-from .game_entity import IndependentEntity
+from .game_entity import IndependentEntity, make_property
+from .journal import ZoneList, journal_save_attr
 from .alive_mixin import AliveMixin
 from .enchantments.dh_bonus import DHBonusMixin
 from ..utils.constants import C
@@ -49,37 +49,62 @@ class Player(IndependentEntity):
 
     data = {
         'type': Type.Player,
+
+        # Mana and overloads.
+        'max_mana': 0,
+        'temp_mana': 0,
+        'used_mana': 0,
+        'overload': 0,
+        'overload_next': 0,
+
+        # Hero power related.
+        'number_hp_this_turn': 0,
+        'number_hp_this_game': 0,
+
+        # Misc.
+        'tire_counter': 0,
     }
 
     def __init__(self, game):
         super().__init__(game)
 
-        # TODO: Put these variables into ``self.data``?
-        # Mana and overloads.
-        self.max_mana = 0
-        self.temp_mana = 0
-        self.used_mana = 0
-        self.overload = 0
-        self.overload_next = 0
-
-        # Zones.
-        self.heroes = []
-        self.hero_powers = []
-        self.deck = []
-        self.hand = []
-        self.play = []
-        self.secret = []
-        self.weapons = []
-        self.graveyard = []
-
-        # Hero power related.
-        self.number_hp_this_turn = 0
-        self.number_hp_this_game = 0
+        # Zones. They are zone lists (journal lists with location index), so they can be rolled back in journal mode.
+        self.heroes = ZoneList(game)
+        self.hero_powers = ZoneList(game)
+        self.deck = ZoneList(game)
+        self.hand = ZoneList(game)
+        self.play = ZoneList(game)
+        self.secret = ZoneList(game)
+        self.weapons = ZoneList(game)
+        self.graveyard = ZoneList(game)
+
+        # Zones indexed by the zone id, None for invalid zones. See ``get_zone``.
+        # [NOTE]: Zone lists are never replaced, so they are always same as zone attributes above.
+        self.zones = [None] * Zone.NumEnums
+        for zone, zone_list in (
+                (Zone.Deck, self.deck), (Zone.Hand, self.hand), (Zone.Secret, self.secret), (Zone.Play, self.play),
+                (Zone.Graveyard, self.graveyard), (Zone.Weapon, self.weapons), (Zone.Hero, self.heroes),
+                (Zone.HeroPower, self.hero_powers)):
+            self.zones[zone] = zone_list
 
         # Misc.
-        self.tire_counter = 0
         self.start_player = None
 
+        # Caches of damage/healing bonuses and spell power, see ``get_damage_bonus`` and ``get_spell_power``.
+        # Damage/healing bonus enchantments of the player, indexed by (event type, source type, bonus type).
+        self._dh_bonus_cache = {}
+        # Total spell power of the player, None if it need to be recalculated.
+        self._spell_power_cache = None
+
+    max_mana = make_property('max_mana')
+    temp_mana = make_property('temp_mana')
+    used_mana = make_property('used_mana')
+    overload = make_property('overload')
+    overload_next = make_property('overload_next')
+    number_hp_this_turn = make_property('number_hp_this_turn')
+    number_hp_this_game = make_property('number_hp_this_game')
+    tire_counter = make_property('tire_counter')
+
     # These zones have only one entity, use properties to represent them.
     hero = _make_single_zone_property('hero', 'heroes')
     hero_power = _make_single_zone_property('hero_power', 'hero_powers')
@@ -96,25 +121,22 @@ class Player(IndependentEntity):
 
         self.hero = all_heroes()[class_hero_map[deck.klass]](self.game, player_id)
         self.hero_power = all_hero_powers()[self.hero.init_hero_power_id](self.game, player_id)
-        self.deck = [all_cards()[card_id](self.game, player_id) for card_id in deck.card_id_list]
-        random.shuffle(self.deck)
+        self.deck.extend([all_cards()[card_id](self.game, player_id) for card_id in deck.card_id_list])
+        self.game.rng.shuffle(self.deck)
 
-        if player_id == start_player:
-            self.hand = self.deck[:self.StartCardOffensive]
-            self.deck = self.deck[self.StartCardOffensive:]
-        else:
-            self.hand = self.deck[:self.StartCardDefensive]
-            self.deck = self.deck[self.StartCardDefensive:]
+        n_start = self.StartCardOffensive if player_id == start_player else self.StartCardDefensive
+        self.hand.extend(self.deck[:n_start])
+        del self.deck[:n_start]
 
         self.tire_counter = 0
 
     def on_replace_done(self, replace):
         replace = sorted(set(replace))  # Get sorted unique elements
         info('Replace hand {} of player {}'.format(replace, self.player_id))
-        replace_index = random.sample(list(range(len(self.deck))), k=len(replace))
+        replace_index = self.game.rng.sample(list(range(len(self.deck))), k=len(replace))
         for hand_index, deck_index in zip(replace, replace_index):
             self.deck[deck_index], self.hand[hand_index] = self.hand[hand_index], self.deck[deck_index]
-        random.shuffle(self.deck)
+        self.game.rng.shuffle(self.deck)
 
         # Add coin into defensive hand
         if self.player_id != self.start_player:
@@ -166,7 +188,8 @@ class Player(IndependentEntity):
 
         # If the play board is full, do nothing.
         if self.full(to_zone):
-            debug('{} full!'.format(Zone.Idx2Str[to_zone]))
+            if not self.game.fast:
+                debug('{} full!'.format(Zone.Idx2Str[to_zone]))
             return None, {
                 'success': False,
                 'events': [],
@@ -263,29 +286,45 @@ class Player(IndependentEntity):
         [NOTE]: The returned zone is always a list, even for zones that only contains one entity, such as ``Zone.Hero``.
         :param zone: The zone id.
         :return: The list of the given zone.
-        :rtype: list
+        :rtype: ZoneList
         """
-        if zone == Zone.Deck:
-            return self.deck
-        if zone == Zone.Hand:
-            return self.hand
-        if zone == Zone.Secret:
-            return self.secret
-        if zone == Zone.Play:
-            return self.play
-        if zone == Zone.Graveyard:
-            return self.graveyard
-        if zone == Zone.Weapon:
-            return self.weapons
-        if zone == Zone.Hero:
-            return self.heroes
-        if zone == Zone.HeroPower:
-            return self.hero_powers
-        raise ValueError('Does not have zone {!r}'.format(Zone.Idx2Str.get(zone, zone)))
+        try:
+            # [NOTE]: Negative zone ids are invalid, not indices from the end.
+            result = self.zones[zone] if zone >= 0 else None
+        except (IndexError, TypeError):
+            result = None
+        if result is None:
+            raise ValueError('Does not have zone {!r}'.format(Zone.Idx2Str.get(zone, zone)))
+        return result
 
     def get_entity(self, zone, location=0):
         return self.get_zone(zone)[location]
 
+    def add_enchantment(self, enchantment):
+        super().add_enchantment(enchantment)
+        if isinstance(enchantment, DHBonusMixin):
+            self._invalidate_dh_bonus()
+
+    def remove_enchantment(self, enchantment, error_not_found=False):
+        super().remove_enchantment(enchantment, error_not_found=error_not_found)
+        if isinstance(enchantment, DHBonusMixin):
+            self._invalidate_dh_bonus()
+
+    def _invalidate_dh_bonus(self):
+        """Invalidate the damage/healing bonus cache, called when bonus enchantments are added or removed."""
+        # [NOTE]: Always save the cache into the journal (even if it is empty), since it is filled lazily.
+        journal_save_attr(self.game, self, '_dh_bonus_cache')
+        self._dh_bonus_cache = {}
+
+    def invalidate_spell_power(self):
+        """Invalidate the spell power cache, called when an entity may change the spell power of the player.
+
+        See ``Card._on_tag_changed`` for details.
+        """
+        # [NOTE]: Always save the cache into the journal (even if it is None), since it is calculated lazily.
+        journal_save_attr(self.game, self, '_spell_power_cache')
+        self._spell_power_cache = None
+
     def get_damage_bonus(self, source, bonus_type, event_type):
         """Get number of damage bonus with given source and bonus type.
 
@@ -296,16 +335,25 @@ class Player(IndependentEntity):
 
         [NOTE]: If bonus number of ``DamageBonusType.Double`` is 3, it means the damage will be doubled 3 times,
             so the result is ``value *= (1 << 3)``.
+
+        [NOTE]: Bonus enchantments are cached (until bonus enchantments of this player are changed),
+            but bonus values are not, so ``DHBonusMixin.get_bonus_value`` can be dynamic.
         """
 
-        result = sum(e.get_bonus_value() for e in self.all_enchantments() if
-                     isinstance(e, DHBonusMixin) and
-                     event_type in e.event_types and
-                     source.type in e.source_types and
-                     bonus_type in e.bonus_types)
+        source_type = source.type
+        key = event_type, source_type, bonus_type
+        enchantments = self._dh_bonus_cache.get(key)
+        if enchantments is None:
+            enchantments = self._dh_bonus_cache[key] = tuple(
+                e for e in self.all_enchantments() if
+                isinstance(e, DHBonusMixin) and
+                event_type in e.event_types and
+                source_type in e.source_types and
+                bonus_type in e.bonus_types)
+        result = sum(e.get_bonus_value() for e in enchantments) if enchantments else 0
 
         # Add spell power in this case.
-        if source.type == Type.Spell and bonus_type == DHBonusType.Add and event_type == DHBonusEventType.Damage:
+        if source_type == Type.Spell and bonus_type == DHBonusType.Add and event_type == DHBonusEventType.Damage:
             result += self.get_spell_power()
         return result
 
@@ -323,11 +371,15 @@ class Player(IndependentEntity):
 
         # Collect spell power value of all related entities directly, so the value will be permanent.
         # Spell power is a permanent attribute, like stealth, taunt, etc. So its always up-to-date.
+        # The total value is cached, and invalidated when the spell power, zone or player id of a card is changed.
 
         # [NOTE]: Only collect minions and weapons in play. May add hero power and player in future,
         # see <https://hearthstone.gamepedia.com/Jungle_Moonkin#Notes> for more details.
 
-        result = sum(e.spell_power for e in itertools.chain(self.get_zone(Zone.Play), self.get_zone(Zone.Weapon)))
+        result = self._spell_power_cache
+        if result is None:
+            result = self._spell_power_cache = sum(
+                e.spell_power for e in itertools.chain(self.get_zone(Zone.Play), self.get_zone(Zone.Weapon)))
         return result
 
     # Turn related methods.
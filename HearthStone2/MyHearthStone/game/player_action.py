@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from .events import standard
+from .journal import journal_save
 from ..utils.message import entity_message
 
 __author__ = 'fyabc'
@@ -219,6 +220,7 @@ def process_special_pa(game, player_action):
     if isinstance(player_action, ReplaceStartCard):
         if game.state != game.GameState.WaitReplace:
             return False
+        journal_save(game, game.data['replaces'])
         game.data['replaces'][player_action.player_id] = player_action.replace_list[:]
         if all(l is not None for l in game.data['replaces']):
             game.on_replace_done()
@@ -30,10 +30,8 @@ Op list examples:
       SelectChoice, [SelectTarget], Done
 """
 
-import random as _random
-
 from . import player_action as pa
-from ..utils.game import EnumMeta, Type
+from ..utils.game import EnumMeta, Type, Zone
 
 __author__ = 'fyabc'
 
@@ -124,12 +122,20 @@ class PlayerOpTree:
             self._single_child = False
         self._child_or_map = child_or_map
 
-    def next_op(self, choice=None, random=False):
+    def next_op(self, choice=None, rng=None):
+        """Get the next operation of the choice.
+
+        :param choice: The choice, ignored if this node has a single child.
+        :param rng: If given, select a random choice with this random number generator (usually ``game.rng``),
+            so the selection is reproducible in the game.
+        :type rng: random.Random
+        :return: The next operation.
+        """
         if self._single_child:
             return self._child_or_map
         else:
-            if random:
-                return self._child_or_map[_random.choice(self.get_choices())]
+            if rng is not None:
+                return self._child_or_map[rng.choice(self.get_choices())]
             else:
                 return self._child_or_map[choice]
 
@@ -172,6 +178,22 @@ class RunTree(PlayerOpTree):
         return self._run_fn(game, po_data)
 
 
+def target_filter(zones=(Zone.Play, Zone.Hero), players=None, exact=False):
+    """Decorator that annotates a ``check_target`` method with its candidate targets.
+
+    The legal action enumerator (see ``legal_actions``) uses it to narrow the candidate targets,
+    instead of calling ``check_target`` on every entity.
+
+    :param zones: Zones of valid targets. Valid targets must be in these zones.
+    :param players: Owner of valid targets: None (both players), 'friendly' or 'enemy'.
+    :param exact: If True, all entities in the zones of the players are valid targets, ``check_target`` is not called.
+    """
+    def decorator(check_target):
+        check_target.target_filter = tuple(zones), players, exact
+        return check_target
+    return decorator
+
+
 # Some commonly used run functions and run nodes.
 
 def _extra_po_data(po_data):
@@ -318,4 +340,5 @@ __all__ = [
 
     'translate_po_tree',
     'get_common_po_tree_by_type',
+    'target_filter',
 ]
@@ -0,0 +1,196 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Zobrist hashing of game states.
+
+The state hash is a 64-bit integer, equal for equal game states, and different for different states with high
+probability. It is the XOR of random keys of state components:
+    Tags: Key of (card id, tag, value) of each entity-level tag whose value is not the class-level value.
+        Keys of tags of an entity are combined in ``TagStore.hash``, which is updated when a tag is changed.
+    Effects: Key of (card id, enchantments, deathrattles) of each entity with enchantments or deathrattles.
+        Enchantments are represented by their ids, deathrattles (``dr_list``) by their types and ids of their owners,
+        both in order. Aura enchantments are not hashed, they are determined by auras in play.
+    Locations: Key of (player id, zone, slot, card id) of each entity in zones of players, mixed with the tag hash and
+        the effect key of the entity (so tags and effects are bound to the location). Location hashes are cached in each zone list, and the cache
+        is invalidated when the zone is changed or an entity in it is changed.
+    Players (tags of players, include mana counters), the current player, the number of turns and the game result.
+
+Keys are derived from a stable digest of their components instead of the builtin ``hash`` (randomized for strings),
+so hashes of the same state are equal across processes and machines (lockstep network clients, saved replays).
+
+[NOTE]: Tags with values of other types than None, bool, int, float and str (such as lists) are not hashed as tags.
+Tags 'zone' and 'player_id' are not hashed, they are represented by locations.
+Tag 'dr_list' is hashed as effects.
+"""
+
+from hashlib import blake2b
+
+__author__ = 'fyabc'
+
+_Mask = (1 << 64) - 1
+_PrimitiveTypes = frozenset([type(None), bool, int, float, str])
+
+# Tags represented by locations.
+SkipTags = frozenset(['zone', 'player_id'])
+
+# Caches of keys.
+_tag_keys = {}
+_location_keys = {}
+_effect_keys = {}
+_game_keys = {}
+
+
+def _digest(material):
+    return int.from_bytes(blake2b(repr(material).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _normalize(value):
+    # Equal values must have the same key (True == 1 == 1.0).
+    if type(value) is bool:
+        return int(value)
+    if type(value) is float and value.is_integer():
+        return int(value)
+    return value
+
+
+def tag_key(card_id, tag, value):
+    """Get the key of the tag value of entities of the card, 0 for values that are not hashed."""
+    if type(value) not in _PrimitiveTypes or tag in SkipTags:
+        return 0
+    key = card_id, tag, value
+    try:
+        return _tag_keys[key]
+    except KeyError:
+        result = _tag_keys[key] = _digest(('tag', card_id, tag, _normalize(value)))
+        return result
+
+
+def location_key(player_id, zone, slot, card_id):
+    """Get the key of an entity of the card at the location."""
+    key = player_id, zone, slot, card_id
+    try:
+        return _location_keys[key]
+    except KeyError:
+        result = _location_keys[key] = _digest(('location', player_id, zone, slot, card_id))
+        return result
+
+
+def _trigger_id(trigger):
+    owner = trigger.owner
+    return type(trigger).__name__, None if owner is None else owner.id
+
+
+def effect_key(entity):
+    """Get the key of enchantments and deathrattles of the entity, 0 if it has none."""
+    enchantments = getattr(entity, 'enchantments', None)
+    dr_list = getattr(entity, 'dr_list', None)
+    if not enchantments and not dr_list:
+        return 0
+    key = (
+        entity.data.card_id,
+        tuple(enchantment.id for enchantment in enchantments or ()),
+        tuple(_trigger_id(trigger) for trigger in dr_list or ()),
+    )
+    try:
+        return _effect_keys[key]
+    except KeyError:
+        result = _effect_keys[key] = _digest(('effect',) + key)
+        return result
+
+
+def game_key(name, value):
+    """Get the key of a game attribute (such as the number of turns)."""
+    key = name, value
+    try:
+        return _game_keys[key]
+    except KeyError:
+        result = _game_keys[key] = _digest(('game', name, value))
+        return result
+
+
+def mix(value):
+    """Mix bits of the 64-bit value (the finalizer of SplitMix64)."""
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & _Mask
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & _Mask
+    return value ^ (value >> 31)
+
+
+def tags_hash(card_id, tags, defaults):
+    """Compute the tag hash of an entity from scratch.
+
+    :param card_id: The card id of the entity.
+    :param tags: Iterable of entity-level (tag, value) pairs.
+    :param defaults: Callable, get the class-level value of the tag.
+    :return: The tag hash.
+    """
+    result = 0
+    for tag, value in tags:
+        default = defaults(tag)
+        if value is not default and value != default:
+            result ^= tag_key(card_id, tag, value)
+    return result
+
+
+def zone_hash(zone_list, player_id, zone):
+    """Get the hash of entities in the zone, use the cache of the zone list if available."""
+    result = zone_list._hash
+    if result is None:
+        result = 0
+        for slot, entity in enumerate(zone_list):
+            data = entity.data
+            result ^= mix(location_key(player_id, zone, slot, data.card_id) ^ data.hash ^ effect_key(entity))
+        # [NOTE]: The cache is saved into the journal when it is set or invalidated (see ``Game.mark_changed``),
+        # so it is consistent with the game state after rollback.
+        journal = zone_list.game.journal
+        if journal is not None:
+            journal.save_slot(zone_list, '_hash')
+        zone_list._hash = result
+    return result
+
+
+def _game_part(game):
+    return game_key('turn', game.n_turns) ^ game_key('current_player', game.current_player) ^ \
+           game_key('result', game.game_result)
+
+
+def state_hash(game):
+    """Get the hash of the game state. See ``Game.state_hash``."""
+    result = _game_part(game)
+    for player in game.players:
+        player_id = player.player_id
+        result ^= mix(location_key(player_id, None, None, None) ^ player.data.hash)
+        for zone, zone_list in enumerate(player.zones):
+            if zone_list is not None:
+                result ^= zone_hash(zone_list, player_id, zone)
+    return result
+
+
+def full_state_hash(game):
+    """Compute the hash of the game state from scratch (without any caches), used to verify ``state_hash``."""
+    def _tag_hash(entity):
+        data = entity.data
+        return tags_hash(data.card_id, data.entity_items(), lambda tag: data.cls_data.get(tag, data.Unset))
+
+    result = _game_part(game)
+    for player in game.players:
+        player_id = player.player_id
+        result ^= mix(location_key(player_id, None, None, None) ^ _tag_hash(player))
+        for zone, zone_list in enumerate(player.zones):
+            if zone_list is not None:
+                for slot, entity in enumerate(zone_list):
+                    result ^= mix(location_key(player_id, zone, slot, entity.data.card_id) ^ _tag_hash(entity) ^
+                                  effect_key(entity))
+    return result
+
+
+__all__ = [
+    'tag_key',
+    'location_key',
+    'effect_key',
+    'game_key',
+    'mix',
+    'tags_hash',
+    'zone_hash',
+    'state_hash',
+    'full_state_hash',
+]
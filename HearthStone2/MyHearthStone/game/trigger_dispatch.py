@@ -0,0 +1,103 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Dispatch entries of triggers.
+
+An entry contains all registered triggers that respond to a concrete event class at a timing, sorted in order of play.
+Triggers with declarative filters (see ``Trigger.owner_is_self``, ``Trigger.target_is_self`` and
+``Trigger.friendly_only``) are also indexed by the filter keys, so triggers that cannot match an event
+are never touched when collecting candidates of the event.
+"""
+
+from itertools import chain
+
+from .triggers.trigger import event_player_id
+
+__author__ = 'fyabc'
+
+
+def _group(index, key, trigger):
+    group = index.get(key)
+    if group is None:
+        index[key] = [trigger]
+    else:
+        group.append(trigger)
+
+
+class DispatchEntry:
+    """Triggers of an event class and a timing, sorted in order of play and indexed by declarative filters.
+
+    Each trigger is put into only one group (general, event owner, event target or event player),
+    other filters of it are checked in ``Trigger.queue_condition``.
+    """
+
+    __slots__ = ('triggers', 'general', 'by_owner', 'by_target', 'by_player', '_rank')
+
+    def __init__(self, triggers):
+        """
+
+        :param triggers: Triggers, sorted in order of play.
+        """
+        self.triggers = tuple(triggers)
+
+        general = []
+        # Dict keys are filter entities (hashed by identity), or player ids.
+        by_owner, by_target, by_player = {}, {}, {}
+        for trigger in self.triggers:
+            if trigger.owner_is_self:
+                _group(by_owner, trigger.filter_entity, trigger)
+            elif trigger.target_is_self:
+                _group(by_target, trigger.filter_entity, trigger)
+            elif trigger.friendly_only:
+                _group(by_player, trigger.filter_entity.player_id, trigger)
+            else:
+                general.append(trigger)
+
+        self.general = tuple(general)
+        self.by_owner = by_owner
+        self.by_target = by_target
+        self.by_player = by_player
+        # Rank of triggers in order of play, used to merge groups.
+        self._rank = None
+
+    def __bool__(self):
+        return bool(self.triggers)
+
+    def __len__(self):
+        return len(self.triggers)
+
+    def candidates(self, event):
+        """Get triggers that may be queued by the event, in order of play.
+
+        :param event: The event.
+        :return: Sequence of triggers, queue conditions are not checked.
+        """
+        if not (self.by_owner or self.by_target or self.by_player):
+            return self.general
+
+        groups = [self.general] if self.general else []
+        if self.by_owner:
+            group = self.by_owner.get(event.owner)
+            if group:
+                groups.append(group)
+        if self.by_target:
+            group = self.by_target.get(getattr(event, 'target', None))
+            if group:
+                groups.append(group)
+        if self.by_player:
+            group = self.by_player.get(event_player_id(event))
+            if group:
+                groups.append(group)
+
+        if len(groups) <= 1:
+            return groups[0] if groups else ()
+
+        rank = self._rank
+        if rank is None:
+            rank = self._rank = {trigger: i for i, trigger in enumerate(self.triggers)}
+        return sorted(chain.from_iterable(groups), key=rank.__getitem__)
+
+
+__all__ = [
+    'DispatchEntry',
+]
@@ -26,6 +26,9 @@ class DrTrigger(Trigger):
     """
     respond = [standard.DeathEvent]
 
+    # Only process the death of the target.
+    owner_is_self = True
+
     def __init__(self, game, owner, target, dr_fn, reg_fn=None, data=None):
         """
 
@@ -45,6 +48,10 @@ class DrTrigger(Trigger):
         self.reg_fn = reg_fn
         self.data = {} if data is None else data
 
+    @property
+    def filter_entity(self):
+        return self.target
+
     def copy(self, new_owner=None, new_target=None):
         result = super().copy(new_owner=new_owner)
         if new_target is not None:
@@ -57,9 +64,6 @@ class DrTrigger(Trigger):
             self.reg_fn(self)
 
     def process(self, event: respond[0]):
-        # Only process the death of the target.
-        if event.owner is not self.target:
-            return []
         result = self.dr_fn(self, event) if self.dr_fn is not None else []
 
         # Remove myself from core after processing.
@@ -9,6 +9,14 @@ from ...utils.game import Zone
 __author__ = 'fyabc'
 
 
+def event_player_id(event):
+    """Get the player id of the event (``event.player_id``, or the player id of the event owner), or None."""
+    player_id = getattr(event, 'player_id', None)
+    if player_id is None:
+        player_id = getattr(event.owner, 'player_id', None)
+    return player_id
+
+
 class Trigger:
     """The base trigger class."""
     Before = 0
@@ -22,6 +30,23 @@ class Trigger:
     # such as ``respond[0], timing[0]; respond[1], timing[1]; ...``.
     timing = [After]
 
+    # Declarative filters of events, checked before ``_queue_condition``.
+    # "Self" is the filter entity of the trigger (see ``filter_entity``, the owner by default).
+    # ``Game`` indexes triggers by these filters, so triggers are not touched by events that cannot match.
+    # [NOTE]: Filters are checked when queueing triggers, not when processing them.
+    # Only queue for events whose owner is self.
+    owner_is_self = False
+    # Only queue for events whose target is self.
+    target_is_self = False
+    # Only queue for events of the player of self (see ``event_player_id``).
+    friendly_only = False
+    # Does this class have any declarative filters? Set automatically in subclasses.
+    _has_filters = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._has_filters = bool(cls.owner_is_self or cls.target_is_self or cls.friendly_only)
+
     def __init__(self, game, owner):
         """
 
@@ -40,6 +65,11 @@ class Trigger:
     def oop(self):
         return self.owner.oop
 
+    @property
+    def filter_entity(self):
+        """The entity that declarative filters compare with."""
+        return self.owner
+
     def copy(self, new_owner=None):
         result = cp(self)
 
@@ -54,8 +84,23 @@ class Trigger:
         if not self.enable:
             return False
 
+        if self._has_filters and not self.filter_match(event):
+            return False
+
         return self._queue_condition(event)
 
+    def filter_match(self, event):
+        """Check if the event matches declarative filters of this trigger."""
+
+        entity = self.filter_entity
+        if self.owner_is_self and event.owner is not entity:
+            return False
+        if self.target_is_self and getattr(event, 'target', None) is not entity:
+            return False
+        if self.friendly_only and event_player_id(event) != entity.player_id:
+            return False
+        return True
+
     def _queue_condition(self, event):
         """Implemented in subclasses."""
 
@@ -138,6 +183,7 @@ class StandardAfterTrigger(AttachedTrigger):
 
 
 __all__ = [
+    'event_player_id',
     'Trigger',
     'AttachedTrigger',
     'StandardBeforeTrigger',
@@ -0,0 +1,262 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Headless self-play simulation runner.
+
+Play games between two AI agents (see ``Agent.AgentClasses``) without any frontend, using a process pool.
+Results of games are streamed into a JSONL or CSV file (decided by the extension of the output file).
+
+Example::
+
+    python -m MyHearthStone.simulate -n 1000 -a BaseAgent PlayNoTarget -d <deck code 0> <deck code 1> -o result.jsonl
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+__author__ = 'fyabc'
+
+ResultFields = ['index', 'seed', 'winner', 'result', 'turns', 'actions', 'duration', 'error']
+
+# Game settings of the worker process, set by ``_init_worker``.
+_Worker = {}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Headless self-play simulation of My HearthStone Game.')
+
+    group_basic = parser.add_argument_group('Basic', 'basic settings')
+    group_basic.add_argument('-l', '--log-level', metavar='level', action='store', default='warning',
+                             dest='debug_level', choices=['debug', 'verbose', 'info', 'warning', 'error', 'critical'],
+                             help='Game logging level, default is %(default)r')
+    group_basic.add_argument('-L', '--scr-log', action='store_true', default=False, dest='screen_log',
+                             help='Show logging message into screen, default is %(default)r')
+
+    group_sim = parser.add_argument_group('Simulation', 'simulation settings')
+    group_sim.add_argument('-n', '--games', metavar='N', action='store', default=100, type=int, dest='n_games',
+                           help='Number of games, default is %(default)r')
+    group_sim.add_argument('-a', '--agents', metavar='name', action='store', nargs=2,
+                           default=['BaseAgent', 'BaseAgent'], dest='agents',
+                           help='Agent names of player 0 and 1, default is %(default)r')
+    group_sim.add_argument('-d', '--decks', metavar='code', action='store', nargs='+', required=True, dest='decks',
+                           help='Deck codes (or deck code files) of player 0 and 1, '
+                                'if only one deck is given, both players use it')
+    group_sim.add_argument('-j', '--jobs', metavar='N', action='store', default=None, type=int, dest='jobs',
+                           help='Number of worker processes, default is the number of CPU cores')
+    group_sim.add_argument('-s', '--seed', metavar='seed', action='store', default=None, type=int, dest='seed',
+                           help='Base random seed, the i-th game use seed + i, default is a random seed')
+    group_sim.add_argument('-t', '--max-turns', metavar='N', action='store', default=None, type=int,
+                           dest='max_turns', help='Stop unfinished games after N turns, default is unlimited')
+    group_sim.add_argument('-o', '--output', metavar='file', action='store', default=None, dest='output',
+                           help='Output file of game results (*.jsonl or *.csv), default is JSONL to stdout')
+
+    group_sim.add_argument('--no-fast', action='store_false', default=True, dest='fast',
+                           help='Disable the fast mode of games (log event messages and record event history)')
+
+    group_debug = parser.add_argument_group('Debug', 'debug settings')
+    group_debug.add_argument('--raise', action='store_true', default=False, dest='raise_exception',
+                             help='Re-raise exceptions in the game, not record them, default is %(default)r')
+
+    return parser
+
+
+def load_config(args):
+    # Load project config.
+    # [NOTE]: This must before the import of any other game modules.
+    from .utils.constants import load_arg_config
+    load_arg_config({
+        'Logging': {
+            'Level': args.debug_level.upper(),
+            'ScreenLog': args.screen_log,
+        },
+        'Game': {
+            'Fast': args.fast,
+        },
+    })
+
+
+def _load_deck(code_or_file):
+    from .game.deck import Deck
+
+    if os.path.isfile(code_or_file):
+        with open(code_or_file, 'r', encoding='utf-8') as f:
+            code_or_file = f.read()
+    return Deck.from_code(code_or_file)
+
+
+def play_game(decks, agent_names, seed, max_turns=None, raise_exception=False):
+    """Play a game between two agents.
+
+    :param decks: Decks of player 0 and 1.
+    :param agent_names: Agent names of player 0 and 1.
+    :param seed: Random seed of the game.
+    :param max_turns: Stop the game after ``max_turns`` turns (the result will be None).
+    :param raise_exception: Re-raise exceptions in the game.
+    :return: Dict of game result, keys are ``ResultFields`` (except the index).
+    :rtype: dict
+    """
+    from .game.core import Game
+    from .game import player_action as pa
+    from .ai.standard import get_agent_by_name
+
+    start_time = time.perf_counter()
+    game = Game(seed=seed)
+    n_actions = 0
+    error_msg = None
+    try:
+        game.start_game(decks, mode='standard')
+        agents = [get_agent_by_name(name)(game, player_id) for player_id, name in enumerate(agent_names)]
+        for agent in agents:
+            game.run_player_action(pa.ReplaceStartCard(game, agent.player_id, agent.get_replace_card()))
+        while game.game_result is None:
+            if max_turns is not None and game.n_turns >= max_turns:
+                break
+            game.run_player_action(agents[game.current_player].get_player_action())
+            n_actions += 1
+    except Exception as e:
+        if raise_exception:
+            raise
+        error_msg = '{}: {}'.format(type(e).__name__, e)
+
+    return {
+        'seed': seed,
+        'winner': {Game.ResultWin0: 0, Game.ResultWin1: 1}.get(game.game_result),
+        'result': game.game_result,
+        'turns': game.n_turns,
+        'actions': n_actions,
+        'duration': time.perf_counter() - start_time,
+        'error': error_msg,
+    }
+
+
+def _init_worker(args):
+    """Initialize the worker process: load config, setup logging and load card packages (only once)."""
+    load_config(args)
+
+    from .utils.constants import C
+    from .utils.message import setup_logging
+    from .utils.package_io import all_cards
+
+    # Skip creating log records of lower levels, they are expensive in the inner loop of the game.
+    level = logging.getLevelName(C.Logging.Level)
+    logging.disable(level - 1)
+    # Each worker process has its own log file.
+    setup_logging(file='simulate-{}.txt'.format(os.getpid()), level=level,
+                  scr_log=C.Logging.ScreenLog, scr_level=level)
+    all_cards()
+
+    _Worker.update(
+        decks=[_load_deck(code) for code in args.decks],
+        agent_names=args.agents,
+        max_turns=args.max_turns,
+        raise_exception=args.raise_exception,
+    )
+
+
+def _run_task(task):
+    index, seed = task
+    decks = _Worker['decks']
+    result = play_game(decks * 2 if len(decks) == 1 else decks, _Worker['agent_names'], seed,
+                       max_turns=_Worker['max_turns'], raise_exception=_Worker['raise_exception'])
+    result['index'] = index
+    return result
+
+
+class _ResultWriter:
+    def __init__(self, f, csv_format):
+        self.f = f
+        self.csv_writer = csv.DictWriter(f, ResultFields) if csv_format else None
+        if self.csv_writer is not None:
+            self.csv_writer.writeheader()
+
+    def write(self, result):
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(result)
+        else:
+            self.f.write(json.dumps({k: result[k] for k in ResultFields}) + '\n')
+        self.f.flush()
+
+
+def simulate(args):
+    """Run the simulation, return the summary dict."""
+    base_seed = random.getrandbits(32) if args.seed is None else args.seed
+    tasks = [(i, base_seed + i) for i in range(args.n_games)]
+    jobs = os.cpu_count() if args.jobs is None else args.jobs
+
+    if args.output is None:
+        f = sys.stdout
+    else:
+        f = open(args.output, 'w', encoding='utf-8', newline='')
+    writer = _ResultWriter(f, args.output is not None and args.output.endswith('.csv'))
+
+    summary = {
+        'seed': base_seed, 'games': 0, 'wins': [0, 0], 'draws': 0, 'unfinished': 0, 'errors': 0, 'turns': 0,
+    }
+
+    def _collect(result):
+        writer.write(result)
+        summary['games'] += 1
+        summary['turns'] += result['turns']
+        if result['error'] is not None:
+            summary['errors'] += 1
+        elif result['winner'] is not None:
+            summary['wins'][result['winner']] += 1
+        elif result['result'] is None:
+            summary['unfinished'] += 1
+        else:
+            summary['draws'] += 1
+
+    start_time = time.perf_counter()
+    try:
+        if jobs <= 1:
+            _init_worker(args)
+            for task in tasks:
+                _collect(_run_task(task))
+        else:
+            with mp.Pool(jobs, initializer=_init_worker, initargs=(args,)) as pool:
+                for result in pool.imap_unordered(_run_task, tasks, chunksize=max(1, len(tasks) // (jobs * 8))):
+                    _collect(result)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    summary['time'] = time.perf_counter() - start_time
+    summary['games_per_second'] = summary['games'] / summary['time'] if summary['time'] > 0 else 0.0
+    return summary
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    load_config(args)
+
+    from .ai.agent import Agent
+    # Import it to register agents.
+    from .ai import standard
+
+    for name in args.agents:
+        if name not in Agent.AgentClasses:
+            parser.error('Unknown agent {!r}, available agents: {}'.format(name, ', '.join(Agent.AgentClasses)))
+    if len(args.decks) > 2:
+        parser.error('Too many decks, expect 1 or 2 decks')
+    for code in args.decks:
+        if _load_deck(code) is None:
+            parser.error('Invalid deck code {!r}'.format(code))
+
+    summary = simulate(args)
+
+    print('Seed: {seed}, games: {games}, wins: {wins[0]} / {wins[1]}, draws: {draws}, unfinished: {unfinished}, '
+          'errors: {errors}, average turns: {avg_turns:.2f}'.format(
+            avg_turns=summary['turns'] / max(1, summary['games']), **summary), file=sys.stderr)
+    print('Time: {time:.2f}s, {games_per_second:.2f} games/s'.format(**summary), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
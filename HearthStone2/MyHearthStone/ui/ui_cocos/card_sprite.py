@@ -187,6 +187,9 @@ class HandSprite(EntitySprite):
         self.front_sprites = {}
         self.back_sprites = {}
 
+        # Version of the card when labels are updated, see ``GameEntity.state_version``.
+        self._content_version = None
+
         super().__init__(card, position, scale, **kwargs)
 
         # For active mixin.
@@ -383,16 +386,21 @@ class HandSprite(EntitySprite):
             self.unselected_effect = unsel_eff
         self.sel_mgr.set_sel_eff()
 
-        self.front_sprites['mana-label'][0].element.text = str(self._c_get('cost'))
-        self.front_sprites['mana-label'][0].element.color = self._get_cost_color()
-        if self._c_get('type') in (Type.Minion, Type.Weapon):
-            self.front_sprites['attack-label'][0].element.text = str(self._c_get('attack'))
-            self.front_sprites['health-label'][0].element.text = str(self._c_get('health'))
-            self.front_sprites['attack-label'][0].element.color = self._get_attack_color()
-            self.front_sprites['health-label'][0].element.color = self._get_health_color()
-        elif self._c_get('type') == Type.HeroCard:
-            self.front_sprites['armor-label'][0].element.text = str(self._c_get('armor'))
-        self.front_sprites['name'][0].element.text = self._c_get('name')
+        # Labels only depend on the card itself, skip them if the card is not changed.
+        version = None if self.static else self.entity.state_version
+        if version is None or version != self._content_version:
+            self._content_version = version
+            self.front_sprites['mana-label'][0].element.text = str(self._c_get('cost'))
+            self.front_sprites['mana-label'][0].element.color = self._get_cost_color()
+            if self._c_get('type') in (Type.Minion, Type.Weapon):
+                self.front_sprites['attack-label'][0].element.text = str(self._c_get('attack'))
+                self.front_sprites['health-label'][0].element.text = str(self._c_get('health'))
+                self.front_sprites['attack-label'][0].element.color = self._get_attack_color()
+                self.front_sprites['health-label'][0].element.color = self._get_health_color()
+            elif self._c_get('type') == Type.HeroCard:
+                self.front_sprites['armor-label'][0].element.text = str(self._c_get('armor'))
+            self.front_sprites['name'][0].element.text = self._c_get('name')
+        # [NOTE]: The description may depend on other entities (such as spell power), always render it.
         _r_desc = self._render_desc(self._c_get('description'))
         _e_desc = self.front_sprites['desc'][0].element
         if _e_desc.text != _r_desc:
@@ -430,6 +438,9 @@ class MinionSprite(EntitySprite):
         # TODO: (Need support of focus time in ``ActiveMixin``.)
         self.related_card = None
 
+        # Version of the minion when the content is updated, see ``GameEntity.state_version``.
+        self._content_version = None
+
         super().__init__(minion, position, scale, **kwargs)
 
     def _get_ds_sprite(self):
@@ -514,6 +525,12 @@ class MinionSprite(EntitySprite):
     def update_content(self, **kwargs):
         super().update_content(**kwargs)
 
+        # Skip the content if the minion is not changed since last update.
+        version = self.entity.state_version
+        if version == self._content_version:
+            return
+        self._content_version = version
+
         if self.entity.type == Type.Minion:
             if self.image_sprite is not None:
                 self.image_sprite.opacity = self._stealth_opacity()
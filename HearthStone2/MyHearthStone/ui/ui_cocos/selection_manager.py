@@ -228,9 +228,9 @@ class SelectionManager:
     def _msg_fn(self, msg: str):
         notice(self.board, msg)
 
-    def _next_operation(self, choice=None, random=False):
+    def _next_operation(self, choice=None, rng=None):
         """Wrapper of next operation, do some other processing."""
-        self.seq.next_operation(choice, random)
+        self.seq.next_operation(choice, rng)
         self.prepare_op()
         if self.seq.cursor_op is None:
             self._clear_selection()
@@ -61,9 +61,9 @@ class PlayerOperationSequence:
             return None
         return self._cursor.op
 
-    def next_operation(self, choice=None, random=False):
+    def next_operation(self, choice=None, rng=None):
         self._none_guard()
-        self._cursor = self._cursor.next_op(choice, random=random)
+        self._cursor = self._cursor.next_op(choice, rng=rng)
 
         if self._cursor is None:
             return None
@@ -1,6 +1,8 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
+import re
+
 __author__ = 'fyabc'
 
 
@@ -167,6 +169,92 @@ class DHBonusType(metaclass=EnumMeta):
     Double = 1
 
 
+class GameTag(metaclass=EnumMeta):
+    """An enumeration class, contains tags of game entities stored in fixed slots.
+
+    Tag names used in entity data are snake case names of the enumeration values (e.g. ``MaxHealth`` -> 'max_health'),
+    see ``GameTag.Tag2Idx`` and ``GameTag.Idx2Tag``.
+    Other tags (e.g. DIY tags of cards) are still supported, but they are stored in a dict, slower than these tags.
+    """
+
+    # Common tags.
+    Zone = 0
+    PlayerId = 1
+    Id = 2
+    Type = 3
+    Version = 4
+    Name = 5
+    Package = 6
+    Description = 7
+    Silenced = 8
+
+    # Card tags.
+    Cost = 9
+    Klass = 10
+    Rarity = 11
+    IsBasic = 12
+    Derivative = 13
+    PoTree = 14
+    Overload = 15
+    Battlecry = 16
+    Deathrattle = 17
+    Aura = 18
+    Secret = 19
+    Quest = 20
+    Echo = 21
+    Recruit = 22
+    Passive = 23
+    OnDraw = 24
+
+    # Tags of alive entities.
+    Attack = 25
+    Health = 26
+    MaxHealth = 27
+    Damage = 28
+    Armor = 29
+    NAttack = 30
+    ToBeDestroyed = 31
+    FirstTurn = 32
+    Exhausted = 33
+    CanAttack = 34
+    CanAttackHero = 35
+    Charge = 36
+    Rush = 37
+    Frozen = 38
+    Windfury = 39
+    MegaWindfury = 40
+    Taunt = 41
+    DivineShield = 42
+    Stealth = 43
+    Immune = 44
+    Elusive = 45
+    Poisonous = 46
+    Lifesteal = 47
+    AttackPoTree = 48
+    Race = 49
+    SpellPower = 50
+
+    # Deathrattle and damage/healing bonus tags.
+    DrTrigger = 51
+    DrList = 52
+    DhValues = 53
+    DhTypes = 54
+
+    # Player tags.
+    MaxMana = 55
+    UsedMana = 56
+    TempMana = 57
+    OverloadNext = 58
+    TireCounter = 59
+    HeroPower = 60
+    NumberHpThisGame = 61
+    NumberHpThisTurn = 62
+
+
+GameTag.Idx2Tag = [re.sub(r'(?<!^)(?=[A-Z])', '_', GameTag.Idx2Str[i]).lower() for i in range(GameTag.NumEnums)]
+GameTag.Tag2Idx = {tag: i for i, tag in enumerate(GameTag.Idx2Tag)}
+
+
 class Condition:
     """The class of conditions to get random cards or select cards."""
 
@@ -180,6 +268,7 @@ __all__ = [
     'Type', 'Zone', 'Rarity', 'Race', 'Klass',
     'AuraType',
     'DHBonusEventType', 'DHBonusType',
+    'GameTag',
     'Condition',
 
     'DefaultClassHeroMap',
@@ -42,12 +42,14 @@ setup(
     extras_require={
         'pyqt-frontend': ['PyQt5>=5.6.0'],
         'kivy-frontend': ['kivy>=1.8.0'],
+        'ai': ['numpy>=1.13'],
     },
 
     scripts=[],
     entry_points={
         'console_scripts': [
             'myhearthstone = MyHearthStone.main:main',
+            'myhearthstone-simulate = MyHearthStone.simulate:main',
         ]
     },
 )
@@ -0,0 +1,64 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ...test_utils.example import *
+
+from MyHearthStone.ai.encoder import StateEncoder
+from MyHearthStone.ai.mcts import action_key
+from MyHearthStone.ai.rule_based.greedy import GreedyAgent, linear_weights
+from MyHearthStone.ai.standard import get_agent_by_name
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.utils.game import Zone
+
+__author__ = 'fyabc'
+
+
+class TestGreedy(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game()
+
+    def tearDown(self):
+        self.game.end_game()
+
+    def testRegistered(self):
+        self.assertIs(get_agent_by_name('GreedyAgent'), GreedyAgent)
+
+    def testWeights(self):
+        encoder = StateEncoder()
+        weights = linear_weights(encoder, {('player', 'health'): (1.0, -2.0), ('play', 'attack'): (3.0, -3.0)})
+        features = encoder.features(self.game)
+        hero, enemy_hero = self.game.get_hero(self.game.current_player), self.game.get_hero(1 - self.game.current_player)
+        self.assertEqual(sum(w * f for w, f in zip(weights, features)), hero.health - 2 * enemy_hero.health)
+        self.assertEqual(sum(w != 0 for w in weights), 2 + 2 * 7)
+
+    def testGetPlayerAction(self):
+        game = self.game
+        for _ in range(4):
+            game.run_player_action(pa.TurnEnd(game))
+        player_id = game.current_player
+        agent = GreedyAgent(game, player_id)
+        hands = [id_list(game.get_zone(Zone.Hand, p)) for p in (0, 1)]
+
+        actions = game.get_legal_actions(all_positions=False)
+        scores = agent.score_actions(actions)
+        self.assertEqual(len(scores), len(actions))
+        action = agent.get_player_action()
+
+        # The simulation does not modify the game, and a minion is played (better than ending the turn).
+        self.assertListEqual(hands, [id_list(game.get_zone(Zone.Hand, p)) for p in (0, 1)])
+        self.assertIsInstance(action, pa.PlayMinion)
+        index = [action_key(a) for a in actions].index(action_key(action))
+        self.assertEqual(scores[index], max(s for s in scores if s is not None))
+
+    def testPlayGame(self):
+        game = self.game
+        agents = [GreedyAgent(game, 0), GreedyAgent(game, 1, lethal_time_limit=0.05)]
+        while game.game_result is None:
+            game.run_player_action(agents[game.current_player].get_player_action())
+        self.assertIsNotNone(game.game_result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.ai.encoder import StateEncoder, np
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.utils.game import Zone
+
+__author__ = 'fyabc'
+
+
+class TestEncoder(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game()
+        self.encoder = StateEncoder()
+
+    def tearDown(self):
+        self.game.end_game()
+
+    def _feature(self, features, part, *index):
+        start, _, shape = self.encoder.layout[part]
+        flat = 0
+        for i, dim in zip(index, shape):
+            flat = flat * dim + i
+        return features[start + flat]
+
+    def testFeatures(self):
+        game, encoder = self.game, self.encoder
+        player_id = game.current_player
+        features = encoder.features(game)
+        self.assertEqual(len(features), encoder.size)
+        self.assertListEqual(features, encoder.features(game, player_id))
+        self.assertEqual(self._feature(features, 'global', encoder.index('global', 'is_active')), 1.0)
+
+        enemy_features = encoder.features(game, 1 - player_id)
+        self.assertEqual(self._feature(enemy_features, 'global', encoder.index('global', 'is_active')), 0.0)
+        # Players are swapped.
+        n_hand = encoder.index('player', 'n_hand')
+        self.assertEqual(self._feature(features, 'player', 0, n_hand), len(game.get_zone(Zone.Hand, player_id)))
+        self.assertEqual(self._feature(features, 'player', 1, n_hand), len(game.get_zone(Zone.Hand, 1 - player_id)))
+        self.assertEqual(self._feature(enemy_features, 'player', 0, n_hand),
+                         self._feature(features, 'player', 1, n_hand))
+
+        # Cards in hand of the viewer.
+        hand = game.get_zone(Zone.Hand, player_id)
+        cost = encoder.index('hand', 'cost')
+        for i, card in enumerate(hand):
+            self.assertEqual(self._feature(features, 'hand', i, 0), 1.0)
+            self.assertEqual(self._feature(features, 'hand', i, cost), card.cost)
+        self.assertEqual(self._feature(features, 'hand', len(hand), 0), 0.0)
+
+    def testMinions(self):
+        game, encoder = self.game, self.encoder
+        for _ in range(4):
+            game.run_player_action(pa.TurnEnd(game))
+        player_id = game.current_player
+        minion = next(e for e in game.get_zone(Zone.Hand, player_id) if e.id == C11)
+        game.run_player_action(pa.PlayMinion(game, minion, 0, None))
+
+        features = encoder.features(game, player_id)
+        self.assertEqual(self._feature(features, 'play', 0, 0, 0), 1.0)
+        self.assertEqual(self._feature(features, 'play', 0, 0, encoder.index('play', 'attack')), minion.attack)
+        self.assertEqual(self._feature(features, 'play', 0, 0, encoder.index('play', 'ready')), 0.0)
+        self.assertEqual(self._feature(features, 'play', 0, 1, 0), 0.0)
+        enemy_features = encoder.features(game, 1 - player_id)
+        self.assertEqual(self._feature(enemy_features, 'play', 1, 0, 0), 1.0)
+        self.assertEqual(self._feature(enemy_features, 'play', 0, 0, 0), 0.0)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def testEncodeBatch(self):
+        game, encoder = self.game, self.encoder
+        games = [game, game.fork()]
+        games[1].run_player_action(pa.TurnEnd(games[1]))
+
+        out = encoder.new_buffer(4)
+        result = encoder.encode_batch(games, out=out)
+        self.assertIs(result, out)
+        for i, g in enumerate(games):
+            self.assertListEqual(out[i].tolist(), encoder.features(g))
+            self.assertListEqual(encoder.encode(g).tolist(), encoder.features(g))
+        self.assertFalse(out[2:].any())
+
+        views = encoder.unpack(out)
+        self.assertTupleEqual(views['play'].shape, (4,) + encoder.layout['play'][2])
+        self.assertEqual(views['player'][0, 0, encoder.index('player', 'health')], game.get_hero(game.current_player).health)
+
+        with self.assertRaises(ValueError):
+            encoder.encode_batch(games, out=encoder.new_buffer(1))
+        games[1].end_game()
+
+
+if __name__ == '__main__':
+    unittest.main()
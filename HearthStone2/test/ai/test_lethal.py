@@ -0,0 +1,161 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.ai.lethal import LethalSolver, damage_upper_bound, find_lethal, match_action, state_key
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.utils.game import Zone
+from MyHearthStone.utils.package_io import all_enchantments
+
+__author__ = 'fyabc'
+
+
+class TestLethal(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game()
+        self.player_id = self.game.current_player
+        self.enemy_hero = self.game.get_hero(1 - self.player_id)
+
+    def tearDown(self):
+        self.game.end_game()
+
+    def _win(self):
+        return self.game.ResultWin0 if self.player_id == 0 else self.game.ResultWin1
+
+    def testNoLethal(self):
+        game = self.game
+        result = find_lethal(game)
+        self.assertFalse(result.lethal)
+        self.assertTrue(result.complete)
+        self.assertListEqual(result.actions, [])
+
+        game.get_player(self.player_id).max_mana = 10
+        result = find_lethal(game)
+        self.assertFalse(result.lethal)
+        self.assertTrue(result.complete)
+        # The game is not modified.
+        self.assertEqual(self.enemy_hero.health, 30)
+        self.assertEqual(game.get_player(self.player_id).used_mana, 0)
+
+    def testLethal(self):
+        game = self.game
+        game.get_player(self.player_id).max_mana = 10
+        self.enemy_hero.damage = 22
+        key = state_key(game)
+        result = find_lethal(game)
+        self.assertTrue(result.lethal)
+        self.assertTrue(result.complete)
+        self.assertEqual(state_key(game), key)
+
+        for action_key in result.actions:
+            action = match_action(game, action_key)
+            self.assertIsNotNone(action)
+            game.run_player_action(action)
+        self.assertEqual(game.game_result, self._win())
+
+    def testTableReuse(self):
+        game = self.game
+        game.get_player(self.player_id).max_mana = 10
+        solver = LethalSolver()
+        result = solver.solve(game)
+        self.assertTrue(result.complete)
+        self.assertGreater(result.nodes, 1)
+        # The proven result of the root is reused by the next search.
+        result = solver.solve(game)
+        self.assertFalse(result.lethal)
+        self.assertTrue(result.complete)
+        self.assertEqual(result.nodes, 1)
+
+    def testBudget(self):
+        game = self.game
+        game.get_player(self.player_id).max_mana = 10
+        result = LethalSolver(max_nodes=1).solve(game)
+        self.assertFalse(result.lethal)
+        self.assertFalse(result.complete)
+
+    def testDamageUpperBound(self):
+        game = self.game
+        for _ in range(4):
+            game.run_player_action(pa.TurnEnd(game))
+        player_id = self.player_id
+        minion = next(e for e in game.get_zone(Zone.Hand, player_id) if e.id == C11)
+        game.run_player_action(pa.PlayMinion(game, minion, 0, None))
+        game.run_player_action(pa.TurnEnd(game))
+        game.run_player_action(pa.TurnEnd(game))
+
+        # Cards and hero power are playable, no bound.
+        self.assertIsNone(damage_upper_bound(game, game.get_legal_actions()))
+        game.get_player(player_id).used_mana = game.get_player(player_id).max_mana
+        self.assertEqual(damage_upper_bound(game, game.get_legal_actions()), minion.attack)
+
+        # The enemy taunt blocks the only attack.
+        enemy_id = 1 - player_id
+        taunt, _ = game.generate(enemy_id, Zone.Play, 0, C11)
+        taunt.taunt = True
+        self.assertEqual(damage_upper_bound(game, game.get_legal_actions()), 0)
+        self.assertFalse(find_lethal(game).lethal)
+
+    def testDeathrattleLethal(self):
+        game = self.game
+        player_id, enemy_id = self.player_id, 1 - self.player_id
+        # 麻风侏儒 (1/1, deathrattle: deal 2 damage to the enemy hero).
+        gnome, _ = game.generate(player_id, Zone.Play, 0, 1000004)
+        gnome.first_turn = False
+        game.generate(enemy_id, Zone.Play, 0, C11)
+        self.enemy_hero.damage = 28
+        game.get_player(player_id).used_mana = game.get_player(player_id).max_mana
+
+        # The attack to the enemy hero is not enough, killing the gnome by attacking the enemy minion is lethal.
+        result = find_lethal(game)
+        self.assertTrue(result.lethal)
+        self.assertTrue(result.complete)
+        for action_key in result.actions:
+            game.run_player_action(match_action(game, action_key))
+        self.assertEqual(game.game_result, self._win())
+
+    def testDeathrattleTable(self):
+        game = self.game
+        player_id = self.player_id
+        gnome, _ = game.generate(player_id, Zone.Play, 0, 1000004)
+        gnome.first_turn = False
+        game.generate(1 - player_id, Zone.Play, 0, C11)
+        self.enemy_hero.damage = 28
+        game.get_player(player_id).used_mana = game.get_player(player_id).max_mana
+
+        # A state (or a transposed state with equal hash) proven without lethal in the table is not trusted
+        # if there are deathrattles in play.
+        solver = LethalSolver()
+        solver.table.store(state_key(game), 0.0, depth=255)
+        result = solver.solve(game)
+        self.assertTrue(result.lethal)
+        self.assertTrue(result.complete)
+
+    def testDeathrattlePlacement(self):
+        game = example_game(journal=True)
+        player_id = game.current_player
+        minions = [game.generate(player_id, Zone.Play, i, C11)[0] for i in range(2)]
+        for minion in minions:
+            minion.first_turn = False
+        source, _ = game.generate(player_id, Zone.Hand, 'last', '1070007')
+        game.get_player(player_id).used_mana = game.get_player(player_id).max_mana
+        enchantment_class = all_enchantments()['1070001']
+
+        # Two lines that differ only by the minion with the deathrattle enchantment.
+        solver = LethalSolver()
+        cp = game.checkpoint()
+        for minion in minions:
+            enchantment_class.from_card(source, game, minion)
+            result = solver.solve(game)
+            self.assertFalse(result.lethal)
+            self.assertTrue(result.complete)
+            # Not proven by the result of the other line.
+            self.assertGreater(result.nodes, 1)
+            game.rollback(cp)
+        game.end_game()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.ai.mcts import MCTSAgent, action_key, determinize
+from MyHearthStone.ai.standard import get_agent_by_name
+from MyHearthStone.utils.game import Zone
+
+__author__ = 'fyabc'
+
+
+class TestMCTS(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game()
+
+    def tearDown(self):
+        self.game.end_game()
+
+    def testRegistered(self):
+        self.assertIs(get_agent_by_name('MCTSAgent'), MCTSAgent)
+
+    def testActionKey(self):
+        game = self.game
+        forked = game.fork()
+        self.assertListEqual([action_key(a) for a in game.get_legal_actions()],
+                             [action_key(a) for a in forked.get_legal_actions()])
+
+    def testDeterminize(self):
+        import random
+
+        game = self.game
+        player_id = game.current_player
+        enemy_id = 1 - player_id
+        forked = game.fork()
+        determinize(forked, player_id, random.Random(Seed))
+
+        # Known information is unchanged.
+        self.assertListEqual(id_list(game.get_zone(Zone.Hand, player_id)),
+                             id_list(forked.get_zone(Zone.Hand, player_id)))
+        for zone in (Zone.Hand, Zone.Deck):
+            self.assertEqual(len(game.get_zone(zone, enemy_id)), len(forked.get_zone(zone, enemy_id)))
+        self.assertListEqual(
+            sorted(id_list(game.get_zone(Zone.Hand, enemy_id)) + id_list(game.get_zone(Zone.Deck, enemy_id))),
+            sorted(id_list(forked.get_zone(Zone.Hand, enemy_id)) + id_list(forked.get_zone(Zone.Deck, enemy_id))))
+        for zone in (Zone.Hand, Zone.Deck):
+            for e in forked.get_zone(zone, enemy_id):
+                self.assertEqual(e.zone, zone)
+
+    def testGetPlayerAction(self):
+        game = self.game
+        player_id = game.current_player
+        agent = MCTSAgent(game, player_id, Iterations=20, TimeLimit=None, RolloutTurns=1)
+        n_events, hands = len(game.event_history), [id_list(game.get_zone(Zone.Hand, p)) for p in (0, 1)]
+        action = agent.get_player_action()
+
+        # The search does not modify the game.
+        self.assertEqual(len(game.event_history), n_events)
+        self.assertListEqual([id_list(game.get_zone(Zone.Hand, p)) for p in (0, 1)], hands)
+
+        self.assertIn(action_key(action), [action_key(a) for a in game.get_legal_actions()])
+        game.run_player_action(action)
+        self.assertGreater(len(game.event_history), n_events)
+
+    def testUnknownSetting(self):
+        with self.assertRaises(ValueError):
+            MCTSAgent(self.game, 0, Unknown=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
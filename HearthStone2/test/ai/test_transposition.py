@@ -0,0 +1,93 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import multiprocessing as mp
+import unittest
+
+from MyHearthStone.ai.transposition import TranspositionTable, SharedTranspositionTable
+
+__author__ = 'fyabc'
+
+# The shared table of the worker processes, inherited by forking.
+_Shared = {}
+
+
+def _store_worker(key):
+    table = _Shared['table']
+    table.store(key, key / 2, visits=key, depth=1, best=key % 3)
+    return table.probe(key) is not None
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def _check_table(self, table):
+        self.assertIsNone(table.probe(42))
+        self.assertTrue(table.store(42, 0.25, visits=3, depth=2, best=5))
+        entry = table.probe(42)
+        self.assertEqual(entry.value, 0.25)
+        self.assertEqual(entry.visits, 3)
+        self.assertEqual(entry.depth, 2)
+        self.assertEqual(entry.best, 5)
+
+        # A deeper entry of the current search is kept, entries of older searches are replaced.
+        self.assertFalse(table.store(42, 0.5, depth=1))
+        self.assertEqual(table.probe(42).value, 0.25)
+        table.new_search()
+        self.assertTrue(table.store(42, 0.5, depth=1))
+        self.assertEqual(table.probe(42).value, 0.5)
+
+        table.clear()
+        self.assertIsNone(table.probe(42))
+
+    def testTable(self):
+        self._check_table(TranspositionTable(memory=1 << 12))
+
+    def testSharedTable(self):
+        self._check_table(SharedTranspositionTable(memory=1 << 12))
+
+    def testMemoryBudget(self):
+        table = TranspositionTable(memory=1000, bucket_size=4)
+        self.assertEqual(table.capacity, 1000 // (TranspositionTable.EntryBytes * 4) * 4)
+        self.assertRaises(ValueError, TranspositionTable, memory=10)
+        self.assertRaises(ValueError, TranspositionTable, memory=1000, bucket_size=0)
+        self.assertRaises(ValueError, table.store, 1, 0.0, best=-2)
+
+    def testReplacement(self):
+        # One bucket of 2 entries.
+        table = TranspositionTable(memory=2 * TranspositionTable.EntryBytes, bucket_size=2)
+        table.store(1, 1.0, depth=5)
+        table.store(2, 2.0, depth=1)
+        # The shallower entry is replaced.
+        table.store(3, 3.0, depth=3)
+        self.assertIsNotNone(table.probe(1))
+        self.assertIsNone(table.probe(2))
+        self.assertIsNotNone(table.probe(3))
+
+        # Entries of older searches are replaced first (the shallower one), even if they are deeper than new entries.
+        table.new_search()
+        table.store(4, 4.0, depth=0)
+        self.assertIsNone(table.probe(3))
+        table.store(5, 5.0, depth=0)
+        self.assertIsNone(table.probe(1))
+        self.assertIsNotNone(table.probe(4))
+        self.assertIsNotNone(table.probe(5))
+
+    @unittest.skipIf('fork' not in mp.get_all_start_methods(), 'Require the "fork" start method')
+    def testSharedWorkers(self):
+        table = SharedTranspositionTable(memory=1 << 16)
+        _Shared['table'] = table
+        try:
+            with mp.get_context('fork').Pool(2) as pool:
+                results = pool.map(_store_worker, range(1, 101))
+        finally:
+            _Shared.clear()
+        self.assertTrue(all(results))
+        # Entries written by workers are visible in the parent process.
+        for key in range(1, 101):
+            entry = table.probe(key)
+            self.assertIsNotNone(entry)
+            self.assertEqual(entry.value, key / 2)
+            self.assertEqual(entry.best, key % 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of AI components (encoder, greedy agent, lethal finder and transposition tables)."""
+
+import multiprocessing as mp
+import random
+from time import perf_counter
+
+from bench_utils import *
+
+from MyHearthStone.ai.encoder import StateEncoder, np
+from MyHearthStone.ai.mcts import evaluate
+from MyHearthStone.ai.rule_based.basic import BaseAgent
+from MyHearthStone.ai.rule_based.greedy import GreedyAgent
+from MyHearthStone.ai.lethal import LethalSolver
+from MyHearthStone.ai.transposition import TranspositionTable, SharedTranspositionTable
+
+__author__ = 'fyabc'
+
+
+def _states(n):
+    game = mid_game(n_turns=10)
+    states = []
+    for _ in range(n):
+        state = game.fork()
+        agents = make_agents(state)
+        for _ in range(len(states) % 5):
+            if state.game_result is not None:
+                break
+            state.run_player_action(agents[state.current_player].get_player_action())
+        states.append(state)
+    return states
+
+
+def batch_score(encoder, states, out, weights):
+    """Linear part of ``evaluate`` on encoded states (the sigmoid is omitted in both methods)."""
+    views = encoder.unpack(encoder.encode_batch(states, player_ids=0, out=out))
+    player, play = views['player'], views['play']
+    i_health, i_armor, i_hand = (encoder.index('player', f) for f in ('health', 'armor', 'n_hand'))
+    i_attack, i_m_health = encoder.index('play', 'attack'), encoder.index('play', 'health')
+    side = (player[..., i_health] + player[..., i_armor] + 0.5 * player[..., i_hand] +
+            (play[..., i_attack] + play[..., i_m_health]).sum(axis=-1))
+    return side @ weights
+
+
+@benchmark
+def bench_encoder():
+    """Benchmark of the game state encoder.
+
+    Score a batch of mid-game states with the heuristic of the MCTS agent: evaluate each state in Python,
+    or encode all states into a preallocated buffer and score them with NumPy in one call.
+    """
+    encoder = StateEncoder()
+
+    n_states = 256
+    states = _states(n_states)
+    number = 5
+    rows = []
+
+    t = timeit(lambda: [evaluate(state, 0) for state in states], number=number)
+    rows.append(('evaluate each state', t / number / n_states * 1e6, 'us/state'))
+    t = timeit(lambda: [encoder.features(state, 0) for state in states], number=number)
+    rows.append(('features (list)', t / number / n_states * 1e6, 'us/state'))
+
+    if np is None:
+        print('NumPy is not installed, skip batch encoding')
+    else:
+        out = encoder.new_buffer(n_states)
+        weights = np.array([1.0, -1.0], dtype=out.dtype)
+        t = timeit(lambda: encoder.encode_batch(states, player_ids=0, out=out), number=number)
+        rows.append(('encode batch', t / number / n_states * 1e6, 'us/state'))
+        t = timeit(lambda: batch_score(encoder, states, out, weights), number=number)
+        rows.append(('encode + score batch', t / number / n_states * 1e6, 'us/state'))
+        # Scoring already encoded states (e.g. by a learned model) costs almost nothing per state.
+        t = timeit(lambda: out @ np.ones(encoder.size, dtype=out.dtype), number=number * 100)
+        rows.append(('score encoded batch', t / number / 100 / n_states * 1e6, 'us/state'))
+    report('State encoder ({} states, {} features)'.format(n_states, encoder.size), rows)
+
+
+@benchmark
+def bench_greedy():
+    """Benchmark of the greedy agent.
+
+    Play the greedy agent against ``BaseAgent``, report the win rate and the decision latency of the greedy agent
+    (which should be low enough for interactive frontends).
+    """
+    n_games = 20
+    wins, times = 0, []
+    for seed in range(n_games):
+        game = new_game(seed=seed)
+        greedy_id = seed % 2
+        agents = {greedy_id: GreedyAgent(game, greedy_id), 1 - greedy_id: BaseAgent(game, 1 - greedy_id)}
+        while game.game_result is None:
+            start = perf_counter()
+            action = agents[game.current_player].get_player_action()
+            if game.current_player == greedy_id:
+                times.append(perf_counter() - start)
+            game.run_player_action(action)
+        wins += game.game_result == (game.ResultWin0 if greedy_id == 0 else game.ResultWin1)
+
+    times.sort()
+    report('Greedy agent vs BaseAgent ({} games)'.format(n_games), [
+        ('win rate', wins / n_games * 100, '%'),
+        ('mean decision time', sum(times) / len(times) * 1e3, 'ms'),
+        ('p95 decision time', times[int(len(times) * 0.95)] * 1e3, 'ms'),
+        ('max decision time', times[-1] * 1e3, 'ms'),
+    ])
+
+
+@benchmark
+def bench_lethal():
+    """Benchmark of the lethal finder.
+
+    Solve lethal at each decision of games played by two ``BaseAgent``, report the solve time, the number of searched
+    nodes, and how many searches are completed (lethal found or proven not exist) within the time budget.
+    """
+    n_games = 3
+    time_limit = 1.0
+    solver = LethalSolver(time_limit=time_limit)
+    times, nodes, n_complete, n_lethal = [], [], 0, 0
+    for seed in range(n_games):
+        game = new_game(seed=seed)
+        agents = make_agents(game)
+        while game.game_result is None:
+            start = perf_counter()
+            result = solver.solve(game)
+            times.append(perf_counter() - start)
+            nodes.append(result.nodes)
+            n_complete += result.complete
+            n_lethal += result.lethal
+            game.run_player_action(agents[game.current_player].get_player_action())
+
+    n = len(times)
+    times.sort()
+    report('Lethal finder ({} positions of {} games, {}s budget)'.format(n, n_games, time_limit), [
+        ('completed searches', n_complete / n * 100, '%'),
+        ('lethal found', n_lethal, 'positions'),
+        ('mean nodes', sum(nodes) / n, 'nodes'),
+        ('mean solve time', sum(times) / n * 1e3, 'ms'),
+        ('median solve time', times[n // 2] * 1e3, 'ms'),
+    ])
+
+
+_Shared = {}
+
+
+def _keys(n, seed):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(n)]
+
+
+def _cost(table, n=100000):
+    keys = _keys(n, 0)
+    start = perf_counter()
+    for key in keys:
+        table.store(key, 0.5, visits=1, depth=1)
+    t_store = perf_counter() - start
+    start = perf_counter()
+    for key in keys:
+        table.probe(key)
+    t_probe = perf_counter() - start
+    return t_store / n * 1e6, t_probe / n * 1e6
+
+
+def _retention():
+    table = TranspositionTable(memory=1 << 16)
+    rng = random.Random(1)
+    deep = []
+    for key in _keys(table.capacity * 4, 1):
+        depth = rng.randrange(16)
+        table.store(key, 0.0, depth=depth)
+        if depth >= 12:
+            deep.append(key)
+    kept = sum(table.probe(key) is not None for key in deep)
+    return kept / len(deep), table.capacity / (table.capacity * 4)
+
+
+def _search_worker(seed):
+    table = _Shared.get('table')
+    if table is None:
+        table = TranspositionTable(memory=_Shared['memory'])
+    keys = _Shared['keys'][:]
+    random.Random(seed).shuffle(keys)
+    hits = 0
+    for key in keys:
+        if table.probe(key) is not None:
+            hits += 1
+        else:
+            table.store(key, 0.5)
+    return hits, len(keys)
+
+
+def _sharing(shared, workers=4, n_keys=20000, memory=1 << 22):
+    _Shared.update(keys=_keys(n_keys, 2), memory=memory)
+    if shared:
+        _Shared['table'] = SharedTranspositionTable(memory=memory)
+    try:
+        with mp.get_context('fork').Pool(workers) as pool:
+            results = pool.map(_search_worker, range(workers))
+    finally:
+        _Shared.clear()
+    return sum(h for h, _ in results) / sum(n for _, n in results)
+
+
+@benchmark
+def bench_transposition():
+    """Benchmark of transposition tables.
+
+    1. Cost of ``probe`` and ``store`` of the local and the shared table.
+    2. Retention: store 4x the capacity of keys with random depths, report how many deep entries are kept.
+    3. Sharing: pool workers search overlapping sets of states (probe, then store on miss),
+        report the hit rate with one shared table or with a local table in each worker.
+    """
+    rows = []
+    for name, cls in (('local', TranspositionTable), ('shared', SharedTranspositionTable)):
+        t_store, t_probe = _cost(cls(memory=1 << 24))
+        rows.append(('store ({})'.format(name), t_store, 'us'))
+        rows.append(('probe ({})'.format(name), t_probe, 'us'))
+
+    deep_kept, all_kept = _retention()
+    rows.append(('kept entries of depth >= 12 (4x full)', deep_kept * 100, '%'))
+    rows.append(('kept entries of all depths (4x full)', all_kept * 100, '%'))
+
+    if 'fork' in mp.get_all_start_methods():
+        rows.append(('hit rate of 4 workers (local tables)', _sharing(False) * 100, '%'))
+        rows.append(('hit rate of 4 workers (shared table)', _sharing(True) * 100, '%'))
+    report('Transposition tables', rows)
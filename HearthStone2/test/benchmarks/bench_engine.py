@@ -0,0 +1,491 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the game engine (triggers, auras, tags, events and zones)."""
+
+import gc
+import sys
+import tracemalloc
+
+from bench_utils import *
+
+from MyHearthStone.game.triggers.trigger import Trigger
+from MyHearthStone.game.events import standard as std_e
+from MyHearthStone.utils.game import order_of_play, Zone, Klass, DHBonusEventType
+from MyHearthStone.game.deck import Deck
+from MyHearthStone.game.enchantments.aura import Aura
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.game.events.event import Event
+
+__author__ = 'fyabc'
+
+
+def legacy_collect(game, event, timing):
+    related_triggers = set()
+    for event_type in event.ancestors():
+        related_triggers.update(game.triggers.get((event_type, timing), set()))
+    return order_of_play({trigger for trigger in related_triggers if trigger.queue_condition(event)})
+
+
+def dispatch_sort_collect(game, event, timing):
+    related_triggers = game.get_dispatch_triggers(type(event), timing)
+    if not related_triggers:
+        return []
+    return order_of_play([trigger for trigger in related_triggers if trigger.queue_condition(event)])
+
+
+def dispatch_collect(game, event, timing):
+    related_triggers = game.get_dispatch_triggers(type(event), timing)
+    if not related_triggers:
+        return []
+    return [trigger for trigger in related_triggers if trigger.queue_condition(event)]
+
+
+def indexed_collect(game, event, timing):
+    entry = game.get_dispatch_entry(type(event), timing)
+    if not entry:
+        return []
+    return [trigger for trigger in entry.candidates(event) if trigger.queue_condition(event)]
+
+
+class CrowdTrigger(Trigger):
+    """A trigger that responds to all events, used to crowd the board."""
+
+    respond = [std_e.Event, std_e.Event]
+    timing = [Trigger.Before, Trigger.After]
+
+
+class OwnerCrowdTrigger(CrowdTrigger):
+    owner_is_self = True
+
+
+class FriendlyCrowdTrigger(CrowdTrigger):
+    friendly_only = True
+
+
+def _collect_rows(game, events, number):
+    rows = []
+    for event in events:
+        for timing in (Trigger.Before, Trigger.After):
+            name = '{}/{}'.format(type(event).__name__, 'Before' if timing == Trigger.Before else 'After')
+            for method_name, method in (
+                    ('legacy', legacy_collect), ('dispatch + sort', dispatch_sort_collect),
+                    ('sorted dispatch', dispatch_collect), ('indexed', indexed_collect)):
+                t = timeit(lambda: method(game, event, timing), number=number)
+                rows.append(('{} {}'.format(name, method_name), t / number * 1e6, 'us/event'))
+    return rows
+
+
+@benchmark
+def bench_trigger_dispatch():
+    """Benchmark of trigger collection overhead per event.
+
+    Compare the legacy lookup (walk ancestors, union sets, sort) against the dispatch index of ``Game``
+    (sorting the candidates per event, pre-sorted in order of play, or also indexed by declarative filters),
+    on a mid-game board and a crowded board.
+    """
+    game = mid_game(n_turns=12)
+    hero = game.get_hero(0)
+
+    events = [
+        std_e.Damage(game, hero, hero, 1),
+        std_e.Healing(game, hero, hero, 1),
+        std_e.DrawCard(game, None, 0),
+        std_e.LoseDivineShield(game, hero),
+        std_e.EndOfTurn(game),
+    ]
+    number = 20000
+
+    report('Trigger collection overhead ({} registered trigger keys)'.format(len(game.triggers)),
+           _collect_rows(game, events, number))
+
+    # Crowded board: triggers of all entities in play respond to all events (2/3 of them have filters).
+    n_crowd = 0
+    for player_id in (0, 1):
+        for entity in game.get_zone(Zone.Play, player_id) + game.get_zone(Zone.Hero, player_id):
+            for trigger_class in (CrowdTrigger, OwnerCrowdTrigger, FriendlyCrowdTrigger):
+                game.register_trigger(trigger_class(game, entity))
+                n_crowd += 1
+    report('Trigger collection overhead (crowded board, {} more triggers)'.format(n_crowd),
+           _collect_rows(game, events[:2], number // 5))
+
+
+# Many minions with auras.
+_AuraCards = [
+    '1', '17', '40', '20000', '20002', '20011', '90000', '1000009', '1000010',
+    '6', '7', '11', '14', '20003', '23',
+]
+
+AuraDecks = [
+    Deck(klass=Klass.Str2Idx['Hunter'], card_id_list=_AuraCards * 2, name='Bench Aura 0'),
+    Deck(klass=Klass.Str2Idx['Hunter'], card_id_list=_AuraCards * 2, name='Bench Aura 1'),
+]
+
+
+def play_games(mode, n_games=5):
+    n_actions = 0
+    for i in range(n_games):
+        game = new_game(decks=AuraDecks, seed=Seed + i, aura_update_mode=mode)
+        n_actions += run_game(game, make_agents(game))
+    return n_actions
+
+
+def count_process_entity(mode, n_games=5):
+    """Count calls of ``Aura.process_entity`` in some games."""
+    counter = [0]
+    process_entity = Aura.process_entity
+
+    def _counted(self, entity, **kwargs):
+        counter[0] += 1
+        return process_entity(self, entity, **kwargs)
+
+    Aura.process_entity = _counted
+    try:
+        play_games(mode, n_games)
+    finally:
+        Aura.process_entity = process_entity
+    return counter[0] / n_games
+
+
+@benchmark
+def bench_aura_update():
+    """Benchmark of aura updates.
+
+    Compare the full rescan of auras against the incremental (dirty-tracked) update of ``Game``.
+    """
+    rows = []
+    for mode in ('full', 'incremental'):
+        game = mid_game(n_turns=12, decks=AuraDecks, aura_update_mode=mode)
+        number = 2000
+        t = timeit(lambda: (game._aura_update_attack_health(), game._aura_update_other()), number=number)
+        rows.append(('idle update ({})'.format(mode), t / number * 1e6, 'us/update'))
+
+    for mode in ('full', 'incremental'):
+        n_games = 5
+        t = timeit(lambda: play_games(mode, n_games), repeat=3)
+        rows.append(('whole game ({})'.format(mode), t / n_games * 1e3, 'ms/game'))
+
+    for mode in ('full', 'incremental'):
+        rows.append(('process_entity calls ({})'.format(mode), count_process_entity(mode), 'calls/game'))
+    report('Aura update', rows)
+
+
+def _read_tags(entities, alive_entities):
+    for e in entities:
+        _ = e.zone, e.player_id, e.type, e.id
+    for e in alive_entities:
+        _ = e.attack, e.health, e.alive, e.taunt, e.stealth, e.divine_shield, e.frozen, e.first_turn
+
+
+def _data_size(entity):
+    """Size (in bytes) of the entity-level data containers of the entity."""
+    data = entity.data
+    size = sys.getsizeof(data)
+    if hasattr(data, 'maps'):
+        # The old ``ChainMap`` data.
+        size += sys.getsizeof(data.__dict__) + sys.getsizeof(data.maps) + sys.getsizeof(data.maps[0])
+    else:
+        size += sys.getsizeof(data.values)
+    return size
+
+
+@benchmark
+def bench_tags():
+    """Benchmark of entity tag access and storage.
+
+    Read common tags of all entities on a mid-game board, create entities, and run full games.
+    """
+    game = mid_game(n_turns=12)
+    entities = list(game.get_all_entities())
+    alive_entities = [e for e in entities if hasattr(e, 'max_health')]
+    number = 200
+    n_reads = number * (4 * len(entities) + 8 * len(alive_entities))
+    t_read = timeit(lambda: _read_tags(entities, alive_entities), number=number)
+
+    player = game.get_player(game.current_player)
+    number_create = 2000
+    t_create = timeit(lambda: player.create_card('11', player_id=player.player_id), number=number_create)
+
+    number_games = 5
+    t_games = timeit(lambda: run_game(*(lambda g: (g, make_agents(g)))(new_game())), repeat=1, number=number_games)
+
+    report('Entity tags', [
+        ('tag reads', n_reads / t_read / 1e6, 'M reads/s'),
+        ('entity creation', number_create / t_create, 'entities/s'),
+        ('entity data size', sum(_data_size(e) for e in entities) / len(entities), 'bytes/entity'),
+        ('full games (BaseAgent)', number_games / t_games, 'games/s'),
+    ])
+
+
+# 魔爆术, 烈焰风暴
+AreaSpells = ['30003', '30009']
+
+
+@benchmark
+def bench_dh_bonus():
+    """Benchmark of damage/healing bonus and spell power.
+
+    Render card descriptions, get proposed damage values and cast area damage spells on a mid-game board.
+    """
+    game = mid_game(n_turns=12, journal=True)
+    player_id = game.current_player
+    player = game.get_player(player_id)
+
+    number = 20000
+    spell = player.create_card(AreaSpells[1], player_id=player_id)
+    t_desc = timeit(lambda: spell.description, number=number)
+    t_dh = timeit(lambda: spell.get_proposed_dh_value(4, DHBonusEventType.Damage), number=number)
+
+    def _cast():
+        cp = game.checkpoint()
+        player.add_mana(10, 'T')
+        for card_id in AreaSpells:
+            card, _ = player.generate(Zone.Hand, 'last', card_id)
+            game.run_player_action(pa.PlaySpell(game, card, None))
+        game.rollback(cp)
+
+    number_cast = 200
+    t_cast = timeit(_cast, number=number_cast)
+
+    report('Damage/healing bonus', [
+        ('description renders', number / t_desc, 'renders/s'),
+        ('proposed damage values', number / t_dh, 'calls/s'),
+        ('area spell casts (+rollback)', number_cast / t_cast, 'casts/s'),
+    ])
+
+
+Resolvers = ('recursive', 'iterative')
+
+
+class ChainEvent(Event):
+    """An event that creates the next event of the chain as its consequence."""
+
+    def __init__(self, game, owner, n):
+        super().__init__(game, owner)
+        self.n = n
+
+    def do(self):
+        if self.n > 0:
+            return [ChainEvent(self.game, self.owner, self.n - 1)]
+        return []
+
+    def message(self):
+        pass
+
+
+class PingEvent(Event):
+    """An event that is answered by ``PingTrigger``."""
+
+    def __init__(self, game, owner, n):
+        super().__init__(game, owner)
+        self.n = n
+
+    def message(self):
+        pass
+
+
+class PingTrigger(Trigger):
+    """A trigger that queues the next event of the chain after a ``PingEvent``."""
+
+    respond = [PingEvent]
+    timing = [Trigger.After]
+
+    def process(self, event):
+        if event.n > 0:
+            return [PingEvent(self.game, self.owner, event.n - 1)]
+        return []
+
+    def message(self, event):
+        pass
+
+
+def resolve_chain(game, event_class, depth):
+    game.resolve_events([event_class(game, game.entity, depth)])
+    game.event_history.clear()
+
+
+def chain_game(resolver):
+    game = new_game(event_resolver=resolver)
+    game.register_trigger(PingTrigger(game, game.entity))
+    return game
+
+
+def max_depth(event_class, resolver, depths=(500, 1000, 2000, 5000, 10000)):
+    """Get the maximum chain depth (in ``depths``) that can be resolved."""
+    result = 0
+    for depth in depths:
+        try:
+            resolve_chain(chain_game(resolver), event_class, depth)
+        except RecursionError:
+            break
+        result = depth
+    return result
+
+
+@benchmark
+def bench_event_resolver():
+    """Benchmark of the recursive and iterative event resolvers.
+
+    Resolve deep synthetic chains (consequence events, and events queued by triggers), then run full games.
+    """
+    rows = []
+    for event_class, name in ((ChainEvent, 'consequence'), (PingEvent, 'trigger')):
+        for resolver in Resolvers:
+            game = chain_game(resolver)
+            depth, number = 200, 20
+            t = timeit(lambda: resolve_chain(game, event_class, depth), number=number)
+            rows.append(('{} chain {} ({})'.format(name, depth, resolver), depth * number / t / 1e3, 'K events/s'))
+            rows.append(('{} chain max depth ({})'.format(name, resolver), max_depth(event_class, resolver), ''))
+
+    number_games = 5
+    for resolver in Resolvers:
+        t_games = timeit(lambda: run_game(*(lambda g: (g, make_agents(g)))(new_game(event_resolver=resolver))),
+                         repeat=1, number=number_games)
+        rows.append(('full games ({})'.format(resolver), number_games / t_games, 'games/s'))
+
+    report('Event resolvers (recursion limit {})'.format(sys.getrecursionlimit()), rows)
+
+
+Modes = [
+    ('normal', {}),
+    ('fast', {'fast': True}),
+    ('normal, iterative', {'event_resolver': 'iterative'}),
+    ('fast, iterative', {'fast': True, 'event_resolver': 'iterative'}),
+]
+
+
+def run_games(seeds, **kwargs):
+    n_actions = 0
+    for seed in seeds:
+        game = new_game(seed=seed, **kwargs)
+        n_actions += run_game(game, make_agents(game))
+    return n_actions
+
+
+@benchmark
+def bench_fast_mode():
+    """Benchmark of the fast mode.
+
+    Run full AI-vs-AI games (``BaseAgent``) in normal mode and fast mode, with each event resolver.
+    """
+    seeds = range(10)
+    n_actions = {name: run_games(seeds, **kwargs) for name, kwargs in Modes}
+
+    # Interleave the modes in each round, so the load of the machine affects all modes in the same way.
+    times = {name: [] for name, _ in Modes}
+    for _ in range(5):
+        for name, kwargs in Modes:
+            times[name].append(timeit(lambda: run_games(seeds, **kwargs), repeat=1))
+
+    rows = []
+    for name, _ in Modes:
+        t = min(times[name])
+        rows.append(('full games ({})'.format(name), len(seeds) / t, 'games/s'))
+        rows.append(('player actions ({})'.format(name), n_actions[name] / t, 'actions/s'))
+    report('Fast mode', rows)
+
+
+def _retained_memory(n_games, keep_events, **kwargs):
+    """Play games and keep their histories, return (retained bytes, number of events)."""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    histories = []
+    for seed in range(n_games):
+        game = new_game(seed=seed, **kwargs)
+        if keep_events:
+            events = []
+            game.add_callback(events.append, 'event')
+            histories.append(events)
+        else:
+            histories.append(game.event_history)
+        run_game(game, make_agents(game))
+        game.end_game()
+        del game
+    gc.collect()
+
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size, sum(len(h) for h in histories)
+
+
+@benchmark
+def bench_event_history():
+    """Benchmark of the event history.
+
+    Memory retained by the history of finished games (the game itself is dropped):
+    ``Event`` objects (collected by an 'event' callback, as the old history) against event records.
+    """
+    n_games = 10
+    rows = []
+    for name, keep_events, kwargs in [
+        ('event objects', True, {'history': False}),
+        ('records', False, {'history_max': None}),
+        ('records (max 100)', False, {'history_max': 100}),
+    ]:
+        size, n_events = _retained_memory(n_games, keep_events, **kwargs)
+        rows.append(('retained memory ({})'.format(name), size / n_games / 1024, 'KiB/game'))
+        rows.append(('kept events ({})'.format(name), n_events / n_games, 'events/game'))
+
+    number_games = 5
+    for name, kwargs in [('no history', {'history': False}), ('records', {'history': True})]:
+        t = timeit(lambda: run_game(*(lambda g: (g, make_agents(g)))(new_game(**kwargs))), repeat=3,
+                   number=number_games)
+        rows.append(('full games ({})'.format(name), number_games / t, 'games/s'))
+    report('Event history ({} games)'.format(n_games), rows)
+
+
+Zones = [Zone.Deck, Zone.Hand, Zone.Play, Zone.Secret, Zone.Graveyard, Zone.Weapon, Zone.Hero, Zone.HeroPower]
+
+
+def _get_zones(game):
+    for player_id in (0, 1):
+        for zone in Zones:
+            game.get_zone(zone, player_id)
+
+
+def _lookup(game, entities):
+    for entity, zone, player_id in entities:
+        game.get_location(entity, zone, player_id)
+        _ = entity in game.get_zone(zone, player_id)
+
+
+def _move_round_trip(game, player_id):
+    """Move the first card of the deck to the end of the hand (by entity), then move it back."""
+    deck = game.get_zone(Zone.Deck, player_id)
+    entity = deck[0]
+    game.move(player_id, Zone.Deck, entity, player_id, Zone.Hand, 'last')
+    game.move(player_id, Zone.Hand, entity, player_id, Zone.Deck, 0)
+
+
+@benchmark
+def bench_zones():
+    """Benchmark of zone access, location lookup and entity moving.
+
+    On a mid-game board: get zones of players, lookup locations (and membership) of entities in their zones,
+    move entities between zones, then run full games.
+    """
+    game = mid_game(n_turns=12)
+    entities = [(e, zone, player_id) for player_id in (0, 1) for zone in (Zone.Deck, Zone.Hand, Zone.Play)
+                for e in game.get_zone(zone, player_id)]
+    player_id = game.current_player
+    hand = game.get_zone(Zone.Hand, player_id)
+    while len(hand) >= game.get_player(player_id).HandMax:
+        game.move(player_id, Zone.Hand, hand[-1], player_id, Zone.Graveyard, 'last')
+
+    number = 2000
+    t_zones = timeit(lambda: _get_zones(game), number=number)
+    t_lookup = timeit(lambda: _lookup(game, entities), number=number)
+    t_move = timeit(lambda: _move_round_trip(game, player_id), number=number)
+
+    number_games = 5
+    t_games = timeit(lambda: run_game(*(lambda g: (g, make_agents(g)))(new_game())), repeat=3, number=number_games)
+
+    report('Zones', [
+        ('get zone', number * 2 * len(Zones) / t_zones / 1e6, 'M calls/s'),
+        ('location + membership ({} entities)'.format(len(entities)), number * len(entities) / t_lookup / 1e6,
+         'M lookups/s'),
+        ('move round trip', number / t_move / 1e3, 'K round trips/s'),
+        ('full games (BaseAgent)', number_games / t_games, 'games/s'),
+    ])
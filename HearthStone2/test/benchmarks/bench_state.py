@@ -0,0 +1,227 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of game states (fork, journal, versions, delta stream and state hash)."""
+
+import json
+from copy import deepcopy
+from time import perf_counter
+
+from bench_utils import *
+
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.game.delta_stream import DeltaStream, dump_deltas
+from MyHearthStone.game.state_hash import full_state_hash
+
+__author__ = 'fyabc'
+
+
+@benchmark
+def bench_fork():
+    """Benchmark of forking a mid-game board.
+
+    Compare ``Game.fork`` against ``copy.deepcopy``.
+    [NOTE]: Pickling is not compared, since dynamically loaded card classes cannot be pickled.
+    """
+    rows = []
+    for n_turns in (6, 12, 18):
+        game = mid_game(n_turns=n_turns)
+        memo = {id(game.callbacks): game.callbacks}
+        number = 100
+        t_fork = timeit(game.fork, number=number)
+        t_deepcopy = timeit(lambda: deepcopy(game, memo.copy()), number=number // 10)
+        rows.append(('turn {} fork'.format(n_turns), number / t_fork, 'forks/s'))
+        rows.append(('turn {} deepcopy'.format(n_turns), number // 10 / t_deepcopy, 'copies/s'))
+    report('Game fork', rows)
+
+
+def play_games(journal, n_games=5):
+    n_actions = 0
+    for i in range(n_games):
+        game = new_game(seed=Seed + i, journal=journal)
+        n_actions += run_game(game, make_agents(game))
+    return n_actions
+
+
+@benchmark
+def bench_journal():
+    """Benchmark of journal mode.
+
+    Compare the cost of a search step (copy the game, run one player action, discard the result)
+    using ``Game.checkpoint`` / ``Game.rollback`` against ``Game.fork``, and the overhead of journal mode in a whole game.
+    """
+    rows = []
+    for n_turns in (6, 12, 18):
+        game = mid_game(n_turns=n_turns, journal=True)
+        state = game.rng.getstate()
+        number = 100
+
+        def _fork_step():
+            game.rng.setstate(state)
+            forked = game.fork()
+            forked.run_player_action(pa.TurnEnd(forked))
+
+        def _rollback_step():
+            game.rng.setstate(state)
+            cp = game.checkpoint()
+            game.run_player_action(pa.TurnEnd(game))
+            game.rollback(cp)
+
+        t_fork = timeit(_fork_step, number=number)
+        t_rollback = timeit(_rollback_step, number=number)
+        rows.append(('turn {} fork + turn end'.format(n_turns), number / t_fork, 'steps/s'))
+        rows.append(('turn {} rollback + turn end'.format(n_turns), number / t_rollback, 'steps/s'))
+
+    for journal in (False, True):
+        n_games = 5
+        t = timeit(lambda: play_games(journal, n_games), repeat=3)
+        rows.append(('whole game (journal={})'.format(journal), t / n_games * 1e3, 'ms/game'))
+    report('Journal', rows)
+
+
+def _features(entity):
+    return tuple(sorted(entity.entity_data.items(), key=lambda kv: kv[0]))
+
+
+def _play_refreshed(refresh, seed):
+    """Play a game and refresh the feature cache after each player action, return the number of refreshed features."""
+    game = new_game(seed=seed)
+    agents = make_agents(game)
+    cache = {}
+    state = {'version': -1}
+    n_refreshed = 0
+    while game.game_result is None:
+        game.run_player_action(agents[game.current_player].get_player_action())
+        n_refreshed += refresh(game, cache, state)
+    return n_refreshed
+
+
+def refresh_all(game, cache, state):
+    entities = list(game.get_all_entities())
+    for entity in entities:
+        cache[entity] = _features(entity)
+    return len(entities)
+
+
+def refresh_changed(game, cache, state):
+    entities = game.changed_since(state['version'])
+    state['version'] = game.state_version
+    for entity in entities:
+        cache[entity] = _features(entity)
+    return len(entities)
+
+
+@benchmark
+def bench_versions():
+    """Benchmark of entity version counters.
+
+    Keep a cache of per-entity features (as a UI or an agent does) up to date after each player action:
+    rebuild features of all entities, or only of entities changed since the last refresh. Then run full games.
+    """
+    n_games = 5
+    rows = []
+    for name, refresh in (('all entities', refresh_all), ('changed entities', refresh_changed)):
+        counts = []
+        t = timeit(lambda: counts.append(sum(_play_refreshed(refresh, seed) for seed in range(n_games))),
+                   repeat=3, number=1)
+        rows.append(('refresh {}'.format(name), n_games / t, 'games/s'))
+        rows.append(('refreshed features ({})'.format(name), counts[-1] / n_games, 'entities/game'))
+
+    number_games = 5
+    t = timeit(lambda: run_game(*(lambda g: (g, make_agents(g)))(new_game())), repeat=3, number=number_games)
+    rows.append(('full games (no refresh)', number_games / t, 'games/s'))
+    report('Entity versions ({} games)'.format(n_games), rows)
+
+
+def _snapshot(game):
+    entities = []
+    for entity in game.get_all_entities():
+        tags = {tag: value for tag, value in entity.data.entity_items()
+                if isinstance(value, (type(None), bool, int, float, str))}
+        entities.append({'id': entity.id, 'player_id': entity.player_id, 'zone': entity.zone, 'tags': tags})
+    return json.dumps(entities)
+
+
+def _play_deltas(seed, sync):
+    game = new_game(seed=seed)
+    agents = make_agents(game)
+    stream = DeltaStream(game) if sync == 'deltas' else None
+    size = 0
+    while game.game_result is None:
+        game.run_player_action(agents[game.current_player].get_player_action())
+        if sync == 'deltas':
+            size += len(dump_deltas(stream.poll()))
+        elif sync == 'snapshot':
+            size += len(_snapshot(game))
+    return size
+
+
+@benchmark
+def bench_delta_stream():
+    """Benchmark of the state-delta stream.
+
+    Sync a frontend after each player action: send a full snapshot of all entities, or send the deltas emitted
+    by ``DeltaStream``. Compare the sizes of serialized messages, and the overhead of the stream on full games.
+    """
+    n_games = 5
+    rows = []
+    for sync in ('none', 'snapshot', 'deltas'):
+        sizes = []
+        t = timeit(lambda: sizes.append(sum(_play_deltas(seed, sync) for seed in range(n_games))), repeat=3, number=1)
+        rows.append(('sync by {}'.format(sync), n_games / t, 'games/s'))
+        if sync != 'none':
+            rows.append(('message size ({})'.format(sync), sizes[-1] / n_games / 1024, 'KiB/game'))
+    report('State-delta stream ({} games)'.format(n_games), rows)
+
+
+def _play_hashed(hash_fn, seed):
+    """Play a game and hash the state after each player action, return the total hash time."""
+    game = new_game(seed=seed)
+    agents = make_agents(game)
+    total = 0.0
+    while game.game_result is None:
+        game.run_player_action(agents[game.current_player].get_player_action())
+        start = perf_counter()
+        hash_fn(game)
+        total += perf_counter() - start
+    return total
+
+
+def _search(hash_fn, n_turns=10):
+    """Try each legal action of a mid-game position and rollback, return (total hash time, number of hashes)."""
+    game = mid_game(n_turns=n_turns, journal=True)
+    game.fast, game.record_history = True, False
+    total, n = 0.0, 0
+    cp = game.checkpoint()
+    for _ in range(20):
+        for action in game.get_legal_actions():
+            game.run_player_action(action)
+            start = perf_counter()
+            hash_fn(game)
+            total += perf_counter() - start
+            n += 1
+            game.rollback(cp)
+    return total, n
+
+
+@benchmark
+def bench_state_hash():
+    """Benchmark of the incremental state hash.
+
+    Hash the game state after each player action (as a lockstep client checking desyncs does),
+    by the incremental ``Game.state_hash`` or by a full walk of all entities (``full_state_hash``).
+    Then hash states of a search loop (try each legal action and rollback), where only a few entities are changed.
+    """
+    n_games = 5
+    rows = []
+    for name, hash_fn in (('full walk', full_state_hash), ('incremental', lambda g: g.state_hash())):
+        t = min(sum(_play_hashed(hash_fn, seed) for seed in range(n_games)) for _ in range(3))
+        rows.append(('hash after each action ({})'.format(name), t / n_games * 1e3, 'ms/game'))
+    for name, hash_fn in (('full walk', full_state_hash), ('incremental', lambda g: g.state_hash())):
+        t, n = min(_search(hash_fn) for _ in range(3))
+        rows.append(('hash in search ({})'.format(name), t / n * 1e6, 'us/state'))
+
+    number_games = 5
+    t = timeit(lambda: run_game(*(lambda g: (g, make_agents(g)))(new_game())), repeat=3, number=number_games)
+    rows.append(('full games (no hash)', number_games / t, 'games/s'))
+    report('State hash ({} games)'.format(n_games), rows)
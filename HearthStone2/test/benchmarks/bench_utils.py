@@ -0,0 +1,137 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Utilities for benchmarks.
+
+Benchmarks are functions ``bench_<name>`` registered by ``benchmark``, grouped in modules ``bench_*.py``.
+They are not collected by the unit tests, run them with the benchmark runner, e.g.::
+
+    python test/benchmarks/run_benchmarks.py trigger_dispatch
+"""
+
+import sys
+import os
+import logging
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from MyHearthStone.game.core import Game
+from MyHearthStone.game.deck import Deck
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.ai.standard import get_agent_by_name
+from MyHearthStone.utils.game import Klass
+from MyHearthStone.utils.package_io import all_cards
+
+__author__ = 'fyabc'
+
+Seed = 1234
+
+# Registered benchmarks: name -> function.
+Benchmarks = {}
+
+# Minions (some with triggers and auras) and spells without targets, so the rule-based agents can play all of them.
+_BenchCards = [
+    '1', '2', '6', '7', '11', '14', '20', '23', '25', '40', '20003', '30000', '50000',
+    '30001', '30003',
+]
+
+BenchDecks = [
+    Deck(klass=Klass.Str2Idx['Mage'], card_id_list=_BenchCards * 2, name='Bench Mage 0'),
+    Deck(klass=Klass.Str2Idx['Mage'], card_id_list=_BenchCards * 2, name='Bench Mage 1'),
+]
+
+
+def quiet_logging():
+    """Disable logging output of the game."""
+    logging.disable(logging.WARNING)
+
+
+def load_cards():
+    """Load all card packages before timing anything."""
+    quiet_logging()
+    return all_cards()
+
+
+def new_game(decks=None, seed=Seed, **kwargs):
+    """Create a new game and finish the replace stage."""
+    decks = BenchDecks if decks is None else decks
+    game = Game(seed=seed, **kwargs)
+    game.start_game(decks, mode='standard')
+    game.run_player_action(pa.ReplaceStartCard(game, 0, []))
+    game.run_player_action(pa.ReplaceStartCard(game, 1, []))
+    return game
+
+
+def make_agents(game, agent_names=('BaseAgent', 'BaseAgent')):
+    return [get_agent_by_name(name)(game, player_id) for player_id, name in enumerate(agent_names)]
+
+
+def run_game(game, agents, max_turns=None):
+    """Run the game with given agents until it ends (or reach ``max_turns``).
+
+    :return: Number of player actions.
+    """
+    n_actions = 0
+    while game.game_result is None:
+        if max_turns is not None and game.n_turns >= max_turns:
+            break
+        game.run_player_action(agents[game.current_player].get_player_action())
+        n_actions += 1
+    return n_actions
+
+
+def mid_game(n_turns=10, seed=Seed, **kwargs):
+    """Get a mid-game board, played by two ``BaseAgent``."""
+    game = new_game(seed=seed, **kwargs)
+    run_game(game, make_agents(game), max_turns=n_turns)
+    return game
+
+
+def benchmark(fn):
+    """Decorator to register the benchmark function ``bench_<name>`` as ``<name>``."""
+    name = fn.__name__
+    if name.startswith('bench_'):
+        name = name[len('bench_'):]
+    Benchmarks[name] = fn
+    return fn
+
+
+def timeit(fn, repeat=5, number=1):
+    """Return the best time (in seconds) of ``number`` calls of ``fn``."""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            fn()
+        t = perf_counter() - start
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def report(title, rows):
+    """Print a simple benchmark table.
+
+    :param title: Title of the table.
+    :param rows: List of (name, value, unit).
+    """
+    print(title)
+    for name, value, unit in rows:
+        print('    {:<40} {:>14.3f} {}'.format(name, value, unit))
+
+
+__all__ = [
+    'Seed',
+    'Benchmarks',
+    'BenchDecks',
+    'quiet_logging',
+    'load_cards',
+    'new_game',
+    'make_agents',
+    'run_game',
+    'mid_game',
+    'benchmark',
+    'timeit',
+    'report',
+]
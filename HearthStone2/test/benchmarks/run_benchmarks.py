@@ -0,0 +1,54 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Benchmark runner.
+
+Run registered benchmarks (see ``bench_utils.benchmark``) by names, or all of them. Example::
+
+    python test/benchmarks/run_benchmarks.py --list
+    python test/benchmarks/run_benchmarks.py trigger_dispatch tags
+"""
+
+import argparse
+
+from bench_utils import *
+
+# Import benchmark modules to register their benchmarks.
+import bench_engine
+import bench_ai
+import bench_state
+
+__author__ = 'fyabc'
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmarks of My HearthStone Game.')
+    parser.add_argument('names', metavar='name', nargs='*',
+                        help='Names of benchmarks to run, default is all benchmarks')
+    parser.add_argument('-l', '--list', action='store_true', default=False, dest='list',
+                        help='List names of all benchmarks and exit')
+    return parser
+
+
+def main(args=None):
+    parser = build_parser()
+    args = parser.parse_args(args)
+
+    if args.list:
+        for name, fn in Benchmarks.items():
+            print('{:<20} {}'.format(name, fn.__doc__.strip().splitlines()[0]))
+        return
+
+    names = args.names or list(Benchmarks)
+    unknown = [name for name in names if name not in Benchmarks]
+    if unknown:
+        parser.error('unknown benchmarks: {}'.format(', '.join(unknown)))
+
+    load_cards()
+    for name in names:
+        Benchmarks[name]()
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ...test_utils.example import Seed
+
+from MyHearthStone.game.core import Game
+from MyHearthStone.game.deck import Deck
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.ai.standard import get_agent_by_name
+from MyHearthStone.utils.game import Klass, Zone, AuraType
+from MyHearthStone.utils.package_io import all_cards
+
+__author__ = 'fyabc'
+
+# Minions with auras and some common cards.
+AuraCards = [
+    '1', '17', '40', '20000', '20002', '20011', '90000', '1000009', '1000010',
+    '6', '7', '11', '14', '20003', '23',
+]
+
+AuraDecks = [
+    Deck(klass=Klass.Str2Idx['Hunter'], card_id_list=AuraCards * 2, name='Test Aura 0'),
+    Deck(klass=Klass.Str2Idx['Warrior'], card_id_list=AuraCards * 2, name='Test Aura 1'),
+]
+
+
+def _package_decks():
+    """Decks of all collectible cards in card packages (except the test package), one deck for each class.
+
+    Each deck contains class cards and a share of neutral cards, repeated to 30 cards.
+    """
+    cards = all_cards()
+    card_ids = sorted(k for k, v in cards.items() if not v.data['derivative'] and not k.startswith('T'))
+    neutral = [k for k in card_ids if cards[k].data['klass'] == Klass.Str2Idx['Neutral']]
+    classes = sorted({cards[k].data['klass'] for k in card_ids} - {Klass.Str2Idx['Neutral']})
+    decks = []
+    for i, klass in enumerate(classes):
+        card_id_list = [k for k in card_ids if cards[k].data['klass'] == klass] + neutral[i::len(classes)]
+        decks.append(Deck(klass=klass, card_id_list=(card_id_list * 2)[:30], name='Test Package {}'.format(i)))
+    return decks
+
+
+class TestAura(unittest.TestCase):
+    def _run_game(self, mode, max_turns=16, decks=AuraDecks, seed=Seed):
+        game = Game(aura_update_mode=mode, seed=seed)
+        game.start_game(decks, mode='standard')
+        game.run_player_action(pa.ReplaceStartCard(game, 0, []))
+        game.run_player_action(pa.ReplaceStartCard(game, 1, []))
+        agents = [get_agent_by_name('BaseAgent')(game, player_id) for player_id in (0, 1)]
+        while game.game_result is None and game.n_turns < max_turns:
+            game.run_player_action(agents[game.current_player].get_player_action())
+        return game
+
+    def testBadMode(self):
+        with self.assertRaises(ValueError):
+            Game(aura_update_mode='bad')
+
+    def testVerify(self):
+        """Test that incremental aura updates are identical to full aura updates."""
+        game = self._run_game('verify')
+        game.end_game()
+
+    def testVerifyPackages(self):
+        """Test that incremental aura updates are identical to full aura updates, with cards of all packages."""
+        decks = _package_decks()
+        for i in range(0, len(decks), 2):
+            game = self._run_game('verify', max_turns=20, decks=[decks[i], decks[(i + 1) % len(decks)]], seed=Seed + i)
+            game.end_game()
+
+    def testIncremental(self):
+        """Test that games are identical in full and incremental aura update mode."""
+        results = []
+        for mode in ('full', 'incremental'):
+            game = self._run_game(mode)
+            results.append([
+                [(e.id, e.attack, e.health, e.max_health) for e in game.get_zone(z, p)]
+                for p in (0, 1) for z in (Zone.Play, Zone.Hero)
+            ])
+            game.end_game()
+        self.assertListEqual(results[0], results[1])
+
+    def testTargetKeys(self):
+        """Test that auras only grant enchantments in their target zones, and the reverse index is consistent."""
+        game = self._run_game('incremental', max_turns=6)
+        for aura in game.auras[AuraType.AttackHealth]:
+            keys = aura.target_keys()
+            for _, entity in game.get_all_entities(yield_location=True):
+                enchantment = entity.get_enchantment_by_aura(aura)
+                if enchantment is not None:
+                    self.assertIn((entity.player_id, entity.zone), keys)
+                    self.assertIn(enchantment, entity.aura_enchantments)
+                self.assertIs(aura.granted.get(entity), enchantment)
+        game.end_game()
@@ -31,7 +31,7 @@ class TestStdEvents(unittest.TestCase):
         self.game.end_game()
 
     def _assertEventType(self, event_types):
-        self.assertListEqual(event_types, [type(e) for e in self.game.event_history])
+        self.assertListEqual(event_types, [r.type for r in self.game.event_history])
 
     def testGameStartEvents(self):
         """Test if game start events are expected."""
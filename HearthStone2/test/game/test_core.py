@@ -1,14 +1,22 @@
 #! /usr/bin/python
 # -*- coding: utf-8 -*-
 
+import random
 import unittest
+from contextlib import ExitStack
+from importlib import import_module
+from unittest import mock
 
-from ..test_utils.example import ExampleDecks, ExpectedEntities, example_game
+from ..test_utils.example import ExampleDecks, ExpectedEntities, C11, example_game
 
+from MyHearthStone.game.journal import ZoneList
 from MyHearthStone.game.player import Player
+from MyHearthStone.game.state_hash import full_state_hash
+from MyHearthStone.game.triggers.trigger import Trigger, AttachedTrigger, StandardAfterTrigger
 from MyHearthStone.game import player_action as pa
 from MyHearthStone.game.events import standard as std_e
-from MyHearthStone.utils.game import Zone
+from MyHearthStone.utils.game import Zone, Type
+from MyHearthStone.utils.package_io import all_enchantments
 
 __author__ = 'fyabc'
 
@@ -107,3 +115,389 @@ class TestCore(unittest.TestCase):
         self._assertManas(player, 4, 4, 3, 0, 0, 3)
         player.add_mana(6, 'T')
         self._assertManas(player, 4, 4, 9, 0, 0, 9)
+
+    def testTriggerDispatch(self):
+        """Test the trigger dispatch index is invalidated when triggers change."""
+        game = self.game
+
+        class _DamageTrigger(Trigger):
+            respond = [std_e.Damage]
+
+        class _EventTrigger(Trigger):
+            respond = [std_e.Event]
+
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Damage, Trigger.After), ())
+
+        t1 = _DamageTrigger(game, game.entity)
+        game.register_trigger(t1)
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Damage, Trigger.After), (t1,))
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Damage, Trigger.Before), ())
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.RandomDamage, Trigger.After), (t1,))
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Healing, Trigger.After), ())
+
+        # Registering a trigger of an ancestor event class must invalidate subclass entries.
+        t2 = _EventTrigger(game, game.entity)
+        game.register_trigger(t2)
+        self.assertSetEqual(set(game.get_dispatch_triggers(std_e.Damage, Trigger.After)), {t1, t2})
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Healing, Trigger.After), (t2,))
+
+        game.remove_trigger(t1)
+        game.remove_trigger(t2)
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Damage, Trigger.After), ())
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Healing, Trigger.After), ())
+
+    def testTriggerOrder(self):
+        """Test that dispatch triggers are sorted in order of play, and refreshed when oops are changed."""
+        game = self.game
+        player_id = game.current_player
+
+        class _LastTrigger(Trigger):
+            respond = [std_e.Damage]
+
+            @property
+            def oop(self):
+                return StandardAfterTrigger.OopMax
+
+        class _HandPlayTrigger(AttachedTrigger):
+            respond = [std_e.Damage]
+            zones = [Zone.Hand, Zone.Play]
+
+        minion = next(e for e in game.get_zone(Zone.Hand, player_id) if e.type == Type.Minion)
+        t_last = _LastTrigger(game, game.entity)
+        game.register_trigger(t_last)
+        t_minion = _HandPlayTrigger(game, minion)
+        self.assertIsNone(minion.oop)
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Damage, Trigger.After), (t_last, t_minion))
+
+        game.move(player_id, Zone.Hand, minion, player_id, Zone.Play, 'last')
+        self.assertIsNotNone(minion.oop)
+        self.assertTupleEqual(game.get_dispatch_triggers(std_e.Damage, Trigger.After), (t_minion, t_last))
+
+    def testTriggerFilters(self):
+        """Test that triggers with declarative filters are indexed and only collected by matching events."""
+        game = self.game
+        player_id = game.current_player
+        hero, enemy_hero = game.get_hero(player_id), game.get_hero(1 - player_id)
+
+        class _OwnerTrigger(Trigger):
+            respond = [std_e.Damage]
+            owner_is_self = True
+
+        class _TargetTrigger(Trigger):
+            respond = [std_e.Damage]
+            target_is_self = True
+
+        class _FriendlyTrigger(Trigger):
+            respond = [std_e.Damage]
+            friendly_only = True
+
+        class _AnyTrigger(Trigger):
+            respond = [std_e.Damage]
+
+        triggers = [_OwnerTrigger(game, hero), _TargetTrigger(game, hero), _FriendlyTrigger(game, hero),
+                    _AnyTrigger(game, hero)]
+        for trigger in triggers:
+            game.register_trigger(trigger)
+        t_owner, t_target, t_friendly, t_any = triggers
+
+        entry = game.get_dispatch_entry(std_e.Damage, Trigger.After)
+        self.assertEqual(len(entry), 4)
+        for owner, target, expected in [
+            (hero, enemy_hero, {t_owner, t_friendly, t_any}),
+            (enemy_hero, hero, {t_target, t_any}),
+            (enemy_hero, enemy_hero, {t_any}),
+        ]:
+            event = std_e.Damage(game, owner, target, 1)
+            candidates = entry.candidates(event)
+            self.assertSetEqual(set(candidates), expected)
+            # Candidates are in order of play, same as the full tuple.
+            self.assertListEqual(list(candidates), [t for t in entry.triggers if t in expected])
+            # Filters are also checked without the index.
+            self.assertSetEqual({t for t in entry.triggers if t.queue_condition(event)}, expected)
+
+    def testFork(self):
+        """Test that the forked game is independent of the original game."""
+        game = self.game
+        forked = game.fork()
+
+        self.assertIsNot(forked.players[0], game.players[0])
+        for entity, forked_entity in zip(game.get_all_entities(), forked.get_all_entities()):
+            self.assertIsNot(entity, forked_entity)
+            self.assertIs(forked_entity.game, forked)
+            self.assertEqual(entity.id, forked_entity.id)
+            self.assertEqual(entity.zone, forked_entity.zone)
+
+        forked.run_player_action(pa.TurnEnd(forked))
+        self.assertEqual(forked.n_turns, game.n_turns + 1)
+        self._assertExpectedZones()
+        self._assertZoneAttr()
+
+    def testJournalRollback(self):
+        """Test that rollback restores the game state at the checkpoint."""
+        with self.assertRaises(RuntimeError):
+            self.game.checkpoint()
+
+        game = example_game(journal=True)
+        p0 = game.players[game.current_player]
+
+        def _state():
+            return (game.n_turns, game.current_player, game.current_oop, len(game.event_history),
+                    [p.displayed_mana() for p in game.players],
+                    [[list(game.get_zone(zone, player_id)) for zone in (Zone.Deck, Zone.Hand, Zone.Play)]
+                     for player_id in (0, 1)],
+                    [dict(e.entity_data) for e in game.get_all_entities()])
+
+        state = _state()
+        cp = game.checkpoint()
+        game.run_player_action(pa.TurnEnd(game))
+        game.run_player_action(pa.TurnEnd(game))
+        self.assertNotEqual(_state(), state)
+        game.rollback(cp)
+        self.assertEqual(_state(), state)
+        self.assertIs(game.players[game.current_player], p0)
+
+        # The game still works after rollback.
+        game.run_player_action(pa.TurnEnd(game))
+        self.assertEqual(game.n_turns, state[0] + 1)
+
+        # Rollback to the same checkpoint many times, the random state is also restored.
+        values = []
+        for _ in range(3):
+            game.rollback(cp)
+            values.append(game.rng.random())
+        self.assertEqual(len(set(values)), 1)
+
+        with self.assertRaises(ValueError):
+            game.rollback(cp + 10 ** 6)
+        game.end_game()
+
+        # Fork a game into journal mode.
+        game = self.game.fork(journal=True)
+        self.assertIsNone(self.game.journal)
+        state = _state()
+        cp = game.checkpoint()
+        game.run_player_action(pa.TurnEnd(game))
+        game.rollback(cp)
+        self.assertEqual(_state(), state)
+
+        # Rollback a lethal damage.
+        enemy_hero = game.get_hero(1 - game.current_player)
+        game.resolve_events([std_e.Damage(game, enemy_hero, enemy_hero, 100)])
+        self.assertIsNotNone(game.game_result)
+        game.rollback(cp)
+        self.assertIsNone(game.game_result)
+        self.assertIs(enemy_hero.play_state, True)
+        game.end_game()
+
+    def testZoneLocations(self):
+        """Test location lookups of zones, before and after rollback."""
+        game = example_game(journal=True)
+
+        def _assertLocations():
+            for player_id in (0, 1):
+                for zone in (Zone.Deck, Zone.Hand, Zone.Play, Zone.Graveyard):
+                    z = game.get_zone(zone, player_id)
+                    for i, entity in enumerate(z):
+                        self.assertIn(entity, z)
+                        self.assertEqual(game.get_location(entity, zone, player_id), i)
+            self.assertIsNone(game.get_location(game.entity, Zone.Hand, 0))
+
+        _assertLocations()
+        cp = game.checkpoint()
+        game.run_player_action(pa.TurnEnd(game))
+        _assertLocations()
+        game.rollback(cp)
+        _assertLocations()
+
+        with self.assertRaises(ValueError):
+            game.get_zone(Zone.Invalid, 0)
+        game.end_game()
+
+    def testZoneListIndex(self):
+        """Test the location index of zone lists is updated in place by inserts and deletes."""
+        game = self.game
+        z = ZoneList(game, [object() for _ in range(5)])
+        free = [object() for _ in range(20)]
+        missing = object()
+        rng = random.Random(1)
+
+        def _assertIndex():
+            for i, value in enumerate(z):
+                self.assertEqual(z.index(value), i)
+            self.assertNotIn(missing, z)
+
+        _assertIndex()
+        for step in range(200):
+            op = step % 5
+            if op == 0:
+                z.insert(rng.randint(-len(z) - 2, len(z) + 2), free.pop())
+            elif op == 1 and z:
+                free.append(z.pop(rng.randrange(-len(z), len(z))))
+            elif op == 2 and z:
+                value = z[rng.randrange(len(z))]
+                z.remove(value)
+                free.append(value)
+            elif op == 3 and z:
+                i = rng.randrange(len(z))
+                value = z[i]
+                del z[i]
+                free.append(value)
+            elif op == 4 and z:
+                i = rng.randrange(len(z))
+                value, z[i] = z[i], free.pop()
+                free.append(value)
+            # The index is kept (not rebuilt) between changes.
+            self.assertIsNotNone(z._positions)
+            _assertIndex()
+
+        # Fallback: rebuilt after other changes.
+        z.extend(free[:3])
+        self.assertIsNone(z._positions)
+        _assertIndex()
+        z.insert(0, z[-1])
+        self.assertEqual(z.index(z[0]), 0)
+
+    def testStateVersions(self):
+        """Test version counters of entities and the "changed since" query."""
+        game = example_game(journal=True)
+        player_id = game.current_player
+        hero, enemy_hero = game.get_hero(player_id), game.get_hero(1 - player_id)
+
+        version = game.state_version
+        hero_version = hero.state_version
+        self.assertListEqual(game.changed_since(version), [])
+
+        cp = game.checkpoint()
+        game.resolve_events([std_e.Damage(game, hero, enemy_hero, 2)])
+        self.assertGreater(game.state_version, version)
+        self.assertGreater(enemy_hero.state_version, version)
+        self.assertEqual(hero.state_version, hero_version)
+        changed = game.changed_since(version)
+        self.assertIn(enemy_hero, changed)
+        self.assertNotIn(hero, changed)
+        self.assertListEqual(game.changed_since(game.state_version), [])
+
+        # Versions are not restored by rollback, all entities are changed.
+        new_version = game.state_version
+        game.rollback(cp)
+        self.assertGreater(game.state_version, new_version)
+        self.assertGreater(hero.state_version, new_version)
+        self.assertIn(hero, game.changed_since(new_version))
+        self.assertListEqual(game.changed_since(game.state_version), [])
+        game.end_game()
+
+    def testStateHash(self):
+        """Test the incremental state hash."""
+        game = example_game(journal=True)
+        player_id = game.current_player
+        hero, enemy_hero = game.get_hero(player_id), game.get_hero(1 - player_id)
+
+        h = game.state_hash()
+        self.assertEqual(h, full_state_hash(game))
+        self.assertEqual(h, example_game().state_hash())
+        self.assertEqual(h, game.fork().state_hash())
+
+        cp = game.checkpoint()
+        game.resolve_events([std_e.Damage(game, hero, enemy_hero, 2)])
+        h_damaged = game.state_hash()
+        self.assertNotEqual(h_damaged, h)
+        self.assertEqual(h_damaged, full_state_hash(game))
+        # Tags set to class-level values are same as unset tags.
+        game.resolve_events([std_e.Healing(game, hero, enemy_hero, 2)])
+        self.assertEqual(game.state_hash(), h)
+
+        game.rollback(cp)
+        self.assertEqual(game.state_hash(), h)
+        game.run_player_action(pa.TurnEnd(game))
+        self.assertNotEqual(game.state_hash(), h)
+        self.assertEqual(game.state_hash(), full_state_hash(game))
+        game.rollback(cp)
+        self.assertEqual(game.state_hash(), h)
+
+        # Same entities in different orders.
+        hand = game.get_zone(Zone.Hand, player_id)
+        i = next(i for i, e in enumerate(hand) if e.id != hand[0].id)
+        hand[0], hand[i] = hand[i], hand[0]
+        self.assertEqual(game.state_hash(), full_state_hash(game))
+        self.assertNotEqual(game.state_hash(), h)
+        game.end_game()
+
+    def testStateHashEffects(self):
+        """Test the state hash of deathrattle enchantments (not represented by primitive tags)."""
+        game = example_game(journal=True)
+        player_id = game.current_player
+        minions = [game.generate(player_id, Zone.Play, i, C11)[0] for i in range(2)]
+        source, _ = game.generate(player_id, Zone.Hand, 'last', '1070007')
+        enchantment_class = all_enchantments()['1070001']
+
+        h = game.state_hash()
+        cp = game.checkpoint()
+        hashes = []
+        for minion in minions:
+            enchantment_class.from_card(source, game, minion)
+            self.assertEqual(len(minion.dr_list), 1)
+            hashes.append(game.state_hash())
+            self.assertEqual(hashes[-1], full_state_hash(game))
+            game.rollback(cp)
+            self.assertEqual(game.state_hash(), h)
+        # The same deathrattle enchantment on different minions.
+        self.assertNotEqual(hashes[0], hashes[1])
+        self.assertNotIn(h, hashes)
+        game.end_game()
+
+    def testSeed(self):
+        """Test that games with the same seed are the same, even if they are interleaved."""
+        games = [example_game(), example_game()]
+        self.assertEqual(games[0].seed, games[1].seed)
+        for _ in range(6):
+            for game in games:
+                game.run_player_action(pa.TurnEnd(game))
+        self.assertListEqual(*[list(game.event_history) for game in games])
+        self.assertListEqual(*[[e.id for e in game.get_zone(Zone.Hand, 0)] for game in games])
+        self.assertEqual(games[0].rng.random(), games[1].rng.random())
+
+        forked = games[0].fork()
+        self.assertIsNot(forked.rng, games[0].rng)
+        self.assertEqual(forked.rng.random(), games[0].rng.random())
+        for game in games:
+            game.end_game()
+
+    def testFastMode(self):
+        """Test that the fast mode does not change the game, and does not record the event history by default."""
+        games = [example_game(), example_game(fast=True), example_game(fast=True, history=True)]
+        n_events = len(games[0].event_history)
+        events = []
+        games[1].add_callback(lambda e: events.append(type(e)), 'event')
+        for _ in range(6):
+            for game in games:
+                game.run_player_action(pa.TurnEnd(game))
+        self.assertEqual(len(games[1].event_history), 0)
+        self.assertListEqual(*[list(game.event_history) for game in (games[0], games[2])])
+        self.assertListEqual(events, [r.type for r in games[0].event_history[n_events:]])
+        self.assertListEqual(*[[e.id for e in game.get_zone(Zone.Hand, 0)] for game in games[:2]])
+        for game in games:
+            game.end_game()
+
+    def testFastModeMessages(self):
+        """Test that the fast mode does not format debug and info messages during the game."""
+
+        class _StopTrigger(Trigger):
+            respond = [std_e.DrawCard]
+
+            def process(self, event):
+                self.game.stop_subsequent_phases()
+                return []
+
+        modules = ['core', 'event_resolver', 'player', 'game_entity']
+        for event_resolver in ('recursive', 'iterative'):
+            game = example_game(fast=True, event_resolver=event_resolver)
+            game.register_trigger(_StopTrigger(game, game.entity))
+            with ExitStack() as stack:
+                mocks = [stack.enter_context(mock.patch('MyHearthStone.game.{}.{}'.format(module, name)))
+                         for module in modules for name in ('debug', 'info')
+                         if hasattr(import_module('MyHearthStone.game.' + module), name)]
+                for _ in range(6):
+                    game.run_player_action(pa.TurnEnd(game))
+            for m in mocks:
+                m.assert_not_called()
+            game.end_game()
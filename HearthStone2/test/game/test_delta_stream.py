@@ -0,0 +1,109 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.game.delta_stream import DeltaStream, DeltaType, dump_deltas, load_deltas
+from MyHearthStone.game.events import standard as std_e
+from MyHearthStone.utils.game import Zone
+
+__author__ = 'fyabc'
+
+
+class _Mirror:
+    """Rebuild the game state by applying deltas."""
+
+    def __init__(self):
+        self.ids = {}
+        self.tags = {}
+        self.zones = {}
+        self.mana = {}
+        self.result = None
+
+    def apply(self, delta):
+        if delta.type == DeltaType.Create:
+            self.ids[delta.handle] = delta.data['id']
+            self.tags[delta.handle] = dict(delta.data['tags'])
+        elif delta.type == DeltaType.Tag:
+            self.tags[delta.handle][delta.data['tag']] = delta.data['value']
+        elif delta.type == DeltaType.Zone:
+            self.zones[delta.data['player_id'], delta.data['zone']] = [
+                self.ids[handle] for handle in delta.data['entities']]
+        elif delta.type == DeltaType.Mana:
+            self.mana[delta.data['player_id']] = delta.data['max_mana'], delta.data['used_mana']
+        elif delta.type == DeltaType.Result:
+            self.result = delta.data['result']
+
+
+class TestDeltaStream(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game()
+        self.mirror = _Mirror()
+        self.stream = DeltaStream(self.game, listeners=[self.mirror.apply])
+
+    def tearDown(self):
+        self.stream.close()
+        self.game.end_game()
+
+    def _assertMirrored(self):
+        game = self.game
+        for player_id in 0, 1:
+            for zone in (Zone.Deck, Zone.Hand, Zone.Play, Zone.Hero):
+                self.assertListEqual(
+                    self.mirror.zones.get((player_id, zone), []), [e.id for e in game.get_zone(zone, player_id)])
+            player = game.get_player(player_id)
+            self.assertEqual(self.mirror.mana[player_id], (player.max_mana, player.used_mana))
+        for handle, tags in self.mirror.tags.items():
+            entity = self.stream._entities[handle]
+            for tag, value in tags.items():
+                self.assertEqual(entity.data.get(tag), value, msg='{} {}'.format(entity, tag))
+
+    def testCreate(self):
+        deltas = self.stream.poll()
+        n_entities = len(list(self.game.get_all_entities()))
+        self.assertEqual(sum(d.type == DeltaType.Create for d in deltas), n_entities)
+        self.assertListEqual([d.seq for d in deltas], list(range(len(deltas))))
+        self.assertListEqual(self.stream.poll(), [])
+        self._assertMirrored()
+
+    def testDeltas(self):
+        game = self.game
+        self.stream.poll()
+        hero = game.get_hero(1 - game.current_player)
+        game.resolve_events([std_e.Damage(game, hero, hero, 2)])
+        deltas = self.stream.poll()
+        hero_handle = self.stream._handles[hero]
+        self.assertIn((DeltaType.Tag, hero_handle, {'tag': 'damage', 'value': 2}),
+                      [(d.type, d.handle, d.data) for d in deltas])
+        self.assertNotIn(DeltaType.Zone, [d.type for d in deltas])
+
+        # Play a minion: move, zone and mana deltas.
+        minion = next(e for e in game.get_zone(Zone.Hand, game.current_player) if e.id == C6)
+        game.run_player_action(pa.TurnEnd(game))
+        game.run_player_action(pa.TurnEnd(game))
+        self.stream.poll()
+        game.run_player_action(pa.PlayMinion(game, minion, 0, None))
+        types = {d.type for d in self.stream.poll()}
+        self.assertTrue({DeltaType.Move, DeltaType.Zone, DeltaType.Mana} <= types)
+        self._assertMirrored()
+
+    def testReplayGame(self):
+        game = self.game
+        for _ in range(10):
+            game.run_player_action(pa.TurnEnd(game))
+            self._assertMirrored()
+        game.run_player_action(pa.Concede(game))
+        self.assertIsNotNone(self.mirror.result)
+        self.assertEqual(self.mirror.result, game.game_result)
+
+    def testDump(self):
+        self.game.run_player_action(pa.TurnEnd(self.game))
+        deltas = self.stream.poll()
+        self.assertListEqual(load_deltas(dump_deltas(deltas)), deltas)
+
+
+if __name__ == '__main__':
+    unittest.main()
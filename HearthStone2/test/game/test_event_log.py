@@ -0,0 +1,109 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.game.event_log import EventLog, EventRecord, EntityRef
+from MyHearthStone.game.events.damage import Damage
+from MyHearthStone.game.journal import Journal
+from MyHearthStone.utils.game import Zone
+
+__author__ = 'fyabc'
+
+
+def _record(i):
+    return EventRecord(None, None, None, i, 0, 0)
+
+
+def _values(log):
+    return [r.value for r in log]
+
+
+class TestEventLog(unittest.TestCase):
+    def testUnbounded(self):
+        log = EventLog()
+        for i in range(5):
+            log.append(_record(i))
+        self.assertEqual(len(log), 5)
+        self.assertListEqual(_values(log), [0, 1, 2, 3, 4])
+        self.assertEqual(log[-1].value, 4)
+        self.assertListEqual([r.value for r in log[1:3]], [1, 2])
+        self.assertListEqual([r.value for r in log.iter_from(3)], [3, 4])
+
+        log.clear()
+        self.assertEqual(len(log), 0)
+        log.append(_record(5))
+        self.assertListEqual(_values(log), [5])
+        self.assertEqual(log.total, 6)
+
+    def testBounded(self):
+        log = EventLog(3)
+        for i in range(7):
+            log.append(_record(i))
+        self.assertEqual(len(log), 3)
+        self.assertEqual(log.first, 4)
+        self.assertListEqual(_values(log), [4, 5, 6])
+        self.assertEqual(log[0].value, 4)
+        # Dropped records are skipped.
+        self.assertListEqual([r.value for r in log.iter_from(0)], [4, 5, 6])
+        with self.assertRaises(IndexError):
+            _ = log[3]
+        with self.assertRaises(ValueError):
+            EventLog(0)
+
+    def testRollback(self):
+        for max_len in (None, 3):
+            journal = Journal()
+            log = EventLog(max_len)
+            for i in range(2):
+                log.append(_record(i), journal)
+            cp = journal.checkpoint()
+            for i in range(2, 4):
+                log.append(_record(i), journal)
+            journal.rollback(cp)
+            self.assertEqual(log.total, 2)
+            log.append(_record(-2), journal)
+            expected = [0, 1, -2] if max_len is None else [1, -2]
+            self.assertListEqual(_values(log), expected)
+
+    def testGameRecords(self):
+        game = example_game(journal=True)
+        self.assertIsInstance(game.event_history[0], EventRecord)
+
+        # Play "Fireball" to the enemy hero in the 4th turn of the current player.
+        player_id = game.current_player
+        spell = next(e for e in game.get_zone(Zone.Hand, player_id) if e.id == C30007)
+        for _ in range(6):
+            game.run_player_action(pa.TurnEnd(game))
+        enemy_hero = game.get_hero(1 - player_id)
+        game.run_player_action(pa.PlaySpell(game, spell, enemy_hero))
+
+        damage = [r for r in game.event_history if r.type is Damage][-1]
+        self.assertEqual(damage.value, 6)
+        self.assertEqual(damage.turn, game.n_turns)
+        self.assertEqual(damage.owner, EntityRef(C30007, player_id, spell.oop))
+        self.assertEqual(damage.target.player_id, 1 - player_id)
+
+        # Forked games copy the history.
+        forked = game.fork()
+        n_events = len(game.event_history)
+        forked.run_player_action(pa.TurnEnd(forked))
+        self.assertEqual(len(game.event_history), n_events)
+        self.assertGreater(len(forked.event_history), n_events)
+        game.end_game()
+
+    def testBoundedGame(self):
+        game = example_game(history_max=10)
+        for _ in range(4):
+            game.run_player_action(pa.TurnEnd(game))
+        self.assertEqual(len(game.event_history), 10)
+        self.assertGreater(game.event_history.total, 10)
+        self.assertListEqual(list(game.event_history), list(game.event_history.iter_from(0)))
+        game.end_game()
+
+
+if __name__ == '__main__':
+    unittest.main()
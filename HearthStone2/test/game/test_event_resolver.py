@@ -0,0 +1,66 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.ai.standard import get_agent_by_name
+from MyHearthStone.game.core import Game
+from MyHearthStone.game.events.event import Event
+from MyHearthStone.game.triggers.trigger import Trigger
+
+__author__ = 'fyabc'
+
+
+class _ChainEvent(Event):
+    def __init__(self, game, owner, n):
+        super().__init__(game, owner)
+        self.n = n
+
+    def do(self):
+        return [_ChainEvent(self.game, self.owner, self.n - 1)] if self.n > 0 else []
+
+
+class _ChainTrigger(Trigger):
+    respond = [_ChainEvent]
+    timing = [Trigger.After]
+
+    def process(self, event):
+        # Also queue an event with triggers, so the chain goes through both events and triggers.
+        return [_ChainEvent(self.game, self.owner, 0)] if event.n % 100 == 1 else []
+
+
+class TestEventResolver(unittest.TestCase):
+    def _run_game(self, event_resolver):
+        game = example_game(event_resolver=event_resolver)
+        agents = [get_agent_by_name('BaseAgent')(game, player_id) for player_id in (0, 1)]
+        callback_history = []
+        game.add_callback(lambda e, t: callback_history.append(type(e).__name__), 'resolve')
+        while game.game_result is None and game.n_turns < 40:
+            game.run_player_action(agents[game.current_player].get_player_action())
+        return [r.type.__name__ for r in game.event_history], callback_history, game.game_result
+
+    def testSameResult(self):
+        self.assertEqual(self._run_game('recursive'), self._run_game('iterative'))
+
+    def testDeepChain(self):
+        depth = 3000
+
+        game = example_game(event_resolver='iterative')
+        game.register_trigger(_ChainTrigger(game, game.entity))
+        n_events = len(game.event_history)
+        game.resolve_events([_ChainEvent(game, game.entity, depth)])
+        self.assertEqual(len(game.event_history) - n_events, depth + 1 + depth // 100)
+        self.assertIs(game.event_history[-1].type, _ChainEvent)
+        # The deepest event is queued by the trigger of the deepest chain event.
+        self.assertEqual(max(r.depth for r in game.event_history), depth + 1)
+        game.end_game()
+
+    def testUnknownResolver(self):
+        with self.assertRaises(ValueError):
+            Game(event_resolver='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.game import player_action as pa
+from MyHearthStone.utils.game import Zone
+
+__author__ = 'fyabc'
+
+
+class TestLegalActions(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game()
+        self.p0 = self.game.get_player(self.game.current_player)
+
+    def tearDown(self):
+        self.game.end_game()
+
+    def _play_minions(self, n_turns):
+        """Play a minion (at the rightmost position) if possible, then end the turn, for many turns."""
+        for _ in range(n_turns):
+            for action in self.game.get_legal_actions(all_positions=False):
+                if isinstance(action, pa.PlayMinion):
+                    self.game.run_player_action(action)
+                    break
+            self.game.run_player_action(pa.TurnEnd(self.game))
+
+    def testTurnEnd(self):
+        actions = self.game.get_legal_actions()
+        self.assertIsInstance(actions[-1], pa.TurnEnd)
+        self.assertEqual(sum(isinstance(a, pa.TurnEnd) for a in actions), 1)
+
+    def testPositions(self):
+        self._play_minions(6)
+        n_play = len(self.game.get_zone(Zone.Play, self.game.current_player))
+        self.assertGreater(n_play, 0)
+
+        all_actions = self.game.get_legal_actions()
+        right_actions = self.game.get_legal_actions(all_positions=False)
+        n_minions = sum(isinstance(a, pa.PlayMinion) for a in right_actions)
+        self.assertEqual(sum(isinstance(a, pa.PlayMinion) for a in all_actions), n_minions * (n_play + 1))
+
+    def testAllActionsRunnable(self):
+        self._play_minions(8)
+        actions = self.game.get_legal_actions()
+        self.assertTrue(any(isinstance(a, pa.ToAttack) for a in actions))
+
+        for i in range(len(actions)):
+            game = self.game.fork()
+            action = game.get_legal_actions()[i]
+            self.assertIs(type(action), type(actions[i]))
+            n_events = len(game.event_history)
+            game.run_player_action(action)
+            # An illegal action will be rejected by the game without any event.
+            self.assertGreater(len(game.event_history), n_events)
+
+
+if __name__ == '__main__':
+    unittest.main()
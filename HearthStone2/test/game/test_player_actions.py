@@ -6,6 +6,7 @@ import unittest
 from ..test_utils.example import *
 
 from MyHearthStone.game import player_action as pa
+from MyHearthStone.game import player_operation as po
 from MyHearthStone.game.events import standard as std_e
 from MyHearthStone.utils.game import Zone
 
@@ -30,10 +31,10 @@ class TestPlayerActions(unittest.TestCase):
         self.game.end_game()
 
     def _printEventHistory(self):
-        print([e.__class__.__name__ for e in self.game.event_history])
+        print([r.type.__name__ for r in self.game.event_history])
 
     def _assertEventType(self, event_types):
-        self.assertListEqual(event_types, [type(e) for e in self.game.event_history])
+        self.assertListEqual(event_types, [r.type for r in self.game.event_history])
 
     def _prepare_card(self, card_id, player_id=None):
         """Prepare enough mana and generate target card into hand directly."""
@@ -136,6 +137,27 @@ class TestPlayerActions(unittest.TestCase):
         # TODO
         pass
 
+    def testDamageBonus(self):
+        from MyHearthStone.utils.game import DHBonusType, DHBonusEventType
+
+        self.game.run_player_action(pa.PlayMinion(self.game, self._prepare_card('10'), 0, None))    # Spell power +1
+        self.assertEqual(self.p0.get_spell_power(), 1)
+        self.game.run_player_action(pa.PlayMinion(self.game, self._prepare_card('1050014'), 1, None))  # 先知维伦
+        spell = self._prepare_card(C30007)   # 火球术
+        self.assertEqual(self.p0.get_damage_bonus(spell, DHBonusType.Add, DHBonusEventType.Damage), 1)
+        self.assertEqual(self.p0.get_damage_bonus(spell, DHBonusType.Double, DHBonusEventType.Damage), 1)
+        self.assertEqual(spell.get_proposed_dh_value(6, DHBonusEventType.Damage), 14)
+
+        self.game.run_player_action(pa.PlaySpell(self.game, spell, self.p1.hero))
+        self.assertEqual(self.p1.hero.health, 30 - 14)
+
+        # Bonuses are removed with their sources.
+        for minion in list(self.p0.play):
+            self.game.move(minion.player_id, Zone.Play, minion, minion.player_id, Zone.Hand, 'last')
+        self.game._aura_update_other()
+        self.assertEqual(self.p0.get_spell_power(), 0)
+        self.assertEqual(self.p0.get_damage_bonus(spell, DHBonusType.Double, DHBonusEventType.Damage), 0)
+
 
 class TestReplaceStartCard(unittest.TestCase):
     @classmethod
@@ -168,3 +190,14 @@ class TestReplaceStartCard(unittest.TestCase):
             # The exception will only be raised after both two replace actions.
             self.game.run_player_action(pa.ReplaceStartCard(self.game, 0, [2, 3]))
             self.game.run_player_action(pa.ReplaceStartCard(self.game, 1, [1, 3]))
+
+    def testRandomOperation(self):
+        """Test that random operation choices use the random number generator of the game."""
+        children = {choice: po.PlayerOpTree(po.PlayerOps.Run) for choice in range(8)}
+        tree = po.SelectChoiceTree('Test', children)
+        games = [example_game(), example_game()]
+        choices = [[tree.next_op(rng=game.rng) for _ in range(10)] for game in games]
+        self.assertListEqual(*choices)
+        self.assertIs(tree.next_op(3), children[3])
+        for game in games:
+            game.end_game()
@@ -0,0 +1,122 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import sys
+import unittest
+
+from ..test_utils.example import *
+
+from MyHearthStone.game.game_entity import TagStore
+from MyHearthStone.utils.game import Zone, GameTag
+
+__author__ = 'fyabc'
+
+
+class TestTagStore(unittest.TestCase):
+    def setUp(self):
+        self.game = example_game(journal=True)
+        self.minion = next(e for e in self.game.get_zone(Zone.Hand, 0) if e.id == C6)     # 工程师学徒, 1/1
+
+    def tearDown(self):
+        self.game.end_game()
+
+    def testReadWrite(self):
+        m = self.minion
+        self.assertIsInstance(m.data, TagStore)
+        self.assertEqual(m.data['id'], C6)
+        self.assertEqual(m.data['attack'], m.cls_data['attack'])
+
+        m.data['attack'] = 5
+        self.assertEqual(m.attack, 5)
+        self.assertEqual(m.cls_data['attack'], 1)
+        self.assertIn('attack', m.entity_data)
+
+        # Deleting only removes the entity-level value.
+        del m.data['attack']
+        self.assertEqual(m.attack, 1)
+        with self.assertRaises(KeyError):
+            del m.data['attack']
+
+        # Other tags are supported too.
+        m.data['my_diy_tag'] = 3
+        self.assertEqual(m.data.get('my_diy_tag'), 3)
+        self.assertEqual(m.data.pop('my_diy_tag'), 3)
+        self.assertIsNone(m.data.get('my_diy_tag'))
+        self.assertEqual(m.data.pop('my_diy_tag', 4), 4)
+
+    def testEntityData(self):
+        m = self.minion
+        entity_data = m.entity_data
+        self.assertNotIn('my_diy_tag', entity_data)
+
+        # The entity data is a live view of entity-level tags.
+        m.data['attack'] = 5
+        self.assertEqual(entity_data['attack'], 5)
+        entity_data['attack'] = 6
+        entity_data['my_diy_tag'] = 3
+        self.assertEqual(m.attack, 6)
+        self.assertEqual(m.data['my_diy_tag'], 3)
+        self.assertEqual(dict(entity_data), dict(m.data.entity_items()))
+        del entity_data['attack']
+        self.assertEqual(m.attack, 1)
+        self.assertNotIn('attack', entity_data)
+        with self.assertRaises(KeyError):
+            _ = entity_data['attack']
+
+        # Changes on the view are recorded into the journal.
+        cp = self.game.checkpoint()
+        entity_data['attack'] = 7
+        self.game.rollback(cp)
+        self.assertEqual(m.attack, 1)
+
+    def testClassDefaults(self):
+        m = self.minion
+        m2 = next(e for e in self.game.get_zone(Zone.Deck, 0) if e.id == C6)
+        # Slot defaults and the tag layout are built from class-level data once, then shared by all entities of the class.
+        self.assertIs(m.data.defaults, m2.data.defaults)
+        self.assertIs(m.data.layout, m2.data.layout)
+        self.assertIs(m.data.defaults, type(m)._tag_defaults)
+        self.assertEqual(m.data.defaults[GameTag.Tag2Idx['attack']], m.cls_data['attack'])
+
+    def testCompactStorage(self):
+        m = self.minion
+        data = m.data
+        # Only tags set in entities of the class are stored.
+        self.assertLessEqual(len(data.values), len(data.layout))
+        self.assertLess(len(data.layout), GameTag.NumEnums // 2)
+        self.assertLess(sys.getsizeof(data) + sys.getsizeof(data.values), sys.getsizeof([None] * GameTag.NumEnums))
+
+        n = len(list(data.entity_items()))
+        m.data['frozen'] = True
+        m.data['my_diy_tag'] = 3
+        self.assertEqual(len(list(data.entity_items())), n + 2)
+        self.assertIn(GameTag.Tag2Idx['frozen'], data.layout)
+        self.assertIn('my_diy_tag', data.layout)
+        del m.data['frozen']
+        del m.data['my_diy_tag']
+        self.assertEqual(len(list(data.entity_items())), n)
+        # Positions in the layout are kept for other entities of the class.
+        self.assertIn('my_diy_tag', data.layout)
+
+    def testCopy(self):
+        m = self.minion
+        m.data['attack'] = 5
+        m2 = m.copy()
+        self.assertEqual(m2.attack, 5)
+        m2.data['attack'] = 6
+        self.assertEqual(m.attack, 5)
+
+    def testRollback(self):
+        m = self.minion
+        cp = self.game.checkpoint()
+        m.data['attack'] = 5
+        m.data['my_diy_tag'] = 3
+        m.data.clear()
+        self.game.rollback(cp)
+        self.assertEqual(m.zone, Zone.Hand)
+        self.assertEqual(m.attack, 1)
+        self.assertNotIn('my_diy_tag', m.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
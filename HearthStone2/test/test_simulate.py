@@ -0,0 +1,25 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from .test_utils.example import ExampleDecks, Seed
+
+from MyHearthStone.simulate import play_game, ResultFields
+
+__author__ = 'fyabc'
+
+
+class TestSimulate(unittest.TestCase):
+    def testPlayGame(self):
+        result = play_game(ExampleDecks, ['BaseAgent', 'PlayNoTarget'], Seed, max_turns=12)
+        self.assertSetEqual(set(result), set(ResultFields) - {'index'})
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['turns'], 12)
+
+    def testDeterministic(self):
+        results = [play_game(ExampleDecks, ['BaseAgent', 'BaseAgent'], Seed) for _ in range(2)]
+        for result in results:
+            del result['duration']
+        self.assertDictEqual(*results)
+        self.assertIn(results[0]['winner'], (0, 1, None))
@@ -3,7 +3,6 @@
 
 import sys
 import os
-import random
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
@@ -65,12 +64,10 @@ ExpectedEntities = [
 GSE = [std_e.BeginOfGame, std_e.BeginOfTurn, std_e.DrawCard]
 
 
-def example_game(decks=None, replace_start_card=True):
+def example_game(decks=None, replace_start_card=True, **kwargs):
     decks = ExampleDecks if decks is None else decks
 
-    random.seed(Seed)
-
-    game = Game()
+    game = Game(seed=Seed, **kwargs)
     game.start_game(decks, mode='standard')
     if replace_start_card:
         game.run_player_action(pa.ReplaceStartCard(game, 0, []))